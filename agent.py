@@ -2,7 +2,7 @@ import logging
 import json
 import asyncio
 import time
-from datetime import datetime
+from typing import Optional
 from dotenv import load_dotenv
 from livekit.agents import (
     Agent,
@@ -10,25 +10,67 @@ from livekit.agents import (
     AgentSession,
     JobContext,
     JobProcess,
+    StopResponse,
     cli,
 )
-from livekit.plugins import silero, bey
 
-from config import DEEPGRAM_API_KEY, CARTESIA_API_KEY, BEYOND_API_KEY
+from config import (
+    DEEPGRAM_API_KEY,
+    CARTESIA_API_KEY,
+    BEYOND_API_KEY,
+    METRICS_HOST,
+    METRICS_PORT,
+    TRACE_OTLP_FILE,
+    HISTORY_MAX_TURNS,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_KEEP_RECENT_ITEMS,
+    TOOL_OUTPUT_MAX_CHARS,
+    PREFETCH_DAYS,
+    PREFETCH_MAX_AGE_SECONDS,
+    FAST_PATH_ENABLED,
+    PHRASE_CACHE_ENABLED,
+    PHRASE_CACHE_WARM,
+    GREETING_TEXT,
+    STARTUP_WARM_TIMEOUT_SECONDS,
+    STARTUP_REQUIRED_TIMEOUT_SECONDS,
+    AVATAR_START_TIMEOUT_SECONDS,
+    AVAILABILITY_FEED_ENABLED,
+    SUMMARY_SHUTDOWN_FLUSH_SECONDS,
+)
 from tools.appointments import (
     identify_user,
     fetch_slots,
+    hold_slot,
+    release_hold,
     book_appointment,
     retrieve_appointments,
     cancel_appointment,
     modify_appointment,
+    SPOKEN_PHRASES,
 )
 from tools.summary import end_conversation
-from tools.summary import end_conversation
-from llm.ollama_llm import get_ollama_llm
-from livekit.plugins.deepgram import STT as DeepgramSTT
-from livekit.plugins.cartesia import TTS as CartesiaTTS
-import os
+from tools.slot_format import spoken_text
+from db.slot_cache import get_slot_cache
+from db.repository import get_repository, get_wal_replayer
+from db.write_behind import get_summary_writer
+from db.holds import get_hold_reaper
+from db.availability import get_availability
+from tools.events import ToolEventPublisher
+from tools.prefetch import AvailabilityPrefetcher
+from telemetry.tracing import TurnTracer
+from telemetry.exporter import start_metrics_server, get_otlp_exporter
+from telemetry.metrics import get_registry
+from telemetry.usage import UsageAccumulator
+from conversation.history import ConversationHistory
+from conversation.compaction import ContextCompactor
+from conversation.prompt import build_instructions, ordered_tools
+from conversation.fast_path import FAST_PATH_MISSES, classify, run_intent
+from llm.router import build_llm_router, router_stats
+from speech.phrase_cache import PhraseVoice, get_phrase_cache
+from startup.warmup import StartupPhases, add_warm_stages
+from startup.bringup import BringUp, BringUpFailed, greet
+from startup.services import get_background_services
+from providers.registry import import_stats, load_configured, resolve
 
 load_dotenv(".env")
 logger = logging.getLogger("agent")
@@ -37,76 +79,139 @@ logger = logging.getLogger("agent")
 class Assistant(Agent):
     def __init__(self):
         super().__init__(
-            instructions=f"""
-You are a friendly voice AI assistant helping users manage their appointments. Speak naturally and conversationally.
-
-TODAY'S DATE: {datetime.now().strftime("%A, %B %d, %Y")}
-
-CORE RULE:
-- NEVER invent or guess data. ALWAYS use the provided tools to fetch information.
-- If a user asks for available slots, appointments, or status, you MUST call the corresponding tool first.
-- Do not make up dates or times. Only speak what the tools return.
-- FOR ANY TOOL and SENDING DATA TO TOOLS AND DB ALWAYS USE DATE AS "YYYY-MM-DD" format and TIME AS "HH:MM" format.
-- FOR USER RESPONSES USE DATE AS "Month DD, YYYY" format and TIME AS "HH:MM AM/PM" format.
-- DO NOT output tool calls as text strings (e.g. :end_conversation{...}). Invoke the tool function properly using the available tools mechanism.
-
-- If user mentions only a date without a time, ask them to pick a specific time from the available slots on that date.
-- When booking, confirm all details: name, phone number, date, and time before finalizing.
-- After any action, confirm what was done and ask if they need anything else.
-
-AVAILABLE TOOLS & USAGE:
-1. `identify_user`: Call this FIRST when the user wants to book, modify, or check appointments. Ask for name and phone number.
-2. `fetch_slots(date)`: Call this when the user asks "When are you free?" or "Can I book on Tuesday?".
-   - If they specify a date, pass it. If not, call it with no arguments.
-   - READ the available slots returned by the tool clearly.
-3. `book_appointment(date, time, phone_number, name)`: Call this to finalize a booking.
-   - ALWAYS confirm the details with the user before calling this.
-4. `retrieve_appointments(phone_number)`: Call this when the user asks "Do I have any appointments?" or wants to modify/cancel.
-5. `modify_appointment(appointment_id, new_date, new_time)`: Call this to change a time.
-   - You must usually call `retrieve_appointments` first to get the `appointment_id` (unless the tool output provided it internally).
-6. `cancel_appointment(appointment_id)`: Call this to cancel.
-   - Like modify, verify the appointment first if needed.
-7. Once a booking it done ask the user if he want to book more appointments or not. If he says yes, then call `fetch_slots` and ask him to provide the date. If he says no, then call `end_conversation` with the summary.
-8. `end_conversation(summary)`: Call this IMMEDIATELY when the user explicitly says goodbye or wants to stop.
-   - DO NOT generate a text response like "Goodbye" or "Have a great day". You MUST call this tool to end the call.
-   - The tool itself will handle the closing signal.
-
-When the user is finished and wants to end the call, generate a concise summary of the conversation and call end_conversation with that summary.
-- CRITICAL: Do not speak a closing message yourself. Call the tool.
-
-SPEAKING STYLE:
-- Be warm, professional, and concise.
-- Convert dates to spoken format (e.g., "February 10th" not "2026-02-10") when repondint to user but for tools use "YYYY-MM-DD" format.
-- IMPORTANT: When calling tools, use "YYYY-MM-DD" for dates and "HH:MM" for times internally.
-- SEQUENTIAL TOOLS: Always wait for one tool call to return a result before calling another. Do not call multiple tools in the same turn.
-- If a tool result includes a section labeled "DO_NOT_READ_INTERNAL_IDS", never read it aloud. Use the IDs only for follow-up tool calls.
-""",
-            tools=[
+            instructions=build_instructions(),
+            tools=ordered_tools([
                 identify_user,
                 fetch_slots,
+                hold_slot,
+                release_hold,
                 book_appointment,
                 retrieve_appointments,
                 cancel_appointment,
                 modify_appointment,
                 end_conversation,
-            ],
+            ]),
         )
 
-        self.history = []
+        # Tools the fast path may run without asking the LLM.
+        self._fast_path_tools = {
+            "identify_user": identify_user,
+            "fetch_slots": fetch_slots,
+            "end_conversation": end_conversation,
+        }
+        self.history = ConversationHistory(HISTORY_MAX_TURNS)
         self.phone_number = None
+        self._compactor = ContextCompactor(
+            budget_tokens=CONTEXT_TOKEN_BUDGET,
+            keep_recent=CONTEXT_KEEP_RECENT_ITEMS,
+            tool_output_max_chars=TOOL_OUTPUT_MAX_CHARS,
+        )
 
-    async def on_user_message(self, message: str):
-        self.history.append({"role": "user", "content": message})
-
-    async def on_agent_message(self, message: str):
-        self.history.append({"role": "assistant", "content": message})
+    async def set_caller(self, phone_number: str, name: Optional[str] = None):
+        """Remember the caller and add them to the instructions' per-call suffix."""
+        if phone_number == self.phone_number:
+            return
+        self.phone_number = phone_number
+        await self.update_instructions(build_instructions(caller_phone=phone_number, caller_name=name))
+
+    async def _try_fast_path(self, new_message):
+        """Answer trivial turns by running the tool directly; raises StopResponse if handled."""
+        intent = classify(
+            new_message.text_content or "",
+            identified=self.phone_number is not None,
+            booking=self.session.userdata.get("slot_hold") is not None,
+        )
+        if intent is None:
+            FAST_PATH_MISSES.inc()
+            return
+        try:
+            reply = await run_intent(intent, self.session, self._fast_path_tools)
+        except Exception as e:
+            logger.warning(f"Fast path failed for {intent!r}, using the LLM: {e}")
+            FAST_PATH_MISSES.inc()
+            return
+        # StopResponse skips committing the user's message, so record it ourselves.
+        self.history.append("user", new_message.text_content or "")
+        if reply is not None:
+            chat_ctx = self.chat_ctx.copy()
+            chat_ctx.items.append(new_message)
+            await self.update_chat_ctx(chat_ctx)
+            # Tool output is written for the LLM to rephrase; this goes straight to TTS.
+            self.session.say(spoken_text(reply))
+        self._drop_preemptive_reply()
+        raise StopResponse()
+
+    def _drop_preemptive_reply(self):
+        # The LLM reply speculatively started for this turn is only dropped at
+        # the next one; a turn the fast path answered will never use it.
+        cancel = getattr(self._activity, "_cancel_preemptive_generation", None)
+        if cancel is not None:
+            cancel()
+
+    def tts_node(self, text, model_settings):
+        voice = self.session.userdata.get("phrase_voice")
+        if voice is None:
+            return Agent.default.tts_node(self, text, model_settings)
+        return voice.tts_node(text, lambda replay: Agent.default.tts_node(self, replay, model_settings))
+
+    async def on_user_turn_completed(self, turn_ctx, new_message):
+        if FAST_PATH_ENABLED:
+            await self._try_fast_path(new_message)
+
+        # Keep per-turn LLM input roughly flat: compact this turn's context and
+        # persist the compacted version so later turns start from it.
+        if self._compactor.compact(turn_ctx):
+            await self.update_chat_ctx(turn_ctx)
 
 
 server = AgentServer()
 
 
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    """Per-process setup, run before the process is offered jobs.
+
+    There is no event loop yet, so only loop-independent work happens here;
+    connections are opened by the bring-up stages at the start of each job.
+    """
+    phases = StartupPhases("prewarm")
+    with phases.phase("plugins"):
+        # Usually preloaded by the forkserver already; spawned processes import them here.
+        load_configured()
+    with phases.phase("vad"):
+        proc.userdata["vad"] = resolve("vad", "silero").load()
+    with phases.phase("storage"):
+        # Opens the write-ahead log (and the local database, if that's the backend).
+        get_repository()
+    if PHRASE_CACHE_ENABLED:
+        with phases.phase("phrase_cache"):
+            get_phrase_cache().preload()
+    with phases.phase("services"):
+        # Process-lifetime background work on its own loop: jobs use these, but never stop them.
+        services = get_background_services()
+        # Drains writes deferred while the backend was down; the log itself is durable.
+        services.start("wal_replayer", get_wal_replayer().start)
+        services.start("call_summary_queue", get_summary_writer().start)
+        # Holds expire on their own; the reaper keeps the table small.
+        services.start("slot_hold_reaper", get_hold_reaper().start)
+        if AVAILABILITY_FEED_ENABLED:
+            # Loads the snapshot and subscribes while the process is still idle.
+            services.start("availability_index", get_availability().start)
+    with phases.phase("metrics"):
+        get_registry().register_collector("background_services", lambda: get_background_services().stats())
+        get_registry().register_collector("slot_cache", lambda: get_slot_cache().stats())
+        get_registry().register_collector("db_breaker", lambda: get_repository().breaker.stats())
+        get_registry().register_collector("storage_wal", lambda: get_repository().wal.stats())
+        get_registry().register_collector("call_summary_queue", lambda: get_summary_writer().stats())
+        get_registry().register_collector("slot_hold_reaper", lambda: get_hold_reaper().stats())
+        if AVAILABILITY_FEED_ENABLED:
+            get_registry().register_collector("availability_index", lambda: get_availability().stats())
+        get_registry().register_collector("llm_router", router_stats)
+        get_registry().register_collector("provider_imports", import_stats)
+        if PHRASE_CACHE_ENABLED:
+            get_registry().register_collector("tts_phrase_cache", lambda: get_phrase_cache().stats())
+        if METRICS_PORT:
+            start_metrics_server(METRICS_HOST, METRICS_PORT)
+    phases.log()
 
 
 server.setup_fnc = prewarm
@@ -114,25 +219,32 @@ server.setup_fnc = prewarm
 
 @server.rtc_session()
 async def my_agent(ctx: JobContext):
-    # Connect to the room first - this is required!
-    await ctx.connect()
-
+    startup = StartupPhases("session")
     if not DEEPGRAM_API_KEY or not CARTESIA_API_KEY:
+        # Connect to the room first - this is required!
+        await ctx.connect()
         logger.error("API keys for Deepgram or Cartesia are missing.")
         return
+
+    stt = resolve("stt", "deepgram")(
+        model="nova-3",
+        api_key=DEEPGRAM_API_KEY,
+        language="en",
+    )
+    tts = resolve("tts", "cartesia")(
+        model="sonic-2",
+        api_key=CARTESIA_API_KEY,
+    )
+    llm = build_llm_router()
+    tool_events = ToolEventPublisher(ctx.room)
+    ctx.add_shutdown_callback(tool_events.aclose)
+
     session = AgentSession(
-        stt=DeepgramSTT(
-            model="nova-3",
-            api_key=DEEPGRAM_API_KEY,
-            language="en",
-        ),
-        llm=get_openrouter_llm(),
-        tts=CartesiaTTS(
-            model="sonic-2",
-            api_key=CARTESIA_API_KEY,
-        ),
+        stt=stt,
+        llm=llm,
+        tts=tts,
         vad=ctx.proc.userdata["vad"],
-        userdata={"room": ctx.room},
+        userdata={"room": ctx.room, "tool_events": tool_events},
         preemptive_generation=True,
     )
 
@@ -142,6 +254,84 @@ async def my_agent(ctx: JobContext):
     # Store references for tools
     session.userdata["agent"] = agent
     session.userdata["start_time"] = start_time
+    session.userdata["history"] = agent.history
+
+    tracer = TurnTracer(session_id=ctx.room.name, exporter=get_otlp_exporter(TRACE_OTLP_FILE))
+    tracer.attach(session)
+    session.userdata["tracer"] = tracer
+
+    usage = UsageAccumulator(started_at=start_time)
+    usage.attach(session)
+    session.userdata["usage"] = usage
+
+    # Nearly every caller asks about availability first; start loading it now.
+    # With the change feed on, the process-wide availability index does this instead.
+    prefetch = None
+    if not AVAILABILITY_FEED_ENABLED:
+        prefetch = AvailabilityPrefetcher(days=PREFETCH_DAYS, max_age_seconds=PREFETCH_MAX_AGE_SECONDS)
+        session.userdata["prefetch"] = prefetch
+        ctx.add_shutdown_callback(prefetch.aclose)
+
+    if PHRASE_CACHE_ENABLED:
+        phrase_voice = PhraseVoice(session.tts, (GREETING_TEXT, *SPOKEN_PHRASES))
+        session.userdata["phrase_voice"] = phrase_voice
+
+    # Everything that doesn't need the room runs alongside the room connect;
+    # the greeting waits for the avatar only as long as its timeout allows.
+    bringup = BringUp(startup)
+    ctx.add_shutdown_callback(bringup.aclose)
+    # Connect to the room first - this is required!
+    bringup.add("room", ctx.connect, timeout=STARTUP_REQUIRED_TIMEOUT_SECONDS, required=True)
+    add_warm_stages(bringup, llm=llm, tts=tts, stt=stt, timeout=STARTUP_WARM_TIMEOUT_SECONDS)
+
+    if AVAILABILITY_FEED_ENABLED:
+
+        async def _availability():
+            # Started by prewarm and kept for the life of the process; this only
+            # waits for its first snapshot, or tries again if starting failed.
+            start = get_background_services().start("availability_index", get_availability().start)
+            await asyncio.shield(asyncio.wrap_future(start))
+
+        bringup.add("availability", _availability, after=["storage"], timeout=STARTUP_WARM_TIMEOUT_SECONDS)
+    else:
+
+        async def _prefetch():
+            prefetch.start()
+            await prefetch.wait(STARTUP_WARM_TIMEOUT_SECONDS)
+            if not prefetch.is_fresh():
+                raise RuntimeError("availability prefetch did not finish")
+
+        bringup.add("prefetch", _prefetch, after=["storage"], timeout=STARTUP_WARM_TIMEOUT_SECONDS)
+    bringup.add(
+        "session_start",
+        lambda: session.start(agent=agent, room=ctx.room),
+        after=["room"],
+        timeout=STARTUP_REQUIRED_TIMEOUT_SECONDS,
+        required=True,
+    )
+    greet_after = ["session_start"]
+    if BEYOND_API_KEY:
+
+        async def _start_avatar():
+            audio_output = session.output.audio
+            try:
+                await resolve("avatar", "bey")(api_key=BEYOND_API_KEY).start(session, ctx.room)
+            except BaseException:
+                # Late or failed (the timeout cancels it): keep speaking through the room.
+                session.output.audio = audio_output
+                logger.warning("Avatar did not start in time; continuing voice-only")
+                raise
+
+        bringup.add("avatar", _start_avatar, after=["session_start"], timeout=AVATAR_START_TIMEOUT_SECONDS)
+        greet_after.append("avatar")
+    if GREETING_TEXT:
+        bringup.add(
+            "greeting",
+            lambda: greet(session, GREETING_TEXT, startup),
+            after=greet_after,
+            timeout=STARTUP_REQUIRED_TIMEOUT_SECONDS,
+        )
+    bringup.start()
 
     ready_sent = False
 
@@ -153,6 +343,9 @@ async def my_agent(ctx: JobContext):
             ready_sent = True
 
             async def _publish_ready():
+                # Only report ready once the connections the first turn needs are open.
+                await bringup.wait("storage", "llm", "tts", "stt", "prefetch", "availability")
+                startup.log()
                 try:
                     await ctx.room.local_participant.publish_data(
                         json.dumps({"type": "agent_ready"}),
@@ -167,35 +360,60 @@ async def my_agent(ctx: JobContext):
 
     session.on("agent_state_changed", _maybe_send_ready)
 
-    @session.on("user_speech_committed")
-    def on_user_speech(msg):
-        if isinstance(msg, list):
-            msg = " ".join([m.text for m in msg])
-        elif hasattr(msg, "content"):
-            msg = msg.content
-        elif hasattr(msg, "text"):
-            msg = msg.text
-        
-        # Avoid duplicates if we already have it (simple check)
-        if not agent.history or agent.history[-1].get("content") != str(msg):
-             agent.history.append({"role": "user", "content": str(msg)})
-
-    @session.on("agent_speech_committed")
-    def on_agent_speech(msg):
-        if hasattr(msg, "content"):
-            msg = msg.content
-        
-        agent.history.append({"role": "assistant", "content": str(msg)})
-
-    await session.start(
-        agent=agent,
-        room=ctx.room,
-    )
+    async def _log_slot_cache_stats():
+        logger.info(f"Slot cache stats: {get_slot_cache().stats()}")
 
-    if BEYOND_API_KEY:
-        avatar = bey.AvatarSession(api_key=BEYOND_API_KEY)
-        await avatar.start(session, ctx.room)
+    ctx.add_shutdown_callback(_log_slot_cache_stats)
+
+    # The whole call as spoken, unaffected by compaction of the LLM context;
+    # the fast path summarises from it when it ends the call itself.
+    @session.on("conversation_item_added")
+    def _record_turn(event):
+        item = event.item
+        if getattr(item, "type", None) == "message" and item.role in ("user", "assistant") and item.text_content:
+            agent.history.append(item.role, item.text_content)
+
+    try:
+        await bringup.wait("session_start")
+    except BringUpFailed as e:
+        logger.error(f"Session bring-up failed: {e}")
+        ctx.shutdown(reason=str(e))
+        return
+    tool_events.start()
+
+    if PHRASE_CACHE_ENABLED and PHRASE_CACHE_WARM:
+        # Needs the job's HTTP session, so this can't happen in prewarm.
+        warm_task = asyncio.create_task(phrase_voice.warm())
+
+        async def _stop_warming():
+            warm_task.cancel()
+
+        ctx.add_shutdown_callback(_stop_warming)
+
+    # A caller who hangs up mid-confirmation gives their slot back right away.
+    async def _release_slot_holds():
+        if session.userdata.get("slot_hold") is None:
+            return
+        try:
+            await get_repository().release_holds(session.userdata["slot_holder"])
+        except Exception as e:
+            logger.warning(f"Could not release slot holds on shutdown: {e}")
+
+    ctx.add_shutdown_callback(_release_slot_holds)
+
+    # The job process may exit right after this; write its summary now rather
+    # than leave it in the spool for another process to find.
+    async def _flush_call_summaries():
+        try:
+            await get_background_services().run(get_summary_writer().flush(), SUMMARY_SHUTDOWN_FLUSH_SECONDS)
+        except Exception as e:
+            logger.warning(f"Call summaries not flushed on shutdown, left in the spool: {type(e).__name__}: {e}")
+
+    ctx.add_shutdown_callback(_flush_call_summaries)
 
 
 if __name__ == "__main__":
+    # Register the configured plugins on the main thread before the worker
+    # starts, so the forkserver preloads them for every job process.
+    load_configured()
     cli.run_app(server)
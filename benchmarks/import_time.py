@@ -0,0 +1,77 @@
+"""Worker cold-start import time, per module, with a budget check.
+
+Runs a fresh interpreter with `python -X importtime` for what a job process
+imports before it can take a call: the agent module, then (with --plugins)
+the configured provider plugins. Prints the slowest modules by cumulative
+time and the total.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --plugins --top 30
+    python -m benchmarks.import_time --budget-ms 1500
+
+With --budget-ms the exit code is 1 if the total import time is over budget.
+Results vary run to run with disk cache state, so the best of --runs
+attempts is reported.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+def _profile(code: str) -> list[tuple[int, int, int, str]]:
+    """(self_us, cumulative_us, depth, module) for every import, in import order."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="agent")
+    parser.add_argument("--plugins", action="store_true", help="also import the configured provider plugins")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    code = f"import {args.module}"
+    if args.plugins:
+        code += "; from providers.registry import load_configured; load_configured()"
+
+    best = None
+    for _ in range(args.runs):
+        rows = _profile(code)
+        # Top-level imports (depth 1) add up to the whole cost.
+        total = sum(cumulative for _, cumulative, depth, _ in rows if depth == 1)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for self_us, cumulative, depth, name in sorted(rows, key=lambda r: r[1], reverse=True)[: args.top]:
+        print(f"{cumulative / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {'  ' * (depth - 1)}{name}")
+    print(f"total import time: {total / 1000:.0f}ms over {len(rows)} modules ({code})")
+
+    if args.budget_ms is not None:
+        if total / 1000 > args.budget_ms:
+            print(f"OVER BUDGET: {total / 1000:.0f}ms > {args.budget_ms:.0f}ms")
+            return 1
+        print(f"within budget ({args.budget_ms:.0f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,104 @@
+"""LLM router benchmark against two local OpenAI-compatible stubs.
+
+Starts a slow "openrouter" stub and a fast "ollama" stub, sends turns
+through the router and reports per-backend routing counts and time to
+first token. Halfway through, the fast stub starts stalling so failover
+shows up in the results. Finally a fresh process, standing in for the next
+job, reports the order its first turn would try the backends in, from the
+stats this run left behind.
+
+    python -m benchmarks.llm_router --turns 40 --slow-ttft-ms 900 --fast-ttft-ms 150
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+async def _turn(router) -> tuple[float, str]:
+    from livekit.agents.llm import ChatContext
+
+    chat_ctx = ChatContext.empty()
+    chat_ctx.add_message(role="user", content="Can I book an appointment tomorrow?")
+    started = time.perf_counter()
+    first = None
+    text = ""
+    async with router.chat(chat_ctx=chat_ctx) as stream:
+        async for chunk in stream:
+            if chunk.delta and chunk.delta.content:
+                if first is None:
+                    first = time.perf_counter() - started
+                text += chunk.delta.content
+    return (first if first is not None else time.perf_counter() - started), text
+
+
+async def _main(args) -> int:
+    from benchmarks.stub_llm_server import StubBehaviour, start_stub_server
+    from llm.router import BACKEND_ROUTED, build_llm_router, router_stats
+
+    slow = StubBehaviour(ttft_ms=args.slow_ttft_ms)
+    fast = StubBehaviour(ttft_ms=args.fast_ttft_ms, stall_seconds=args.stall_seconds)
+    servers = [
+        start_stub_server("127.0.0.1", args.slow_port, slow),
+        start_stub_server("127.0.0.1", args.fast_port, fast),
+    ]
+    router = build_llm_router()
+    ttfts = []
+    try:
+        for i in range(args.turns):
+            if i == args.turns // 2:
+                print(f"-- turn {i}: fast backend starts stalling")
+                fast.stall_rate = 1.0
+            ttft, _ = await _turn(router)
+            ttfts.append(ttft)
+    finally:
+        await router.aclose()
+        for server in servers:
+            server.shutdown()
+
+    routed = {name: int(BACKEND_ROUTED.value({"backend": name})) for name in ("openrouter", "ollama")}
+    print(f"turns={len(ttfts)} routed={routed}")
+    print(
+        f"ttft p50={statistics.median(ttfts) * 1000:.0f}ms "
+        f"max={max(ttfts) * 1000:.0f}ms"
+    )
+    print(f"backend stats: {router_stats()}")
+
+    first_choice = subprocess.run(
+        [sys.executable, "-c", "from llm.router import build_llm_router; "
+         "print([name for name, _ in build_llm_router().ranked()])"],
+        capture_output=True, text=True, env=os.environ,
+    )
+    print(f"next process would try: {first_choice.stdout.strip() or first_choice.stderr[-500:]}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--slow-ttft-ms", type=float, default=900)
+    parser.add_argument("--fast-ttft-ms", type=float, default=150)
+    parser.add_argument("--stall-seconds", type=float, default=10.0)
+    parser.add_argument("--first-token-timeout", type=float, default=1.5)
+    parser.add_argument("--slow-port", type=int, default=8801)
+    parser.add_argument("--fast-port", type=int, default=8802)
+    args = parser.parse_args()
+
+    # Point both backends at the stubs before config.py is imported.
+    os.environ["OPENROUTER_API_KEY"] = "stub"
+    os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{args.slow_port}/v1"
+    os.environ["OLLAMA_URL"] = f"http://127.0.0.1:{args.fast_port}/v1"
+    os.environ["LLM_BACKENDS"] = "openrouter,ollama"
+    os.environ["LLM_FIRST_TOKEN_TIMEOUT"] = str(args.first_token_timeout)
+    # Start from no history, and share this run's with the next-process check.
+    with tempfile.TemporaryDirectory() as stats_dir:
+        os.environ["LLM_ROUTER_STATS_DIR"] = stats_dir
+        return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,139 @@
+"""Minimal OpenAI-compatible chat completions server for exercising the LLM router.
+
+Streams a fixed reply as server-sent events with configurable time to first
+token, per-token delay, error rate and stall rate, so OpenRouter and Ollama
+can be stood in for locally:
+
+    python -m benchmarks.stub_llm_server --port 8801 --ttft-ms 900
+    python -m benchmarks.stub_llm_server --port 8802 --ttft-ms 150 --stall-rate 0.2
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:8801/v1 OPENROUTER_API_KEY=stub \\
+    OLLAMA_URL=http://127.0.0.1:8802/v1 python agent.py dev
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import argparse
+import json
+import random
+import threading
+import time
+
+
+class StubBehaviour:
+    def __init__(self, ttft_ms: float = 200, token_ms: float = 20, error_rate: float = 0.0,
+                 stall_rate: float = 0.0, stall_seconds: float = 30.0,
+                 reply: str = "Sure, I can help you book an appointment."):
+        self.ttft_ms = ttft_ms
+        self.token_ms = token_ms
+        self.error_rate = error_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.reply = reply
+        self.requests = 0
+
+
+def _handler(behaviour: StubBehaviour):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            behaviour.requests += 1
+
+            if random.random() < behaviour.error_rate:
+                payload = json.dumps({"error": {"message": "stub overloaded", "code": 429}}).encode()
+                self.send_response(429)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            stalled = random.random() < behaviour.stall_rate
+            time.sleep((behaviour.stall_seconds if stalled else behaviour.ttft_ms / 1000))
+            model = body.get("model", "stub")
+            created = int(time.time())
+
+            if not body.get("stream"):
+                payload = json.dumps({
+                    "id": "stub", "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": behaviour.reply}}],
+                    "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+
+            def event(delta: dict, finish: Optional[str] = None, usage: Optional[dict] = None):
+                chunk = {
+                    "id": "stub", "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+                }
+                if usage is not None:
+                    chunk["choices"] = []
+                    chunk["usage"] = usage
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+
+            try:
+                event({"role": "assistant", "content": ""})
+                words = behaviour.reply.split(" ")
+                for i, word in enumerate(words):
+                    event({"content": word if i == 0 else " " + word})
+                    time.sleep(behaviour.token_ms / 1000)
+                event({}, finish="stop")
+                event({}, usage={"prompt_tokens": 10, "completion_tokens": len(words),
+                                 "total_tokens": 10 + len(words)})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            self.close_connection = True
+
+    return Handler
+
+
+def start_stub_server(host: str, port: int, behaviour: StubBehaviour) -> ThreadingHTTPServer:
+    """Serve the stub from a daemon thread; returns the server (call shutdown() to stop)."""
+    server = ThreadingHTTPServer((host, port), _handler(behaviour))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=f"stub-llm-{port}", daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    behaviour = StubBehaviour(args.ttft_ms, args.token_ms, args.error_rate, args.stall_rate, args.stall_seconds)
+    server = start_stub_server(args.host, args.port, behaviour)
+    print(f"Stub LLM listening on http://{args.host}:{server.server_address[1]}/v1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
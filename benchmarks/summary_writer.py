@@ -0,0 +1,132 @@
+"""Call summary write-behind: time from hang-up to the row being written.
+
+Submits call_summaries rows to the write-behind queue the way
+`end_conversation` does and measures how long each waits before it is in
+the local database, for rows that arrive one at a time (each one is the
+first in an empty queue), for a burst, and for rows queued by other
+processes that exit straight away, as job processes do after a call.
+Reports rows per insert too.
+
+    python -m benchmarks.summary_writer
+    python -m benchmarks.summary_writer --flush-interval 0.2 --calls 10 --burst 50 --processes 8
+
+The exit code is 1 if any row waited longer than --flush-interval plus
+--slack, i.e. if a timed flush was missed.
+"""
+import argparse
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _count(db) -> int:
+    with db._lock:
+        return db._conn.execute("select count(*) from call_summaries").fetchone()[0]
+
+
+async def _wait_for(db, rows: int, timeout: float) -> float:
+    """Seconds until the table holds `rows` rows, or inf if it took longer than `timeout`."""
+    started = time.perf_counter()
+    while _count(db) < rows:
+        if time.perf_counter() - started > timeout:
+            return math.inf
+        await asyncio.sleep(0.005)
+    return time.perf_counter() - started
+
+
+async def _main(args) -> int:
+    from db.local import get_local_database
+    from db.repository import get_repository
+    from db.write_behind import get_summary_writer
+
+    db = get_local_database()
+    repo = get_repository().inner.inner
+    writer = get_summary_writer()
+    deadline = args.flush_interval + args.slack
+
+    waits = []
+    for i in range(args.calls):
+        writer.submit({"summary": f"Call {i}", "cost_breakdown": {}})
+        waits.append(await _wait_for(db, i + 1, deadline * 3))
+    single_inserts = round_trips = repo.round_trips
+
+    written = _count(db)
+    started = time.perf_counter()
+    for i in range(args.burst):
+        writer.submit({"summary": f"Burst {i}", "cost_breakdown": {}})
+    burst_wait = await _wait_for(db, written + args.burst, deadline * 3)
+    burst_inserts = repo.round_trips - single_inserts
+    submit_ms = (time.perf_counter() - started) * 1000
+
+    # Job processes that queue their summary and exit without flushing.
+    written = _count(db)
+    round_trips = repo.round_trips
+    queue_rows = (
+        "from db.write_behind import get_summary_writer; "
+        "get_summary_writer().spool.append({'summary': 'Other process', 'cost_breakdown': {}}, 1000)"
+    )
+    procs = [subprocess.Popen([sys.executable, "-c", queue_rows], env=os.environ) for _ in range(args.processes)]
+    for proc in procs:
+        proc.wait()
+    # They never wake this process's flusher, so it finds their rows on its next look.
+    process_wait = await _wait_for(db, written + args.processes, deadline * 3)
+    process_inserts = repo.round_trips - round_trips
+    await writer.aclose()
+
+    print(f"{'rows one at a time':<24}{args.calls:>6} rows, {single_inserts} inserts")
+    for i, wait in enumerate(waits):
+        print(f"  row {i + 1:<4}written after {wait * 1000:>8.1f}ms")
+    print(
+        f"{'burst':<24}{args.burst:>6} rows, {burst_inserts} inserts, "
+        f"last written after {burst_wait * 1000:.1f}ms (submitting took {submit_ms:.1f}ms)"
+    )
+    print(
+        f"{'other processes':<24}{args.processes:>6} rows, {process_inserts} inserts, "
+        f"written {process_wait * 1000:.1f}ms after the last process exited"
+    )
+
+    late = [i + 1 for i, wait in enumerate(waits) if wait > deadline]
+    if burst_wait > deadline:
+        late.append("burst")
+    # A row from another process can wait up to one interval before this one looks.
+    if process_wait > 2 * args.flush_interval + args.slack:
+        late.append("other processes")
+    if late:
+        print(f"\nRows waited longer than {deadline * 1000:.0f}ms: {late}")
+        return 1
+    print(f"\nEvery row was written within {deadline * 1000:.0f}ms.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flush-interval", type=float, default=0.2, help="SUMMARY_FLUSH_INTERVAL_SECONDS")
+    parser.add_argument("--batch", type=int, default=20, help="SUMMARY_FLUSH_BATCH")
+    parser.add_argument("--calls", type=int, default=5, help="rows submitted one at a time")
+    parser.add_argument("--burst", type=int, default=50, help="rows submitted at once")
+    parser.add_argument("--processes", type=int, default=4, help="processes that each queue one row and exit")
+    parser.add_argument("--slack", type=float, default=0.1, help="allowed lateness in seconds")
+    args = parser.parse_args()
+
+    # Configure the local backend before config.py is imported.
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["LOCAL_DB_PATH"] = ":memory:"
+    os.environ["WAL_PATH"] = ":memory:"
+    # The spool must be a file for other processes to share it.
+    spool_dir = tempfile.TemporaryDirectory()
+    os.environ["SUMMARY_SPOOL_PATH"] = os.path.join(spool_dir.name, "spool.sqlite3")
+    os.environ["LOCAL_DB_LATENCY_MS"] = "0"
+    os.environ["LOCAL_DB_JITTER_MS"] = "0"
+    os.environ["SUMMARY_FLUSH_INTERVAL_SECONDS"] = str(args.flush_interval)
+    os.environ["SUMMARY_FLUSH_BATCH"] = str(args.batch)
+
+    with spool_dir:
+        return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
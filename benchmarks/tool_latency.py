@@ -0,0 +1,308 @@
+"""Tool-level latency benchmarks against the local storage stand-in.
+
+Drives every function tool through a fake RunContext/session/room backed by
+the SQLite repository and reports p50/p95/p99 latency, storage round trips
+per call and peak bytes allocated per call.
+
+    python -m benchmarks.tool_latency --iterations 200 --latency-ms 40 --jitter-ms 10
+    python -m benchmarks.tool_latency --save bench_baseline.json
+    python -m benchmarks.tool_latency --baseline bench_baseline.json
+
+With --baseline the exit code is 1 if any tool's p95 regressed by more than
+--threshold, or if it now needs more round trips than the baseline.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+
+class FakeParticipant:
+    def __init__(self):
+        self.published = 0
+
+    async def publish_data(self, payload, reliable=True, topic=None):
+        self.published += 1
+
+
+class FakeRoom:
+    def __init__(self):
+        self.local_participant = FakeParticipant()
+
+    async def disconnect(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        from tools.events import ToolEventPublisher
+        from telemetry.usage import UsageAccumulator
+
+        room = FakeRoom()
+        tool_events = ToolEventPublisher(room)
+        tool_events.start()
+        self.userdata = {
+            "room": room,
+            "tool_events": tool_events,
+            "usage": UsageAccumulator(),
+        }
+
+    async def aclose(self):
+        await self.userdata["tool_events"].aclose()
+
+
+class FakeRunContext:
+    def __init__(self):
+        self.session = FakeSession()
+
+
+HOLD_RACE_CONTENDERS = 4
+
+
+def _percentile(samples: list[float], pct: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+class Scenario:
+    """One tool call shape. `setup`, if given, runs untimed before each call with its context and kwargs."""
+
+    def __init__(self, name: str, tool, prepare: Callable[[], dict], setup: Optional[Callable] = None):
+        self.name = name
+        self.tool = tool
+        self.prepare = prepare
+        self.setup = setup
+
+
+def _build_scenarios(db, today: str) -> list[Scenario]:
+    from tools.appointments import (
+        identify_user,
+        fetch_slots,
+        hold_slot,
+        release_hold,
+        book_appointment,
+        retrieve_appointments,
+        cancel_appointment,
+        modify_appointment,
+    )
+    from tools.summary import end_conversation
+    from db.slot_cache import get_slot_cache
+
+    open_slots = iter(db.list_open_slots())
+
+    def next_slot() -> dict:
+        return next(open_slots)
+
+    def booked_appointment() -> dict:
+        slot = next_slot()
+        return db.book_appointment_atomic(slot["date"], slot["time"], "5550100", "Bench")["appointment"]
+
+    def cold(kwargs: dict) -> dict:
+        get_slot_cache().invalidate()
+        return kwargs
+
+    def book() -> dict:
+        slot = next_slot()
+        return {"date": slot["date"], "time": slot["time"][:5], "phone_number": "5550100", "name": "Bench"}
+
+    def modify() -> dict:
+        appointment = booked_appointment()
+        slot = next_slot()
+        return {"appointment_id": str(appointment["id"]), "new_date": slot["date"], "new_time": slot["time"][:5]}
+
+    def cancel() -> dict:
+        return {"appointment_id": str(booked_appointment()["id"])}
+
+    def hold() -> dict:
+        slot = next_slot()
+        return {"date": slot["date"], "time": slot["time"][:5]}
+
+    def held_by_rival() -> dict:
+        kwargs = hold()
+        db.hold_slot(kwargs["date"], kwargs["time"], "bench-rival", 120)
+        return kwargs
+
+    rivals: list[FakeRunContext] = []
+
+    async def hold_race(context, date: str, time: str) -> list:
+        # Every contender asks for the same slot at once; one gets it, the rest hear it's taken.
+        if not rivals:
+            rivals.extend(FakeRunContext() for _ in range(HOLD_RACE_CONTENDERS - 1))
+        return await asyncio.gather(*(hold_slot(c, date, time) for c in [context, *rivals]))
+
+    async def hold_first(context, kwargs: dict) -> None:
+        await hold_slot(context, **hold())
+
+    return [
+        Scenario("identify_user", identify_user, dict),
+        Scenario("fetch_slots(date)", fetch_slots, lambda: {"date": today}),
+        Scenario("fetch_slots(date, cold)", fetch_slots, lambda: cold({"date": today})),
+        Scenario("fetch_slots()", fetch_slots, dict),
+        Scenario("fetch_slots(cold)", fetch_slots, lambda: cold({})),
+        Scenario("hold_slot", hold_slot, hold),
+        Scenario("hold_slot(taken)", hold_slot, held_by_rival),
+        Scenario(f"hold_slot(race x{HOLD_RACE_CONTENDERS})", hold_race, hold),
+        Scenario("release_hold", release_hold, dict, setup=hold_first),
+        Scenario("book_appointment", book_appointment, book),
+        Scenario("retrieve_appointments", retrieve_appointments, lambda: {"phone_number": "5550100"}),
+        Scenario("modify_appointment", modify_appointment, modify),
+        Scenario("cancel_appointment", cancel_appointment, cancel),
+        Scenario("end_conversation", end_conversation, lambda: {"summary": "Booked one appointment."}),
+    ]
+
+
+async def _run_scenario(scenario: Scenario, repo, iterations: int) -> dict:
+    context = FakeRunContext()
+    latencies = []
+    round_trips = []
+    for _ in range(iterations):
+        kwargs = scenario.prepare()
+        if scenario.setup is not None:
+            await scenario.setup(context, kwargs)
+        before = repo.round_trips
+        start = time.perf_counter()
+        await scenario.tool(context, **kwargs)
+        latencies.append((time.perf_counter() - start) * 1000)
+        round_trips.append(repo.round_trips - before)
+
+    # Allocation pass is separate so tracemalloc overhead doesn't skew latency.
+    alloc_samples = max(1, min(iterations, 20))
+    allocations = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_samples):
+            kwargs = scenario.prepare()
+            if scenario.setup is not None:
+                await scenario.setup(context, kwargs)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await scenario.tool(context, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+            allocations.append(peak - current)
+    finally:
+        tracemalloc.stop()
+        await context.session.aclose()
+
+    return {
+        "iterations": iterations,
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "p99_ms": round(_percentile(latencies, 99), 3),
+        "round_trips": round(statistics.mean(round_trips), 2),
+        "alloc_bytes": int(statistics.median(allocations)),
+    }
+
+
+def _print_report(results: dict, baseline: Optional[dict]) -> None:
+    header = f"{'tool':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RTs':>6}{'alloc B':>10}"
+    if baseline:
+        header += f"{'p95 Δ':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (
+            f"{name:<26}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+            f"{r['round_trips']:>6.2f}{r['alloc_bytes']:>10d}"
+        )
+        base = (baseline or {}).get(name)
+        if base and base["p95_ms"] > 0:
+            line += f"{(r['p95_ms'] / base['p95_ms'] - 1) * 100:>+9.1f}%"
+        print(line)
+
+
+def _regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    problems = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base["p95_ms"] > 0 and r["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            problems.append(f"{name}: p95 {base['p95_ms']:.3f} -> {r['p95_ms']:.3f} ms")
+        if r["round_trips"] > base["round_trips"]:
+            problems.append(f"{name}: round trips {base['round_trips']} -> {r['round_trips']}")
+    return problems
+
+
+async def _main(args) -> int:
+    from datetime import date
+    from db.local import get_local_database
+    from db.repository import get_repository
+    from db.write_behind import get_summary_writer
+
+    db = get_local_database()
+    repo = get_repository()
+    scenarios = _build_scenarios(db, date.today().isoformat())
+
+    results = {}
+    for scenario in scenarios:
+        if args.only and scenario.name.split("(")[0] not in args.only:
+            continue
+        results[scenario.name] = await _run_scenario(scenario, repo, args.iterations)
+    await get_summary_writer().aclose()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    _print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "latency_ms": args.latency_ms,
+                    "jitter_ms": args.jitter_ms,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nSaved results to {args.save}")
+
+    if baseline:
+        problems = _regressions(results, baseline, args.threshold)
+        if problems:
+            print("\nRegressions against baseline:")
+            for problem in problems:
+                print(f"  {problem}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="simulated storage round trip")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--only", nargs="*", help="tool names to run (default: all)")
+    parser.add_argument("--save", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # Configure the local backend before config.py is imported by the tools.
+    # Each pass (timed, then up to 20 allocation samples) takes about 8 slots across the scenarios.
+    passes = args.iterations + max(1, min(args.iterations, 20))
+    slots_needed = passes * 10
+    os.environ["STORAGE_BACKEND"] = "local"
+    os.environ["LOCAL_DB_PATH"] = ":memory:"
+    os.environ["WAL_PATH"] = ":memory:"
+    os.environ["SUMMARY_SPOOL_PATH"] = ":memory:"
+    os.environ["LOCAL_DB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["LOCAL_DB_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["LOCAL_DB_SEED_DAYS"] = str(math.ceil(slots_needed / 16) + 1)
+
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""Phrase audio cache benchmark with a fake TTS.
+
+The fake TTS waits --ttfb-ms before its first frame and then streams a tone
+in real time, like a network TTS would. Each fixed phrase is spoken through
+the cache twice (a cold miss that synthesizes and stores it, then a hit) and
+a free-form sentence is spoken to show it passes straight through. Reports
+time to first audio frame for each case.
+
+    python -m benchmarks.tts_phrase_cache --ttfb-ms 250
+"""
+import argparse
+import asyncio
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+class FakeTTS:
+    """Just enough of livekit's TTS for PhraseVoice: properties plus synthesize()."""
+
+    label = "fake.TTS"
+    model = "fake-1"
+    sample_rate = 24000
+    num_channels = 1
+
+    def __init__(self, ttfb_ms: float, chars_per_second: float = 15.0):
+        self.ttfb_ms = ttfb_ms
+        self.chars_per_second = chars_per_second
+        self.requests = 0
+
+    async def frames(self, text: str):
+        from livekit import rtc
+
+        self.requests += 1
+        await asyncio.sleep(self.ttfb_ms / 1000)
+        samples = self.sample_rate // 50
+        total = int(len(text) / self.chars_per_second * 50)
+        for i in range(total):
+            tone = bytearray()
+            for n in range(samples):
+                value = int(3000 * math.sin(2 * math.pi * 440 * (i * samples + n) / self.sample_rate))
+                tone += value.to_bytes(2, "little", signed=True)
+            yield rtc.AudioFrame(bytes(tone), self.sample_rate, self.num_channels, samples)
+            await asyncio.sleep(0)
+
+    def synthesize(self, text: str):
+        tts = self
+
+        class _Stream:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def __aiter__(self):
+                async for frame in tts.frames(text):
+                    yield type("SynthesizedAudio", (), {"frame": frame})
+
+        return _Stream()
+
+    async def stream_node(self, text):
+        """Stands in for the agent's default TTS node: joins the text, then synthesizes it."""
+        joined = "".join([chunk async for chunk in text])
+        async for frame in self.frames(joined):
+            yield frame
+
+
+async def _words(text: str):
+    # Arrive word by word, the way LLM output does.
+    for i, word in enumerate(text.split(" ")):
+        yield word if i == 0 else " " + word
+
+
+async def _speak(voice, tts: FakeTTS, text: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    first = None
+    frames = 0
+    async for _ in voice.tts_node(_words(text), tts.stream_node):
+        if first is None:
+            first = time.perf_counter() - started
+        frames += 1
+    return first or 0.0, frames
+
+
+async def _main(args) -> int:
+    from speech.phrase_cache import PhraseAudioCache, PhraseVoice
+    from tools.appointments import SPOKEN_PHRASES
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = PhraseAudioCache(directory, max_bytes=args.max_bytes, max_open=args.max_open)
+        tts = FakeTTS(args.ttfb_ms)
+        voice = PhraseVoice(tts, SPOKEN_PHRASES, cache=cache)
+
+        cold, warm = [], []
+        for phrase in SPOKEN_PHRASES:
+            first, cold_frames = await _speak(voice, tts, phrase)
+            cold.append(first)
+            first, warm_frames = await _speak(voice, tts, phrase)
+            warm.append(first)
+            if warm_frames != cold_frames:
+                print(f"frame count mismatch for {phrase!r}: {cold_frames} vs {warm_frames}")
+                return 1
+        free, _ = await _speak(voice, tts, "Sure, Tuesday at three works, shall I book it?")
+
+        print(f"phrases={len(SPOKEN_PHRASES)} tts_requests={tts.requests} cache={cache.stats()}")
+        print(f"cold first frame p50={statistics.median(cold) * 1000:.1f}ms")
+        print(f"hit  first frame p50={statistics.median(warm) * 1000:.1f}ms")
+        print(f"free-form first frame={free * 1000:.1f}ms")
+        print(f"on disk: {sum(e.stat().st_size for e in os.scandir(directory)) / 1024:.0f} KiB")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ttfb-ms", type=float, default=250)
+    parser.add_argument("--max-bytes", type=int, default=64 * 1024 * 1024)
+    parser.add_argument("--max-open", type=int, default=64)
+    args = parser.parse_args()
+    sys.path.insert(0, os.getcwd())
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
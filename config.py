@@ -18,3 +18,165 @@ SUPABASE_PUBLISHABLE_DEFAULT_KEY = os.getenv("SUPABASE_PUBLISHABLE_DEFAULT_KEY")
 
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/v1")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen3:1.7b") # Defaulting to qwen2.5 as qwen3:1.7b might be a typo, but will use what user says in .env
+
+SLOT_CACHE_TTL_SECONDS = float(os.getenv("SLOT_CACHE_TTL_SECONDS", "30"))
+SLOT_CACHE_MAX_ENTRIES = int(os.getenv("SLOT_CACHE_MAX_ENTRIES", "64"))
+
+# "supabase" talks to the hosted project; "local" uses the SQLite stand-in in db/local.py.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase")
+LOCAL_DB_PATH = os.getenv("LOCAL_DB_PATH", ":memory:")
+# Simulated network round trip for the local backend, so perf tests see realistic latency.
+LOCAL_DB_LATENCY_MS = float(os.getenv("LOCAL_DB_LATENCY_MS", "0"))
+LOCAL_DB_JITTER_MS = float(os.getenv("LOCAL_DB_JITTER_MS", "0"))
+LOCAL_DB_SEED_DAYS = int(os.getenv("LOCAL_DB_SEED_DAYS", "7"))
+
+# Per-worker Prometheus text endpoint (0 disables) and optional OTLP/JSON turn trace file.
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+TRACE_OTLP_FILE = os.getenv("TRACE_OTLP_FILE", "")
+
+# Provider rate tables (USD) used for running session cost. The *_PROVIDER
+# settings pick the row when a metrics event doesn't name its provider.
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openrouter")
+STT_PROVIDER = os.getenv("STT_PROVIDER", "deepgram")
+TTS_PROVIDER = os.getenv("TTS_PROVIDER", "cartesia")
+RATE_TABLES = {
+    "llm": {
+        "openrouter": {"input_per_1m": 0.05, "cached_input_per_1m": 0.05, "output_per_1m": 0.40},
+        "ollama": {"input_per_1m": 0.0, "cached_input_per_1m": 0.0, "output_per_1m": 0.0},
+    },
+    "stt": {
+        "deepgram": {"per_minute": 0.0043},
+    },
+    "tts": {
+        "cartesia": {"per_1m_chars": 7.00},
+    },
+}
+
+# Conversation memory: ring-buffer size for the turn log, and the chat-context
+# budget beyond which older turns are folded into a rolling summary.
+HISTORY_MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "200"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+CONTEXT_KEEP_RECENT_ITEMS = int(os.getenv("CONTEXT_KEEP_RECENT_ITEMS", "12"))
+TOOL_OUTPUT_MAX_CHARS = int(os.getenv("TOOL_OUTPUT_MAX_CHARS", "400"))
+
+# Spoken slot summaries: how many days and ranges/times per day to spell out,
+# and how many exact slots fetch_slots lists per page on follow-up calls.
+SLOT_SUMMARY_MAX_DAYS = int(os.getenv("SLOT_SUMMARY_MAX_DAYS", "3"))
+SLOT_SUMMARY_MAX_OPTIONS = int(os.getenv("SLOT_SUMMARY_MAX_OPTIONS", "4"))
+SLOT_PAGE_SIZE = int(os.getenv("SLOT_PAGE_SIZE", "6"))
+
+# Session-start prefetch of open slots: window size, how long the snapshot may
+# be served, and how long fetch_slots waits for an in-flight prefetch.
+PREFETCH_DAYS = int(os.getenv("PREFETCH_DAYS", "7"))
+PREFETCH_MAX_AGE_SECONDS = float(os.getenv("PREFETCH_MAX_AGE_SECONDS", "60"))
+PREFETCH_WAIT_SECONDS = float(os.getenv("PREFETCH_WAIT_SECONDS", "1.0"))
+
+# Slot holds: how long a slot stays reserved for a caller while they confirm
+# a booking, and how often each worker deletes expired holds.
+SLOT_HOLD_TTL_SECONDS = int(os.getenv("SLOT_HOLD_TTL_SECONDS", "120"))
+SLOT_HOLD_REAP_INTERVAL_SECONDS = float(os.getenv("SLOT_HOLD_REAP_INTERVAL_SECONDS", "30"))
+
+# Process-wide availability index kept current from the slot change feed
+# (Supabase realtime, or the local database's in-process feed). fetch_slots
+# answers from it for AVAILABILITY_INDEX_DAYS days ahead while the feed is
+# connected, and for at most AVAILABILITY_MAX_STALENESS_SECONDS after it
+# drops or a missed change goes unfilled. Missed changes are read back from
+# the change log after AVAILABILITY_GAP_GRACE_SECONDS, up to
+# AVAILABILITY_CATCHUP_LIMIT rows before a full reload instead; the whole
+# index is reloaded every AVAILABILITY_RESYNC_SECONDS regardless. Off by
+# default: on Supabase it needs migration 006 applied and slot_changes in the
+# supabase_realtime publication, and it replaces the per-call prefetch.
+AVAILABILITY_FEED_ENABLED = os.getenv("AVAILABILITY_FEED_ENABLED", "false").lower() == "true"
+AVAILABILITY_INDEX_DAYS = int(os.getenv("AVAILABILITY_INDEX_DAYS", "14"))
+AVAILABILITY_MAX_STALENESS_SECONDS = float(os.getenv("AVAILABILITY_MAX_STALENESS_SECONDS", "5"))
+AVAILABILITY_GAP_GRACE_SECONDS = float(os.getenv("AVAILABILITY_GAP_GRACE_SECONDS", "1.0"))
+AVAILABILITY_CATCHUP_LIMIT = int(os.getenv("AVAILABILITY_CATCHUP_LIMIT", "500"))
+AVAILABILITY_RESYNC_SECONDS = float(os.getenv("AVAILABILITY_RESYNC_SECONDS", "300"))
+
+# How many appointments retrieve_appointments reads per page.
+APPOINTMENT_PAGE_SIZE = int(os.getenv("APPOINTMENT_PAGE_SIZE", "5"))
+
+# Database call budgets. Each tool invocation gets DB_TOOL_BUDGET_SECONDS for
+# all its repository calls; a single attempt is capped at DB_CALL_TIMEOUT_SECONDS.
+# Reads are retried with jittered backoff and hedged after the observed p95
+# once DB_HEDGE_MIN_SAMPLES latencies have been recorded.
+DB_TOOL_BUDGET_SECONDS = float(os.getenv("DB_TOOL_BUDGET_SECONDS", "4.0"))
+DB_CALL_TIMEOUT_SECONDS = float(os.getenv("DB_CALL_TIMEOUT_SECONDS", "2.0"))
+DB_READ_RETRIES = int(os.getenv("DB_READ_RETRIES", "2"))
+DB_RETRY_BASE_MS = float(os.getenv("DB_RETRY_BASE_MS", "50"))
+DB_HEDGE_ENABLED = os.getenv("DB_HEDGE_ENABLED", "true").lower() == "true"
+DB_HEDGE_MIN_MS = float(os.getenv("DB_HEDGE_MIN_MS", "50"))
+DB_HEDGE_QUANTILE = float(os.getenv("DB_HEDGE_QUANTILE", "0.95"))
+DB_HEDGE_MIN_SAMPLES = int(os.getenv("DB_HEDGE_MIN_SAMPLES", "20"))
+
+# Storage circuit breaker: consecutive failures before it opens and how long
+# calls are rejected before a probe. While open, reads are served from the
+# last known results and deferrable writes go to the local write-ahead log
+# at WAL_PATH, which is replayed every WAL_REPLAY_INTERVAL_SECONDS. An entry
+# that fails WAL_MAX_ATTEMPTS replays is moved aside to the dead_writes table.
+DB_BREAKER_FAILURES = int(os.getenv("DB_BREAKER_FAILURES", "5"))
+DB_BREAKER_RESET_SECONDS = float(os.getenv("DB_BREAKER_RESET_SECONDS", "15"))
+WAL_PATH = os.getenv("WAL_PATH", "storage_wal.sqlite3")
+WAL_REPLAY_INTERVAL_SECONDS = float(os.getenv("WAL_REPLAY_INTERVAL_SECONDS", "5"))
+WAL_REPLAY_BATCH = int(os.getenv("WAL_REPLAY_BATCH", "50"))
+WAL_MAX_ATTEMPTS = int(os.getenv("WAL_MAX_ATTEMPTS", "20"))
+
+# Write-behind queue for call summaries: rows are inserted in batches of up to
+# SUMMARY_FLUSH_BATCH, or after SUMMARY_FLUSH_INTERVAL_SECONDS, whichever is first.
+# The queue is a SQLite file at SUMMARY_SPOOL_PATH shared by every worker process.
+# A job flushes it on shutdown for up to SUMMARY_SHUTDOWN_FLUSH_SECONDS; what
+# isn't written by then stays in the spool for the next flusher.
+SUMMARY_SPOOL_PATH = os.getenv("SUMMARY_SPOOL_PATH", "call_summaries_spool.sqlite3")
+SUMMARY_FLUSH_BATCH = int(os.getenv("SUMMARY_FLUSH_BATCH", "20"))
+SUMMARY_FLUSH_INTERVAL_SECONDS = float(os.getenv("SUMMARY_FLUSH_INTERVAL_SECONDS", "2.0"))
+SUMMARY_QUEUE_MAX = int(os.getenv("SUMMARY_QUEUE_MAX", "1000"))
+SUMMARY_SHUTDOWN_FLUSH_SECONDS = float(os.getenv("SUMMARY_SHUTDOWN_FLUSH_SECONDS", "5.0"))
+
+# LLM routing. LLM_BACKENDS lists the backends to build, in order of
+# preference for ties; each turn goes to the healthy one with the lowest
+# rolling time to first token. A backend that gives no first token within
+# LLM_FIRST_TOKEN_TIMEOUT (or stalls LLM_CHUNK_TIMEOUT mid-answer) is failed
+# over and cooled down for LLM_ROUTER_COOLDOWN_SECONDS.
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.3-70b-instruct:free")
+LLM_BACKENDS = [name.strip() for name in os.getenv("LLM_BACKENDS", "openrouter,ollama").split(",") if name.strip()]
+LLM_FIRST_TOKEN_TIMEOUT = float(os.getenv("LLM_FIRST_TOKEN_TIMEOUT", "4.0"))
+LLM_CHUNK_TIMEOUT = float(os.getenv("LLM_CHUNK_TIMEOUT", "8.0"))
+LLM_ROUTER_EWMA_ALPHA = float(os.getenv("LLM_ROUTER_EWMA_ALPHA", "0.3"))
+LLM_ROUTER_ERROR_WINDOW = int(os.getenv("LLM_ROUTER_ERROR_WINDOW", "20"))
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+LLM_ROUTER_COOLDOWN_SECONDS = float(os.getenv("LLM_ROUTER_COOLDOWN_SECONDS", "30"))
+LLM_ROUTER_STALE_SECONDS = float(os.getenv("LLM_ROUTER_STALE_SECONDS", "120"))
+# Backend stats are shared by every worker process on the host through small
+# JSON files in LLM_ROUTER_STATS_DIR (empty keeps them per process).
+LLM_ROUTER_STATS_DIR = os.getenv("LLM_ROUTER_STATS_DIR", ".cache/llm_router")
+
+# Answer trivial turns (goodbye, a bare phone number, "what's open tomorrow")
+# by running the tool directly instead of asking the LLM first.
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+
+# Pre-synthesized audio for fixed phrases (the greeting and the tools' fixed
+# replies). Entries are raw PCM files in PHRASE_CACHE_DIR shared by every
+# worker on the host, kept under PHRASE_CACHE_MAX_BYTES by least recent use.
+# With PHRASE_CACHE_WARM, missing phrases are synthesized in the background
+# when a session starts; otherwise they are cached the first time they're spoken.
+PHRASE_CACHE_ENABLED = os.getenv("PHRASE_CACHE_ENABLED", "true").lower() == "true"
+PHRASE_CACHE_DIR = os.getenv("PHRASE_CACHE_DIR", ".cache/phrases")
+PHRASE_CACHE_MAX_BYTES = int(os.getenv("PHRASE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+PHRASE_CACHE_MAX_OPEN = int(os.getenv("PHRASE_CACHE_MAX_OPEN", "64"))
+PHRASE_CACHE_WARM = os.getenv("PHRASE_CACHE_WARM", "true").lower() == "true"
+GREETING_TEXT = os.getenv(
+    "GREETING_TEXT",
+    "Hi, thanks for calling. I can help you book, check, change or cancel an appointment. How can I help?",
+)
+
+# Upper bound for each connection warmed at session start (storage, LLM,
+# TTS); readiness is reported once they are warm or this much time has passed.
+STARTUP_WARM_TIMEOUT_SECONDS = float(os.getenv("STARTUP_WARM_TIMEOUT_SECONDS", "5.0"))
+
+# Session bring-up. Room connect and session start must finish within
+# STARTUP_REQUIRED_TIMEOUT_SECONDS. The avatar gets AVATAR_START_TIMEOUT_SECONDS,
+# after which the call greets and continues voice-only.
+STARTUP_REQUIRED_TIMEOUT_SECONDS = float(os.getenv("STARTUP_REQUIRED_TIMEOUT_SECONDS", "15.0"))
+AVATAR_START_TIMEOUT_SECONDS = float(os.getenv("AVATAR_START_TIMEOUT_SECONDS", "5.0"))
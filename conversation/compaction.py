@@ -0,0 +1,119 @@
+from typing import Optional
+import logging
+
+from livekit.agents.llm import ChatContext, ChatMessage
+
+logger = logging.getLogger("conversation.compaction")
+
+SUMMARY_ID = "compacted_summary"
+SUMMARY_HEADER = "Summary of the earlier part of this call (older turns were compacted):"
+
+# Rough but stable: good enough to decide when the context has outgrown its budget.
+CHARS_PER_TOKEN = 4
+
+
+def _item_text(item) -> str:
+    kind = getattr(item, "type", None)
+    if kind == "message":
+        return item.text_content or ""
+    if kind == "function_call":
+        return f"{item.name}({item.arguments})"
+    if kind == "function_call_output":
+        return item.output or ""
+    return ""
+
+
+def estimate_tokens(items) -> int:
+    return sum(len(_item_text(item)) for item in items) // CHARS_PER_TOKEN
+
+
+def clip_text(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+class ContextCompactor:
+    """Keeps the LLM chat context under a token budget.
+
+    Once the context exceeds `budget_tokens`, everything older than the last
+    `keep_recent` items is folded into a single rolling summary message that
+    sits right after the instructions. Tool outputs longer than
+    `tool_output_max_chars` are clipped wherever they appear. The summary is
+    extractive (no extra LLM call) and capped at `summary_max_lines`.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int,
+        keep_recent: int,
+        tool_output_max_chars: int,
+        summary_max_lines: int = 24,
+    ):
+        self.budget_tokens = budget_tokens
+        self.keep_recent = keep_recent
+        self.tool_output_max_chars = tool_output_max_chars
+        self.summary_max_lines = summary_max_lines
+        self.compactions = 0
+
+    def _summary_line(self, item) -> Optional[str]:
+        kind = getattr(item, "type", None)
+        if kind == "message" and item.role in ("user", "assistant"):
+            return f"- {item.role}: {clip_text(item.text_content or '', 160)}"
+        if kind == "function_call_output":
+            return f"- tool {item.name} -> {clip_text(item.output or '', 120)}"
+        return None
+
+    def _clip_tool_output(self, item):
+        if getattr(item, "type", None) != "function_call_output":
+            return item
+        output = item.output or ""
+        if len(output) <= self.tool_output_max_chars:
+            return item
+        return item.model_copy(update={"output": clip_text(output, self.tool_output_max_chars)})
+
+    def compact(self, chat_ctx: ChatContext) -> bool:
+        """Compact `chat_ctx` in place if it is over budget. Returns True if it changed."""
+        items = chat_ctx.items
+        if estimate_tokens(items) <= self.budget_tokens:
+            return False
+
+        # Instructions stay first and untouched; a previous summary gets folded into the new one.
+        head = []
+        previous_summary: list[str] = []
+        body = []
+        for item in items:
+            if getattr(item, "id", None) == SUMMARY_ID:
+                previous_summary = (item.text_content or "").splitlines()[1:]
+            elif not body and getattr(item, "type", None) == "message" and item.role in ("system", "developer"):
+                head.append(item)
+            else:
+                body.append(item)
+
+        cut = max(len(body) - self.keep_recent, 0)
+        # Never keep a tool output whose call was compacted away.
+        while cut < len(body) and getattr(body[cut], "type", None) == "function_call_output":
+            cut += 1
+        old, recent = body[:cut], body[cut:]
+
+        clipped = [self._clip_tool_output(item) for item in recent]
+        if not old and all(a is b for a, b in zip(clipped, recent)):
+            return False
+
+        lines = previous_summary + [line for line in map(self._summary_line, old) if line]
+        lines = lines[-self.summary_max_lines:]
+
+        new_items = list(head)
+        if lines:
+            new_items.append(
+                ChatMessage(id=SUMMARY_ID, role="system", content=["\n".join([SUMMARY_HEADER] + lines)])
+            )
+        new_items.extend(clipped)
+
+        before_items, before_tokens = len(items), estimate_tokens(items)
+        chat_ctx.items[:] = new_items
+        self.compactions += 1
+        logger.info(
+            f"Compacted chat context: {before_items} -> {len(new_items)} items, "
+            f"~{before_tokens} -> ~{estimate_tokens(new_items)} tokens"
+        )
+        return True
@@ -0,0 +1,98 @@
+from datetime import date, timedelta
+from typing import Optional
+import re
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+MONTHS = (
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+)
+_MONTH_ABBREV = {name[:3]: i + 1 for i, name in enumerate(MONTHS)}
+_ORDINAL_WORDS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7,
+    "eighth": 8, "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12, "thirteenth": 13,
+    "fourteenth": 14, "fifteenth": 15, "sixteenth": 16, "seventeenth": 17, "eighteenth": 18,
+    "nineteenth": 19, "twentieth": 20, "thirtieth": 30,
+}
+
+_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+_MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*"
+_ISO = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+_MONTH_DAY = re.compile(rf"\b{_MONTH}\s+(?:the\s+)?{_DAY}\b")
+_DAY_MONTH = re.compile(rf"\b(?:the\s+)?{_DAY}\s+(?:of\s+)?{_MONTH}\b")
+_BARE_DAY = re.compile(rf"\bthe\s+{_DAY}\b")
+
+# Words that mean the caller named a date we might not understand.
+DATE_HINTS = set(WEEKDAYS) | set(MONTHS) | set(_MONTH_ABBREV) | {
+    "today", "tomorrow", "tonight", "week", "weekend", "month", "next", "this", "day",
+} | set(_ORDINAL_WORDS)
+
+
+def _upcoming(today: date, month: int, day: int) -> Optional[date]:
+    """The next occurrence of month/day on or after today."""
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            return None
+        if candidate >= today:
+            return candidate
+    return None
+
+
+def parse_date(text: str, today: Optional[date] = None) -> Optional[date]:
+    """Resolve the single date named in `text`, or None if there isn't exactly one we're sure of.
+
+    Handles ISO dates, "today", "tomorrow", "day after tomorrow", weekday
+    names (with "this"/"next"), "October 20", "20th of October", "the 20th"
+    and "the twentieth". Anything ambiguous returns None so callers can fall
+    back to something smarter.
+    """
+    today = today or date.today()
+    text = text.lower()
+    found: list[date] = []
+
+    for m in _ISO.finditer(text):
+        try:
+            found.append(date(int(m.group(1)), int(m.group(2)), int(m.group(3))))
+        except ValueError:
+            return None
+
+    if "day after tomorrow" in text:
+        found.append(today + timedelta(days=2))
+    elif re.search(r"\btomorrow\b", text):
+        found.append(today + timedelta(days=1))
+    if re.search(r"\b(today|tonight)\b", text):
+        found.append(today)
+
+    for i, name in enumerate(WEEKDAYS):
+        m = re.search(rf"\b(next\s+)?{name}s?\b", text)
+        if m:
+            ahead = (i - today.weekday()) % 7
+            if m.group(1) and ahead == 0:
+                ahead = 7
+            found.append(today + timedelta(days=ahead))
+
+    month_matches = [(m.group(1), m.group(2)) for m in _MONTH_DAY.finditer(text)]
+    month_matches += [(m.group(2), m.group(1)) for m in _DAY_MONTH.finditer(text)]
+    for month, day in month_matches:
+        resolved = _upcoming(today, _MONTH_ABBREV[month[:3]], int(day))
+        if resolved is None:
+            return None
+        found.append(resolved)
+
+    if not month_matches:
+        days = [int(m.group(1)) for m in _BARE_DAY.finditer(text)]
+        days += [n for word, n in _ORDINAL_WORDS.items() if re.search(rf"\bthe\s+{word}\b", text)]
+        for day in days:
+            # "the 5th" means this month's 5th unless it has passed, then next month's.
+            year, month = today.year, today.month
+            if day < today.day:
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            try:
+                found.append(date(year, month, day))
+            except ValueError:
+                return None
+
+    unique = set(found)
+    return unique.pop() if len(unique) == 1 else None
@@ -0,0 +1,195 @@
+from datetime import date
+from typing import Optional
+import logging
+import re
+import time
+
+from conversation.compaction import clip_text
+from conversation.dates import DATE_HINTS, parse_date
+from telemetry.metrics import get_registry
+from telemetry.tracing import LLM_DURATION
+
+logger = logging.getLogger("conversation.fast_path")
+
+FAST_PATH_TURNS = get_registry().counter(
+    "voice_fast_path_turns_total", "User turns answered without the LLM, by intent."
+)
+FAST_PATH_MISSES = get_registry().counter(
+    "voice_fast_path_misses_total", "User turns handed to the LLM by the fast path."
+)
+FAST_PATH_SAVED = get_registry().counter(
+    "voice_fast_path_saved_seconds_total",
+    "Estimated LLM time skipped by the fast path (median LLM duration x hops avoided, minus handling time).",
+)
+FAST_PATH_DURATION = get_registry().histogram(
+    "voice_fast_path_handle_seconds", "Time the fast path took to answer a turn itself."
+)
+
+_DIGIT_WORDS = {
+    "zero": "0", "oh": "0", "o": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+}
+_PHONE_FILLER = {
+    "my", "number", "phone", "is", "it", "its", "it's", "the", "uh", "um", "and", "yes", "yeah",
+    "sure", "okay", "ok", "so", "plus", "double", "triple",
+}
+_PHONE_WORDS = {"number", "phone", "cell", "mobile"}
+# Digits said with any of these are times or dates ("10 30 or 11"), not a phone number.
+_TIME_WORDS = {
+    "am", "pm", "oclock", "o'clock", "at", "to", "till", "until", "or", "from", "between",
+    "half", "quarter", "past", "noon", "morning", "afternoon", "evening",
+}
+
+_BYE_WORDS = {"bye", "goodbye"}
+# Only words of a closing. No "no"/"nope": "no thanks, bye" may be turning
+# down an offer the agent is waiting on, which the LLM should hear.
+_BYE_FILLER = {
+    "ok", "okay", "alright", "all", "right", "thanks", "thank", "you", "so", "much",
+    "that's", "thats", "it", "for", "now", "great", "perfect", "then", "bye", "goodbye", "good",
+    "have", "a", "nice", "day", "see", "ya",
+}
+
+_AVAILABILITY_WORDS = {"available", "availability", "open", "free", "slots", "slot", "openings", "times"}
+_QUESTION_WORDS = {
+    "what", "what's", "whats", "when", "which", "any", "anything", "do", "are", "is",
+    "show", "tell", "got", "have",
+}
+# Anything that needs the LLM's judgement: bookings, changes, or the caller's own appointments.
+_NEEDS_LLM = {
+    "book", "booking", "schedule", "reschedule", "cancel", "change", "move", "modify",
+    "my", "appointment", "appointments", "not", "don't", "dont", "instead", "but",
+}
+_MAX_WORDS = 16
+
+
+def _words(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+class Intent:
+    """A turn the fast path is sure about: which tool to run and with what arguments."""
+
+    __slots__ = ("name", "tool", "args", "llm_hops")
+
+    def __init__(self, name: str, tool: str, args: dict, llm_hops: int):
+        self.name = name
+        self.tool = tool
+        self.args = args
+        # LLM calls the normal path would have made: pick the tool, then phrase its result.
+        self.llm_hops = llm_hops
+
+    def __repr__(self) -> str:
+        return f"Intent({self.name!r}, {self.args!r})"
+
+
+def _phone_digits(words: list[str], identified: bool) -> Optional[str]:
+    """The phone number in a turn that is nothing but one, or None.
+
+    Once the caller is identified, digits alone are more likely times or
+    dates, so the turn must also say it's a number ("my number is ...").
+    Runs of one- and two-digit groups without that ("10 30 11 30") read
+    as clock times and are left to the LLM too.
+    """
+    vocabulary = set(words)
+    if vocabulary & (_TIME_WORDS | DATE_HINTS):
+        return None
+    said_phone = bool(vocabulary & _PHONE_WORDS)
+    if identified and not said_phone:
+        return None
+    groups = [word for word in words if word.isdigit()]
+    if not said_phone and len(groups) >= 2 and all(len(group) <= 2 for group in groups):
+        return None
+    digits = []
+    for word in words:
+        if word.isdigit():
+            digits.append(word)
+        elif word in _DIGIT_WORDS:
+            digits.append(_DIGIT_WORDS[word])
+        elif word not in _PHONE_FILLER and word not in _PHONE_WORDS:
+            return None
+    number = "".join(digits)
+    return number if 7 <= len(number) <= 15 else None
+
+
+def classify(
+    text: str, today: Optional[date] = None, identified: bool = False, booking: bool = False
+) -> Optional[Intent]:
+    """Return an Intent for trivial turns, or None to let the LLM handle it.
+
+    `identified` is whether the caller has given their phone number already,
+    and `booking` whether a booking is in progress (a slot is held for them);
+    every turn then goes to the LLM, which is waiting on the caller's answer
+    and can confirm or release the slot.
+    """
+    words = _words(text)
+    if booking or not words or len(words) > _MAX_WORDS:
+        return None
+    vocabulary = set(words)
+
+    if vocabulary & _BYE_WORDS and vocabulary <= _BYE_FILLER:
+        return Intent("goodbye", "end_conversation", {}, llm_hops=1)
+
+    phone = _phone_digits(words, identified)
+    if phone:
+        return Intent("phone", "identify_user", {"phone_number": phone}, llm_hops=2)
+
+    if vocabulary & _AVAILABILITY_WORDS and vocabulary & _QUESTION_WORDS and not vocabulary & _NEEDS_LLM:
+        day = parse_date(text, today)
+        if day is not None:
+            return Intent("availability", "fetch_slots", {"date": day.isoformat()}, llm_hops=2)
+        # "the 29th" of a month without one still names a date; don't list every day instead.
+        if not vocabulary & DATE_HINTS and not any(c.isdigit() for w in words for c in w):
+            return Intent("availability", "fetch_slots", {}, llm_hops=2)
+    return None
+
+
+class FastPathContext:
+    """Stands in for livekit's RunContext when a tool is run outside an LLM tool call."""
+
+    __slots__ = ("session",)
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def userdata(self):
+        return self.session.userdata
+
+
+_SUMMARY_CALLER_TURNS = 6
+
+
+def _session_summary(userdata: dict) -> str:
+    """Summary for a call the fast path ends: its appointments and the caller's last few turns."""
+    lines = ["Caller ended the call."]
+    for profile in (userdata.get("caller_profiles") or {}).values():
+        who = profile.name or profile.phone
+        for row in profile.appointments.values():
+            lines.append(f"{who}: {row.get('date')} {str(row.get('time'))[:5]} ({row.get('status')}).")
+    history = userdata.get("history")
+    if history is not None:
+        said = [turn.content for turn in history if turn.role == "user"]
+        if said:
+            lines.append("Caller said: " + " / ".join(clip_text(text, 80) for text in said[-_SUMMARY_CALLER_TURNS:]))
+    return " ".join(lines)
+
+
+def record_handled(intent: Intent, seconds: float) -> None:
+    llm_seconds = LLM_DURATION.quantile(0.5)
+    FAST_PATH_TURNS.inc(1, {"intent": intent.name})
+    FAST_PATH_DURATION.observe(seconds)
+    if llm_seconds is not None:
+        FAST_PATH_SAVED.inc(max(llm_seconds * intent.llm_hops - seconds, 0.0))
+
+
+async def run_intent(intent: Intent, session, tools: dict) -> Optional[str]:
+    """Run the intent's tool directly. Returns the text to speak, or None (call ended)."""
+    started = time.perf_counter()
+    context = FastPathContext(session)
+    args = dict(intent.args)
+    if intent.tool == "end_conversation":
+        args["summary"] = _session_summary(session.userdata)
+    result = await tools[intent.tool](context, **args)
+    record_handled(intent, time.perf_counter() - started)
+    logger.info(f"Fast path handled {intent!r} in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return None if intent.tool == "end_conversation" else result
@@ -0,0 +1,51 @@
+from collections import deque
+from typing import Iterator
+import time
+
+
+class Turn:
+    """One committed utterance. Slotted to keep long calls cheap to hold."""
+
+    __slots__ = ("role", "content", "at")
+
+    def __init__(self, role: str, content: str, at: float):
+        self.role = role
+        self.content = content
+        self.at = at
+
+    def __repr__(self) -> str:
+        return f"Turn({self.role!r}, {self.content[:40]!r})"
+
+
+class ConversationHistory:
+    """Ring buffer of the last `max_turns` turns of a call.
+
+    Consecutive duplicates from the same speaker are dropped, since the
+    session can report the same committed speech more than once.
+    """
+
+    def __init__(self, max_turns: int):
+        self._turns: deque[Turn] = deque(maxlen=max_turns)
+        self.dropped = 0
+
+    def append(self, role: str, content: str) -> bool:
+        """Record a turn. Returns False if it was a duplicate of the previous one."""
+        if self._turns:
+            last = self._turns[-1]
+            if last.role == role and last.content == content:
+                return False
+        if len(self._turns) == self._turns.maxlen:
+            self.dropped += 1
+        self._turns.append(Turn(role, content, time.time()))
+        return True
+
+    def recent(self, n: int) -> list[Turn]:
+        if n <= 0:
+            return []
+        return list(self._turns)[-n:]
+
+    def __iter__(self) -> Iterator[Turn]:
+        return iter(self._turns)
+
+    def __len__(self) -> int:
+        return len(self._turns)
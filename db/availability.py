@@ -0,0 +1,378 @@
+from datetime import date as date_cls, datetime, timedelta
+from typing import Optional
+import asyncio
+import logging
+import threading
+import time
+
+from config import (
+    AVAILABILITY_INDEX_DAYS,
+    AVAILABILITY_MAX_STALENESS_SECONDS,
+    AVAILABILITY_GAP_GRACE_SECONDS,
+    AVAILABILITY_CATCHUP_LIMIT,
+    AVAILABILITY_RESYNC_SECONDS,
+)
+from db.change_feed import get_change_feed
+from db.repository import get_repository
+from db.slot_cache import same_time
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("db.availability")
+
+AVAILABILITY_CHANGES = get_registry().counter(
+    "voice_availability_changes_total", "Slot changes applied to the availability index, by source."
+)
+AVAILABILITY_GAPS = get_registry().counter(
+    "voice_availability_gaps_total", "Catch-ups from the change log after missed feed messages or a reconnect."
+)
+AVAILABILITY_RESYNCS = get_registry().counter(
+    "voice_availability_resyncs_total", "Full reloads of the availability index, by reason."
+)
+
+
+def _epoch(value) -> Optional[float]:
+    # SQLite stores epoch seconds; PostgREST returns timestamptz as ISO 8601.
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+class AvailabilityIndex:
+    """Every slot in a date window with its latest known state.
+
+    Entries are (seq, slot); a change replaces an entry only if its seq is
+    higher, so changes may arrive in any order and more than once. Holds are
+    checked against the clock when reading, so an expired hold frees its
+    slot without a change of its own. The sync writes it from the background
+    services loop while calls read it from their own threads, hence the lock.
+    """
+
+    def __init__(self):
+        self.start_date: Optional[str] = None
+        self.end_date: Optional[str] = None
+        self._by_date: dict[str, dict[str, tuple[int, dict]]] = {}
+        # Changes that arrived before the first snapshot; applied on top of it.
+        self._early: list[dict] = []
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.start_date is not None
+
+    def covers(self, date: str) -> bool:
+        return self.loaded and self.start_date <= date <= self.end_date
+
+    def load(self, slots: list[dict], start_date: str, end_date: str) -> None:
+        """Replace the window with a snapshot, keeping entries that are newer than it."""
+        with self._lock:
+            self._load(slots, start_date, end_date)
+
+    def _load(self, slots: list[dict], start_date: str, end_date: str) -> None:
+        by_date: dict[str, dict[str, tuple[int, dict]]] = {}
+        for slot in slots:
+            by_date.setdefault(str(slot["date"]), {})[str(slot["time"])[:5]] = (
+                int(slot.get("seq") or 0),
+                self._entry(slot),
+            )
+        for date, entries in self._by_date.items():
+            if not (start_date <= date <= end_date):
+                continue
+            for key, (seq, slot) in entries.items():
+                current = by_date.setdefault(date, {}).get(key)
+                if current is None or current[0] < seq:
+                    by_date[date][key] = (seq, slot)
+        self._by_date = by_date
+        self.start_date, self.end_date = start_date, end_date
+        early, self._early = self._early, []
+        for change in early:
+            self._apply(change)
+
+    def _entry(self, row: dict) -> dict:
+        return {
+            "date": str(row["date"]),
+            "time": str(row["time"]),
+            "display": row.get("display"),
+            "is_booked": bool(row.get("is_booked")),
+            "held_until": _epoch(row.get("held_until")),
+        }
+
+    def apply(self, change: dict) -> bool:
+        """Apply one slot_changes row; False if it is outside the window or not newer than what we have."""
+        with self._lock:
+            return self._apply(change)
+
+    def _apply(self, change: dict) -> bool:
+        if not self.loaded:
+            self._early.append(change)
+            return False
+        date = str(change["date"])
+        if not self.covers(date):
+            return False
+        seq = int(change["seq"])
+        entries = self._by_date.setdefault(date, {})
+        key = str(change["time"])[:5]
+        current = entries.get(key)
+        if current is not None and current[0] >= seq:
+            return False
+        entries[key] = (seq, self._entry(change))
+        return True
+
+    def get(self, date: Optional[str]) -> Optional[list[dict]]:
+        """Open slots for `date` (or the whole window for None), or None if the date isn't covered."""
+        with self._lock:
+            return self._get(date)
+
+    def _get(self, date: Optional[str]) -> Optional[list[dict]]:
+        if date is not None and not self.covers(date):
+            return None
+        if not self.loaded:
+            return None
+        now = time.time()
+        dates = [date] if date is not None else sorted(self._by_date)
+        open_slots = []
+        for day in dates:
+            for _, slot in sorted(self._by_date.get(day, {}).values(), key=lambda e: e[1]["time"]):
+                if slot["is_booked"] or (slot["held_until"] is not None and slot["held_until"] > now):
+                    continue
+                open_slots.append(slot)
+        return open_slots
+
+    def mark_booked(self, date: str, time_: str) -> None:
+        """Hide a slot this worker just took; the feed's own change for it follows."""
+        with self._lock:
+            for key, (seq, slot) in self._by_date.get(date, {}).items():
+                if same_time(slot["time"], time_):
+                    self._by_date[date][key] = (seq, dict(slot, is_booked=True))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._by_date.values())
+
+
+class AvailabilitySync:
+    """Keeps an AvailabilityIndex current from the slot change feed.
+
+    On start it subscribes to the feed, then loads a snapshot, so nothing
+    between the two is lost. Every change carries a seq. `seq` is the point
+    up to which every change has been applied. A change further ahead means
+    some were missed (or are still committing); if the hole is still there
+    after `gap_grace` seconds, or the feed reconnects, the missing rows are
+    read from the change log. Catch-ups that start past our seq (the log was
+    pruned) or that hit `catchup_limit` reload the snapshot instead, as does
+    every `resync_interval`.
+
+    Reads are served only while that bounds staleness: while the feed is
+    connected and has no unfilled hole, or for `max_staleness` seconds
+    after either stops being true.
+
+    It runs for the life of the process on the background services loop,
+    started from prewarm; `get` and `mark_booked` may be called from any
+    job's thread.
+    """
+
+    def __init__(
+        self,
+        feed,
+        repository,
+        *,
+        days: int,
+        max_staleness: float,
+        gap_grace: float,
+        catchup_limit: int,
+        resync_interval: float,
+    ):
+        self.feed = feed
+        self.repository = repository
+        self.days = days
+        self.max_staleness = max_staleness
+        self.gap_grace = gap_grace
+        self.catchup_limit = catchup_limit
+        self.resync_interval = resync_interval
+        self.index = AvailabilityIndex()
+        self.seq = 0
+        self.connected = False
+        self.hits = 0
+        self.misses = 0
+        self._ahead: set[int] = set()
+        self._gap_since: Optional[float] = None
+        self._disconnected_at: Optional[float] = time.monotonic()
+        self._catch_up_needed = False
+        self._resynced_at: Optional[float] = None
+        self._loaded = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Subscribe and load the index; returns once the first snapshot is in."""
+        if self._task is None or self._task.done():
+            await self.feed.start(self._on_change, self._on_status)
+            self._task = asyncio.create_task(self._run(), name="availability_sync")
+        await self._loaded.wait()
+
+    def _on_status(self, connected: bool) -> None:
+        if connected and not self.connected:
+            self._disconnected_at = None
+            self._catch_up_needed = self.index.loaded
+            self._wakeup.set()
+        elif not connected and self.connected:
+            self._disconnected_at = time.monotonic()
+            logger.warning("Slot change feed disconnected")
+        self.connected = connected
+
+    def _on_change(self, change: dict) -> None:
+        self._apply(change, "feed")
+        if self._ahead and self._gap_since is None:
+            self._gap_since = time.monotonic()
+            self._wakeup.set()
+
+    def _apply(self, change: dict, via: str) -> None:
+        # Even changes at or below seq are applied: one that committed late is still news for its slot.
+        if self.index.apply(change):
+            AVAILABILITY_CHANGES.inc(1, {"via": via})
+        seq = int(change["seq"])
+        if seq > self.seq:
+            self._ahead.add(seq)
+            while self.seq + 1 in self._ahead:
+                self.seq += 1
+                self._ahead.discard(self.seq)
+        if not self._ahead:
+            self._gap_since = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._step()
+            except Exception as e:
+                logger.warning(f"Availability sync failed: {type(e).__name__}: {e}")
+                await asyncio.sleep(self.max_staleness)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_wakeup())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _next_wakeup(self) -> float:
+        waits = [self.resync_interval - (time.monotonic() - self._resynced_at)]
+        if self._gap_since is not None:
+            waits.append(self.gap_grace - (time.monotonic() - self._gap_since))
+        return max(min(waits), 0.0)
+
+    async def _step(self) -> None:
+        now = time.monotonic()
+        window_start = date_cls.today().isoformat()
+        if (
+            self._resynced_at is None
+            or now - self._resynced_at >= self.resync_interval
+            or self.index.start_date != window_start
+        ):
+            await self.resync("interval" if self._resynced_at is not None else "start")
+        elif self._catch_up_needed or (self._gap_since is not None and now - self._gap_since >= self.gap_grace):
+            await self.catch_up()
+
+    async def resync(self, reason: str) -> None:
+        today = date_cls.today()
+        start = today.isoformat()
+        end = (today + timedelta(days=self.days - 1)).isoformat()
+        started = time.perf_counter()
+        snapshot = await self.repository.availability_snapshot(start, end)
+        self.index.load(snapshot["slots"], start, end)
+        self._advance_to(int(snapshot["seq"]))
+        self._catch_up_needed = False
+        self._resynced_at = time.monotonic()
+        self._loaded.set()
+        AVAILABILITY_RESYNCS.inc(1, {"reason": reason})
+        logger.info(
+            f"Loaded {len(self.index)} slots for {start}..{end} at seq {self.seq} ({reason}) "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    async def catch_up(self) -> None:
+        AVAILABILITY_GAPS.inc()
+        changes = await self.repository.list_slot_changes(self.seq, self.catchup_limit)
+        if len(changes) >= self.catchup_limit or (changes and int(changes[0]["seq"]) > self.seq + 1):
+            await self.resync("behind")
+            return
+        for change in changes:
+            self._apply(change, "catch_up")
+        # The log is the truth: a seq it doesn't have was rolled back or is still committing,
+        # and if the latter, the feed delivers it and the per-slot seq check keeps it.
+        self._advance_to(max([self.seq, *(int(c["seq"]) for c in changes)]))
+        self._catch_up_needed = False
+
+    def _advance_to(self, seq: int) -> None:
+        self.seq = max(self.seq, seq)
+        self._ahead = {s for s in self._ahead if s > self.seq}
+        while self.seq + 1 in self._ahead:
+            self.seq += 1
+            self._ahead.discard(self.seq)
+        if not self._ahead:
+            self._gap_since = None
+
+    def serving(self) -> bool:
+        if not self.index.loaded:
+            return False
+        now = time.monotonic()
+        if self._disconnected_at is not None and now - self._disconnected_at >= self.max_staleness:
+            return False
+        if self._gap_since is not None and now - self._gap_since >= self.max_staleness:
+            return False
+        return True
+
+    def get(self, date: Optional[str]) -> Optional[list[dict]]:
+        """Open slots from the index, or None when it can't answer within the staleness bound."""
+        slots = self.index.get(date) if self.serving() else None
+        if slots is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return slots
+
+    def mark_booked(self, date: str, time_: str) -> None:
+        self.index.mark_booked(date, time_)
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.feed.aclose()
+        self.connected = False
+        self._disconnected_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "seq": self.seq,
+            "slots": len(self.index),
+            "connected": int(self.connected),
+            "serving": int(self.serving()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_availability = None
+
+
+def get_availability() -> AvailabilitySync:
+    """The process's availability index, fed by the configured backend's change feed.
+
+    Started once per process by the background services; see startup/services.py.
+    """
+    global _availability
+    if _availability is None:
+        _availability = AvailabilitySync(
+            get_change_feed(),
+            get_repository(),
+            days=AVAILABILITY_INDEX_DAYS,
+            max_staleness=AVAILABILITY_MAX_STALENESS_SECONDS,
+            gap_grace=AVAILABILITY_GAP_GRACE_SECONDS,
+            catchup_limit=AVAILABILITY_CATCHUP_LIMIT,
+            resync_interval=AVAILABILITY_RESYNC_SECONDS,
+        )
+    return _availability
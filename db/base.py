@@ -0,0 +1,102 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+# Columns list_appointments returns; enough to speak, cancel or move an appointment.
+APPOINTMENT_COLUMNS = ("id", "date", "time", "status")
+
+
+class Repository(ABC):
+    """Storage operations the tools need, independent of the backend.
+
+    `book_appointment`, `move_appointment` and `hold_slot` follow the result
+    contracts of the SQL functions in db/migrations: a dict whose "status"
+    says what happened, plus the affected rows on success.
+    """
+
+    @abstractmethod
+    async def list_open_slots(self, date: Optional[str] = None) -> list[dict]:
+        """Unbooked, unheld slots ordered by date and time, optionally for one date."""
+
+    @abstractmethod
+    async def list_open_slots_between(self, start_date: str, end_date: str) -> list[dict]:
+        """Unbooked, unheld slots with start_date <= date <= end_date, ordered by date and time."""
+
+    @abstractmethod
+    async def book_appointment(
+        self, date: str, time: str, contact_number: str, name: str, holder: Optional[str] = None
+    ) -> dict:
+        """Claim a slot and insert the appointment atomically.
+
+        A slot held by anyone but `holder` is refused with status "held";
+        the holder's own hold is consumed by the booking.
+        """
+
+    @abstractmethod
+    async def move_appointment(
+        self, appointment_id: str, new_date: str, new_time: str, holder: Optional[str] = None
+    ) -> dict:
+        """Release the old slot, claim the new one and update the appointment atomically."""
+
+    @abstractmethod
+    async def hold_slot(self, date: str, time: str, holder: str, ttl_seconds: int) -> dict:
+        """Lease an open slot to `holder` for `ttl_seconds`, replacing the holder's previous hold.
+
+        Status is "held" (asking again extends the lease), "taken" (someone
+        else holds it) or "unavailable" (no such open slot).
+        """
+
+    @abstractmethod
+    async def release_holds(self, holder: str) -> int:
+        """Drop every hold `holder` has; returns how many there were."""
+
+    @abstractmethod
+    async def reap_expired_holds(self) -> int:
+        """Delete holds whose lease has run out; returns how many."""
+
+    @abstractmethod
+    async def availability_snapshot(self, start_date: str, end_date: str) -> dict:
+        """Every slot with start_date <= date <= end_date as of one consistent read.
+
+        Returns {"seq": newest slot_changes seq, "slots": rows}. Each row has
+        date, time, display, is_booked, held_until (hold expiry or None) and
+        seq (of the slot's latest change), like a slot_changes row.
+        """
+
+    @abstractmethod
+    async def list_slot_changes(self, after_seq: int, limit: int) -> list[dict]:
+        """slot_changes rows with seq > after_seq, oldest first, at most `limit`."""
+
+    @abstractmethod
+    async def list_appointments(
+        self,
+        contact_number: str,
+        status: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        """Appointments for a phone number, ordered by date, time and id.
+
+        Only APPOINTMENT_COLUMNS are returned. `status`, `start_date` and
+        `end_date` filter server-side. `after` is the (date, time, id) of the
+        last row of the previous page (a keyset cursor), and `limit` caps the
+        number of rows.
+        """
+
+    @abstractmethod
+    async def cancel_appointment(self, appointment_id: str, known: Optional[dict] = None) -> Optional[dict]:
+        """Mark an appointment cancelled and free its slot.
+
+        `known` is the appointment row if the caller already has it, which lets
+        backends skip reading it again. Returns the appointment as it was
+        before cancelling, or None if it does not exist.
+        """
+
+    @abstractmethod
+    async def insert_call_summaries(self, rows: list[dict]) -> None:
+        """Persist rows into call_summaries with a single multi-row insert."""
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """The cheapest round trip that proves the backend answers; raises if it doesn't."""
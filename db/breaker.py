@@ -0,0 +1,94 @@
+from typing import Optional
+import logging
+import threading
+import time
+
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("db.breaker")
+
+BREAKER_TRANSITIONS = get_registry().counter(
+    "voice_db_breaker_transitions_total", "Circuit breaker state changes, by new state."
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """The storage backend is failing; the call was rejected without being sent."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker around the storage backend.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    are rejected immediately for `reset_timeout` seconds. Then a single probe
+    is let through (half-open): success closes the circuit, failure re-opens it.
+
+    Shared by every loop in the process (the job's and the background
+    services'), so state changes happen under a lock.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Storage circuit {self.state} -> {state}")
+        self.state = state
+        BREAKER_TRANSITIONS.inc(1, {"state": state})
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls would be rejected (open and not yet due for a probe)."""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self._transition(HALF_OPEN)
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            self._transition(CLOSED)
+
+    def release(self) -> None:
+        """Let another probe through after one was abandoned without a result."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "open": int(self.state == OPEN),
+                "half_open": int(self.state == HALF_OPEN),
+                "consecutive_failures": self.failures,
+            }
@@ -0,0 +1,96 @@
+from typing import Callable, Optional
+import asyncio
+import logging
+
+from config import STORAGE_BACKEND
+from db.local import LocalDatabase, get_local_database
+from db.supabase import get_supabase
+
+logger = logging.getLogger("db.change_feed")
+
+# on_change gets one slot_changes row; on_status gets True when the feed is
+# (re)subscribed and False when it drops.
+OnChange = Callable[[dict], None]
+OnStatus = Callable[[bool], None]
+
+
+class LocalChangeFeed:
+    """slot_changes from the local database's in-process publisher; always connected.
+
+    The database publishes from whichever thread wrote to it, usually a
+    job's; changes are handed to `on_change` on the loop that started the
+    feed, in the order they were published.
+    """
+
+    def __init__(self, db: LocalDatabase):
+        self.db = db
+        self._unsubscribe: Optional[Callable[[], None]] = None
+
+    async def start(self, on_change: OnChange, on_status: OnStatus) -> None:
+        if self._unsubscribe is None:
+            loop = asyncio.get_running_loop()
+            self._unsubscribe = self.db.subscribe(lambda change: loop.call_soon_threadsafe(on_change, change))
+        on_status(True)
+
+    async def aclose(self) -> None:
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+
+def _record(payload: dict) -> Optional[dict]:
+    # realtime-py has delivered the inserted row under a few different shapes.
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else payload
+    return data.get("record") or data.get("new") or payload.get("new")
+
+
+class SupabaseChangeFeed:
+    """Inserts into public.slot_changes over Supabase realtime.
+
+    The realtime client reconnects and rejoins the channel by itself; each
+    rejoin reports "SUBSCRIBED" again, which is when the listener catches up
+    on what it missed.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._channel = None
+
+    async def start(self, on_change: OnChange, on_status: OnStatus) -> None:
+        if self._channel is not None:
+            return
+        self._client = await get_supabase()
+
+        def changed(payload):
+            record = _record(payload)
+            if record is not None:
+                on_change(record)
+
+        def status(state, error=None):
+            value = getattr(state, "value", state)
+            if error is not None:
+                logger.warning(f"slot_changes feed {value}: {error}")
+            on_status(value == "SUBSCRIBED")
+
+        self._channel = self._client.channel("slot_changes")
+        self._channel.on_postgres_changes(
+            "INSERT", schema="public", table="slot_changes", callback=changed
+        )
+        await self._channel.subscribe(status)
+
+    async def aclose(self) -> None:
+        if self._channel is not None:
+            try:
+                await self._client.remove_channel(self._channel)
+            except Exception as e:
+                logger.debug(f"Closing slot_changes feed failed: {e}")
+            self._channel = None
+
+
+def get_change_feed():
+    """A new change feed for the configured STORAGE_BACKEND."""
+    if STORAGE_BACKEND == "local":
+        return LocalChangeFeed(get_local_database())
+    if STORAGE_BACKEND == "supabase":
+        return SupabaseChangeFeed()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import Optional
+import logging
+
+from db.base import Repository
+from db.resilience import is_transient
+from db.wal import WriteAheadLog
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("db.fallback")
+
+# Distinct read results kept for degraded mode, least recently refreshed dropped first.
+LAST_KNOWN_MAX_ENTRIES = 256
+
+DEGRADED_CALLS = get_registry().counter(
+    "voice_db_degraded_total", "Repository calls answered in degraded mode, by operation and how."
+)
+
+
+class FallbackRepository(Repository):
+    """Keeps tools answering while the storage backend is failing.
+
+    Successful reads are remembered per query; if a read later fails
+    transiently (the circuit is open, or the call timed out or hit a
+    connection or server error) the last-known result is served instead.
+    Writes that replay to the same end state — call summaries and
+    cancellations — are appended to the durable write-ahead log and
+    reported as done. A request the backend rejected (see `is_transient`)
+    would fail the same way on replay, so it propagates like any other
+    error. Bookings, moves and holds need the backend to check the slot, so
+    their failures always propagate to the tool.
+    """
+
+    def __init__(self, inner: Repository, wal: WriteAheadLog):
+        self.inner = inner
+        self.wal = wal
+        self._last_known: "OrderedDict[tuple, list[dict]]" = OrderedDict()
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    async def _read(self, op: str, key: tuple, call):
+        try:
+            rows = await call()
+        except Exception as e:
+            stale = self._last_known.get((op,) + key)
+            if stale is None or not is_transient(e):
+                raise
+            DEGRADED_CALLS.inc(1, {"op": op, "via": "last_known"})
+            logger.warning(f"Serving last-known {op}{key} after {type(e).__name__}: {e}")
+            return list(stale)
+        self._last_known[(op,) + key] = rows
+        self._last_known.move_to_end((op,) + key)
+        while len(self._last_known) > LAST_KNOWN_MAX_ENTRIES:
+            self._last_known.popitem(last=False)
+        return rows
+
+    async def list_open_slots(self, date: Optional[str] = None) -> list[dict]:
+        return await self._read("list_open_slots", (date,), lambda: self.inner.list_open_slots(date))
+
+    async def list_open_slots_between(self, start_date: str, end_date: str) -> list[dict]:
+        return await self._read(
+            "list_open_slots_between",
+            (start_date, end_date),
+            lambda: self.inner.list_open_slots_between(start_date, end_date),
+        )
+
+    async def book_appointment(
+        self, date: str, time: str, contact_number: str, name: str, holder: Optional[str] = None
+    ) -> dict:
+        return await self.inner.book_appointment(date, time, contact_number, name, holder)
+
+    async def move_appointment(
+        self, appointment_id: str, new_date: str, new_time: str, holder: Optional[str] = None
+    ) -> dict:
+        return await self.inner.move_appointment(appointment_id, new_date, new_time, holder)
+
+    async def hold_slot(self, date: str, time: str, holder: str, ttl_seconds: int) -> dict:
+        return await self.inner.hold_slot(date, time, holder, ttl_seconds)
+
+    async def release_holds(self, holder: str) -> int:
+        return await self.inner.release_holds(holder)
+
+    async def reap_expired_holds(self) -> int:
+        return await self.inner.reap_expired_holds()
+
+    async def availability_snapshot(self, start_date: str, end_date: str) -> dict:
+        # No last-known answer: the availability index keeps its own copy and stops serving instead.
+        return await self.inner.availability_snapshot(start_date, end_date)
+
+    async def list_slot_changes(self, after_seq: int, limit: int) -> list[dict]:
+        return await self.inner.list_slot_changes(after_seq, limit)
+
+    async def list_appointments(
+        self,
+        contact_number: str,
+        status: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        return await self._read(
+            "list_appointments",
+            (contact_number, status, start_date, end_date, after, limit),
+            lambda: self.inner.list_appointments(
+                contact_number, status, start_date, end_date, after, limit
+            ),
+        )
+
+    async def cancel_appointment(self, appointment_id: str, known: Optional[dict] = None) -> Optional[dict]:
+        try:
+            return await self.inner.cancel_appointment(appointment_id, known=known)
+        except Exception as e:
+            # Without the row we can't tell the caller what was cancelled, or whether it exists.
+            if not known or not is_transient(e):
+                raise
+            self.wal.append("cancel_appointment", {"appointment_id": appointment_id})
+            DEGRADED_CALLS.inc(1, {"op": "cancel_appointment", "via": "wal"})
+            logger.warning(f"Deferred cancel of {appointment_id} after {type(e).__name__}: {e}")
+            return known
+
+    async def insert_call_summaries(self, rows: list[dict]) -> None:
+        try:
+            await self.inner.insert_call_summaries(rows)
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            self.wal.append("insert_call_summaries", {"rows": rows})
+            DEGRADED_CALLS.inc(1, {"op": "insert_call_summaries", "via": "wal"})
+            logger.warning(f"Deferred {len(rows)} call summaries after {type(e).__name__}: {e}")
+
+    async def ping(self) -> None:
+        await self.inner.ping()
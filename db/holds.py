@@ -0,0 +1,71 @@
+from typing import Optional
+import asyncio
+import logging
+
+from config import SLOT_HOLD_REAP_INTERVAL_SECONDS
+from db.repository import get_repository
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("db.holds")
+
+HOLDS_REAPED = get_registry().counter(
+    "voice_slot_holds_reaped_total", "Expired slot holds deleted by the background reaper."
+)
+
+
+class HoldReaper:
+    """Background task that deletes expired slot holds every `interval` seconds.
+
+    Expired holds are already ignored by availability and booking, so this
+    only keeps the table small. Every worker process runs one on its
+    background services loop, and a pass that fails (the backend is down)
+    is simply tried again next interval.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.reaped = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.debug(f"Hold reaper pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def reap(self) -> int:
+        """Delete expired holds now. Returns how many were removed."""
+        removed = await get_repository().reap_expired_holds()
+        if removed:
+            self.reaped += removed
+            HOLDS_REAPED.inc(removed)
+            logger.info(f"Reaped {removed} expired slot holds")
+        return removed
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"reaped": self.reaped}
+
+
+_hold_reaper = None
+
+
+def get_hold_reaper() -> HoldReaper:
+    global _hold_reaper
+    if _hold_reaper is None:
+        _hold_reaper = HoldReaper(SLOT_HOLD_REAP_INTERVAL_SECONDS)
+    return _hold_reaper
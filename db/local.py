@@ -0,0 +1,585 @@
+from datetime import date as date_cls, datetime, timedelta
+from typing import Callable, Optional
+import asyncio
+import json
+import random
+import sqlite3
+import threading
+
+from config import LOCAL_DB_PATH, LOCAL_DB_SEED_DAYS
+from db.base import APPOINTMENT_COLUMNS, Repository
+
+# Local SQLite stand-in for the Supabase tables. It mirrors the columns the
+# tools use and implements the same database-side procedures as the SQL
+# migrations in db/migrations, so the tools can be exercised offline.
+
+SCHEMA = """
+create table if not exists slots (
+    id integer primary key autoincrement,
+    date text not null,
+    time text not null,
+    is_booked integer not null default 0,
+    display text
+);
+create unique index if not exists slots_date_time on slots (date, time);
+
+create table if not exists appointments (
+    id integer primary key autoincrement,
+    contact_number text,
+    date text,
+    time text,
+    status text,
+    name text,
+    created_at text default current_timestamp
+);
+create index if not exists appointments_contact on appointments (contact_number, date, time, id);
+
+-- expires_at is epoch seconds; holds past it are ignored and reaped.
+create table if not exists slot_holds (
+    date text not null,
+    time text not null,
+    holder text not null,
+    expires_at real not null,
+    created_at text default current_timestamp,
+    primary key (date, time)
+);
+create index if not exists slot_holds_holder on slot_holds (holder);
+
+-- Availability change log, appended by the triggers below (see 006_slot_changes.sql).
+create table if not exists slot_changes (
+    seq integer primary key autoincrement,
+    date text not null,
+    time text not null,
+    display text,
+    is_booked integer not null,
+    held_until real,
+    changed_at text default current_timestamp
+);
+create index if not exists slot_changes_date_time_seq on slot_changes (date, time, seq);
+
+create view if not exists slot_states as
+select
+    s.date,
+    s.time,
+    s.display,
+    (s.is_booked or exists (
+        select 1 from appointments a where a.date = s.date and a.time = s.time and a.status = 'booked'
+    )) as is_booked,
+    (select h.expires_at from slot_holds h where h.date = s.date and h.time = s.time) as held_until
+from slots s;
+
+create trigger if not exists slots_record_change after insert on slots begin
+    insert into slot_changes (date, time, display, is_booked, held_until)
+    select date, time, display, is_booked, held_until from slot_states where date = new.date and time = new.time;
+end;
+create trigger if not exists slots_record_update after update of is_booked, display on slots begin
+    insert into slot_changes (date, time, display, is_booked, held_until)
+    select date, time, display, is_booked, held_until from slot_states where date = new.date and time = new.time;
+end;
+create trigger if not exists slot_holds_record_insert after insert on slot_holds begin
+    insert into slot_changes (date, time, display, is_booked, held_until)
+    select date, time, display, is_booked, held_until from slot_states where date = new.date and time = new.time;
+end;
+create trigger if not exists slot_holds_record_delete after delete on slot_holds begin
+    insert into slot_changes (date, time, display, is_booked, held_until)
+    select date, time, display, is_booked, held_until from slot_states where date = old.date and time = old.time;
+end;
+create trigger if not exists appointments_record_insert after insert on appointments begin
+    insert into slot_changes (date, time, display, is_booked, held_until)
+    select date, time, display, is_booked, held_until from slot_states where date = new.date and time = new.time;
+end;
+create trigger if not exists appointments_record_update after update of date, time, status on appointments begin
+    insert into slot_changes (date, time, display, is_booked, held_until)
+    select date, time, display, is_booked, held_until from slot_states
+    where (date = old.date and time = old.time) or (date = new.date and time = new.time);
+end;
+
+create table if not exists call_summaries (
+    id integer primary key autoincrement,
+    summary text,
+    cost_breakdown text,
+    created_at text default current_timestamp
+);
+"""
+
+
+def _normalize_time(value: str) -> str:
+    # Postgres `time` columns round-trip as "HH:MM:SS"; tools send "HH:MM".
+    return value if len(value) != 5 else f"{value}:00"
+
+
+# Slots that are unbooked and not under someone's unexpired hold; takes the current epoch time.
+OPEN_SLOT_FILTER = (
+    "is_booked = 0 and not exists (select 1 from slot_holds h "
+    "where h.date = slots.date and h.time = slots.time and h.expires_at > ?)"
+)
+
+
+def _now() -> float:
+    return datetime.now().timestamp()
+
+
+def _display(day: date_cls, hour: int, minute: int) -> str:
+    stamp = datetime(day.year, day.month, day.day, hour, minute)
+    return stamp.strftime("%A, %B %d at %I:%M %p").replace(" 0", " ")
+
+
+class LocalDatabase:
+    """SQLite-backed copy of the slots/appointments/slot_holds/call_summaries tables.
+
+    Also stands in for the realtime feed on slot_changes: after each write,
+    the changes it logged are passed to every `subscribe`d callback, in seq
+    order, on the writing thread. Only writers in this process are seen.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._conn.executescript(SCHEMA)
+        self._subscribers: list[Callable[[dict], None]] = []
+        self._published = self._conn.execute(
+            "select coalesce(max(seq), 0) from slot_changes"
+        ).fetchone()[0]
+
+    def subscribe(self, callback: Callable[[dict], None]) -> Callable[[], None]:
+        """Call `callback` with every slot_changes row written from now on; returns an unsubscribe function."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def _publish(self) -> None:
+        if not self._subscribers:
+            return
+        with self._lock:
+            changes = self._rows(
+                self._conn.execute(
+                    "select * from slot_changes where seq > ? order by seq", (self._published,)
+                )
+            )
+        if changes:
+            self._published = changes[-1]["seq"]
+        for change in changes:
+            for callback in list(self._subscribers):
+                callback(change)
+
+    def _rows(self, cursor: sqlite3.Cursor) -> list[dict]:
+        rows = []
+        for row in cursor.fetchall():
+            item = dict(row)
+            if "is_booked" in item:
+                item["is_booked"] = bool(item["is_booked"])
+            rows.append(item)
+        return rows
+
+    def seed_slots(
+        self,
+        days: int = 7,
+        start: Optional[date_cls] = None,
+        start_hour: int = 9,
+        end_hour: int = 17,
+        step_minutes: int = 30,
+    ) -> int:
+        """Insert open slots for the next `days` days. Returns how many were added."""
+        start = start or date_cls.today()
+        rows = []
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            minutes = start_hour * 60
+            while minutes < end_hour * 60:
+                hour, minute = divmod(minutes, 60)
+                rows.append(
+                    (day.isoformat(), f"{hour:02d}:{minute:02d}:00", _display(day, hour, minute))
+                )
+                minutes += step_minutes
+        with self._lock:
+            cur = self._conn.executemany(
+                "insert or ignore into slots (date, time, is_booked, display) values (?, ?, 0, ?)",
+                rows,
+            )
+        self._publish()
+        return cur.rowcount
+
+    def list_open_slots(self, date: Optional[str] = None) -> list[dict]:
+        sql = f"select * from slots where {OPEN_SLOT_FILTER}"
+        params: tuple = (_now(),)
+        if date:
+            sql += " and date = ?"
+            params += (date,)
+        with self._lock:
+            return self._rows(self._conn.execute(sql + " order by date, time", params))
+
+    def list_open_slots_between(self, start_date: str, end_date: str) -> list[dict]:
+        with self._lock:
+            return self._rows(
+                self._conn.execute(
+                    f"select * from slots where {OPEN_SLOT_FILTER} and date between ? and ? "
+                    "order by date, time",
+                    (_now(), start_date, end_date),
+                )
+            )
+
+    def list_appointments(
+        self,
+        contact_number: str,
+        status: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        sql = f"select {', '.join(APPOINTMENT_COLUMNS)} from appointments where contact_number = ?"
+        params: list = [contact_number]
+        if status:
+            sql += " and status = ?"
+            params.append(status)
+        if start_date:
+            sql += " and date >= ?"
+            params.append(start_date)
+        if end_date:
+            sql += " and date <= ?"
+            params.append(end_date)
+        if after:
+            sql += " and (date, time, id) > (?, ?, ?)"
+            params.extend(after)
+        sql += " order by date, time, id"
+        if limit:
+            sql += " limit ?"
+            params.append(limit)
+        with self._lock:
+            return self._rows(self._conn.execute(sql, params))
+
+    def cancel_appointment(self, appointment_id) -> Optional[dict]:
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                row = self._conn.execute(
+                    "select date, time, status from appointments where id = ?", (appointment_id,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("rollback")
+                    return None
+                appointment = dict(row)
+                if appointment["status"] == "cancelled":
+                    self._conn.execute("rollback")
+                    return appointment
+                self._conn.execute(
+                    "update appointments set status = 'cancelled' where id = ?", (appointment_id,)
+                )
+                if appointment["date"] and appointment["time"]:
+                    self._conn.execute(
+                        "update slots set is_booked = 0 where date = ? and time = ?",
+                        (appointment["date"], appointment["time"]),
+                    )
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+        self._publish()
+        return appointment
+
+    def ping(self) -> None:
+        with self._lock:
+            self._conn.execute("SELECT 1").fetchone()
+
+    def insert_call_summaries(self, rows: list[dict]) -> None:
+        # cost_breakdown is jsonb in Postgres; SQLite stores the JSON text.
+        values = [
+            (
+                row.get("summary"),
+                json.dumps(row["cost_breakdown"]) if row.get("cost_breakdown") is not None else None,
+            )
+            for row in rows
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "insert into call_summaries (summary, cost_breakdown) values (?, ?)", values
+            )
+
+    def _held_by_other(self, date: str, time: str, holder: Optional[str]) -> bool:
+        row = self._conn.execute(
+            "select holder from slot_holds where date = ? and time = ? and expires_at > ?",
+            (date, time, _now()),
+        ).fetchone()
+        return row is not None and row["holder"] != holder
+
+    def hold_slot(self, date: str, time: str, holder: str, ttl_seconds: float) -> dict:
+        """Same contract as the `hold_slot` SQL function."""
+        time = _normalize_time(time)
+        now = _now()
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                slot = self._conn.execute(
+                    "select id from slots where date = ? and time = ? and is_booked = 0",
+                    (date, time),
+                ).fetchone()
+                if slot is None:
+                    self._conn.execute("rollback")
+                    return {"status": "unavailable"}
+
+                current = self._conn.execute(
+                    "select holder, expires_at from slot_holds where date = ? and time = ?",
+                    (date, time),
+                ).fetchone()
+                if current is not None and current["holder"] != holder and current["expires_at"] > now:
+                    self._conn.execute("rollback")
+                    return {"status": "taken", "expires_at": current["expires_at"]}
+
+                self._conn.execute(
+                    "delete from slot_holds where holder = ? and not (date = ? and time = ?)",
+                    (holder, date, time),
+                )
+                cur = self._conn.execute(
+                    "insert or replace into slot_holds (date, time, holder, expires_at) "
+                    "values (?, ?, ?, ?) returning *",
+                    (date, time, holder, now + ttl_seconds),
+                )
+                hold = self._rows(cur)[0]
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+        self._publish()
+        return {"status": "held", "hold": hold}
+
+    def release_holds(self, holder: str) -> int:
+        with self._lock:
+            count = self._conn.execute("delete from slot_holds where holder = ?", (holder,)).rowcount
+        self._publish()
+        return count
+
+    def reap_expired_holds(self) -> int:
+        with self._lock:
+            count = self._conn.execute("delete from slot_holds where expires_at <= ?", (_now(),)).rowcount
+        self._publish()
+        return count
+
+    def availability_snapshot(self, start_date: str, end_date: str) -> dict:
+        """Same contract as the `availability_snapshot` SQL function."""
+        with self._lock:
+            seq = self._conn.execute("select coalesce(max(seq), 0) from slot_changes").fetchone()[0]
+            slots = self._rows(
+                self._conn.execute(
+                    "select st.*, coalesce((select max(c.seq) from slot_changes c "
+                    "where c.date = st.date and c.time = st.time), "
+                    "(select min(seq) - 1 from slot_changes), 0) as seq "
+                    "from slot_states st where st.date between ? and ? order by st.date, st.time",
+                    (start_date, end_date),
+                )
+            )
+        return {"seq": seq, "slots": slots}
+
+    def list_slot_changes(self, after_seq: int, limit: int) -> list[dict]:
+        with self._lock:
+            return self._rows(
+                self._conn.execute(
+                    "select * from slot_changes where seq > ? order by seq limit ?", (after_seq, limit)
+                )
+            )
+
+    def book_appointment_atomic(
+        self, date: str, time: str, contact_number: str, name: str, holder: Optional[str] = None
+    ) -> dict:
+        """Same contract as the `book_appointment_atomic` SQL function."""
+        time = _normalize_time(time)
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                slot = self._conn.execute(
+                    "select id from slots where date = ? and time = ? and is_booked = 0",
+                    (date, time),
+                ).fetchone()
+                if slot is None:
+                    self._conn.execute("rollback")
+                    return {"status": "unavailable"}
+
+                conflict = self._conn.execute(
+                    "select 1 from appointments where date = ? and time = ? and status = 'booked'",
+                    (date, time),
+                ).fetchone()
+                if conflict is not None:
+                    self._conn.execute("rollback")
+                    return {"status": "conflict"}
+
+                if self._held_by_other(date, time, holder):
+                    self._conn.execute("rollback")
+                    return {"status": "held"}
+
+                self._conn.execute("update slots set is_booked = 1 where id = ?", (slot["id"],))
+                self._conn.execute("delete from slot_holds where date = ? and time = ?", (date, time))
+                cur = self._conn.execute(
+                    "insert into appointments (contact_number, date, time, status, name) "
+                    "values (?, ?, ?, 'booked', ?) returning *",
+                    (contact_number, date, time, name),
+                )
+                appointment = self._rows(cur)[0]
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+        self._publish()
+        return {"status": "booked", "appointment": appointment}
+
+    def move_appointment(
+        self, appointment_id, new_date: str, new_time: str, holder: Optional[str] = None
+    ) -> dict:
+        """Same contract as the `move_appointment` SQL function."""
+        new_time = _normalize_time(new_time)
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                current = self._conn.execute(
+                    "select * from appointments where id = ?", (appointment_id,)
+                ).fetchone()
+                if current is None:
+                    self._conn.execute("rollback")
+                    return {"status": "not_found"}
+                if current["status"] == "cancelled":
+                    self._conn.execute("rollback")
+                    return {"status": "cancelled"}
+
+                slot = self._conn.execute(
+                    "select id from slots where date = ? and time = ? and is_booked = 0",
+                    (new_date, new_time),
+                ).fetchone()
+                if slot is None:
+                    self._conn.execute("rollback")
+                    return {"status": "unavailable"}
+
+                conflict = self._conn.execute(
+                    "select 1 from appointments where date = ? and time = ? "
+                    "and status = 'booked' and id <> ?",
+                    (new_date, new_time, appointment_id),
+                ).fetchone()
+                if conflict is not None:
+                    self._conn.execute("rollback")
+                    return {"status": "conflict"}
+
+                if self._held_by_other(new_date, new_time, holder):
+                    self._conn.execute("rollback")
+                    return {"status": "held"}
+
+                if current["date"] and current["time"]:
+                    self._conn.execute(
+                        "update slots set is_booked = 0 where date = ? and time = ?",
+                        (current["date"], current["time"]),
+                    )
+                self._conn.execute("update slots set is_booked = 1 where id = ?", (slot["id"],))
+                self._conn.execute(
+                    "delete from slot_holds where date = ? and time = ?", (new_date, new_time)
+                )
+                cur = self._conn.execute(
+                    "update appointments set date = ?, time = ?, status = 'booked' "
+                    "where id = ? returning *",
+                    (new_date, new_time, appointment_id),
+                )
+                appointment = self._rows(cur)[0]
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+        self._publish()
+        return {
+            "status": "moved",
+            "appointment": appointment,
+            "old_date": current["date"],
+            "old_time": current["time"],
+        }
+
+
+class LocalRepository(Repository):
+    """Repository over a LocalDatabase with injected network latency.
+
+    Every method costs one simulated round trip of `latency_ms` plus up to
+    `jitter_ms` of uniform jitter, and is counted in `round_trips` so perf
+    tests can report round trips per tool call.
+    """
+
+    def __init__(self, db: LocalDatabase, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.db = db
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.round_trips = 0
+
+    async def _round_trip(self) -> None:
+        self.round_trips += 1
+        delay_ms = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    async def list_open_slots(self, date: Optional[str] = None) -> list[dict]:
+        await self._round_trip()
+        return self.db.list_open_slots(date)
+
+    async def list_open_slots_between(self, start_date: str, end_date: str) -> list[dict]:
+        await self._round_trip()
+        return self.db.list_open_slots_between(start_date, end_date)
+
+    async def book_appointment(
+        self, date: str, time: str, contact_number: str, name: str, holder: Optional[str] = None
+    ) -> dict:
+        await self._round_trip()
+        return self.db.book_appointment_atomic(date, time, contact_number, name, holder)
+
+    async def move_appointment(
+        self, appointment_id: str, new_date: str, new_time: str, holder: Optional[str] = None
+    ) -> dict:
+        await self._round_trip()
+        return self.db.move_appointment(appointment_id, new_date, new_time, holder)
+
+    async def hold_slot(self, date: str, time: str, holder: str, ttl_seconds: int) -> dict:
+        await self._round_trip()
+        return self.db.hold_slot(date, time, holder, ttl_seconds)
+
+    async def release_holds(self, holder: str) -> int:
+        await self._round_trip()
+        return self.db.release_holds(holder)
+
+    async def reap_expired_holds(self) -> int:
+        await self._round_trip()
+        return self.db.reap_expired_holds()
+
+    async def availability_snapshot(self, start_date: str, end_date: str) -> dict:
+        await self._round_trip()
+        return self.db.availability_snapshot(start_date, end_date)
+
+    async def list_slot_changes(self, after_seq: int, limit: int) -> list[dict]:
+        await self._round_trip()
+        return self.db.list_slot_changes(after_seq, limit)
+
+    async def list_appointments(
+        self,
+        contact_number: str,
+        status: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        await self._round_trip()
+        return self.db.list_appointments(contact_number, status, start_date, end_date, after, limit)
+
+    async def cancel_appointment(self, appointment_id: str, known: Optional[dict] = None) -> Optional[dict]:
+        # The local cancel is a single transaction either way, so `known` is not needed.
+        await self._round_trip()
+        return self.db.cancel_appointment(appointment_id)
+
+    async def insert_call_summaries(self, rows: list[dict]) -> None:
+        await self._round_trip()
+        self.db.insert_call_summaries(rows)
+
+    async def ping(self) -> None:
+        await self._round_trip()
+        self.db.ping()
+
+
+_local_db = None
+
+
+def get_local_database() -> LocalDatabase:
+    global _local_db
+    if _local_db is None:
+        _local_db = LocalDatabase(LOCAL_DB_PATH)
+        if not _local_db.list_open_slots() and LOCAL_DB_SEED_DAYS > 0:
+            _local_db.seed_slots(days=LOCAL_DB_SEED_DAYS)
+    return _local_db
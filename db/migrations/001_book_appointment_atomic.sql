@@ -0,0 +1,61 @@
+-- Claims an open slot and records the appointment in a single transaction.
+--
+-- Returns a JSON object whose "status" is one of:
+--   booked       the slot was claimed; "appointment" holds the inserted row
+--   unavailable  no open slot exists for that date/time
+--   conflict     an appointment is already booked for that date/time
+--
+-- The slot row is locked with FOR UPDATE, so concurrent callers for the same
+-- slot serialise here and only the first one can succeed.
+
+create or replace function public.book_appointment_atomic(
+    p_date date,
+    p_time time,
+    p_contact_number text,
+    p_name text
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_slot_id public.slots.id%type;
+    v_appointment public.appointments%rowtype;
+begin
+    select id into v_slot_id
+      from public.slots
+     where date = p_date
+       and time = p_time
+       and is_booked = false
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'unavailable');
+    end if;
+
+    if exists (
+        select 1
+          from public.appointments
+         where date = p_date
+           and time = p_time
+           and status = 'booked'
+    ) then
+        return jsonb_build_object('status', 'conflict');
+    end if;
+
+    update public.slots
+       set is_booked = true
+     where id = v_slot_id;
+
+    insert into public.appointments (contact_number, date, time, status, name)
+    values (p_contact_number, p_date, p_time, 'booked', p_name)
+    returning * into v_appointment;
+
+    return jsonb_build_object(
+        'status', 'booked',
+        'appointment', to_jsonb(v_appointment)
+    );
+end;
+$$;
+
+grant execute on function public.book_appointment_atomic(date, time, text, text)
+    to anon, authenticated, service_role;
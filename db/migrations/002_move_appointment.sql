@@ -0,0 +1,86 @@
+-- Moves an appointment to a new slot in a single transaction: releases the
+-- old slot, claims the new one and updates the appointment row.
+--
+-- Returns a JSON object whose "status" is one of:
+--   moved        done; "appointment" holds the updated row and
+--                "old_date"/"old_time" the slot that was released
+--   not_found    no appointment with that id
+--   unavailable  no open slot exists for the new date/time
+--   conflict     another appointment is already booked for the new date/time
+--
+-- All lookups run server-side under row locks, so the tool needs a single
+-- round trip and a failure can never leave slots and appointments out of step.
+
+create or replace function public.move_appointment(
+    p_appointment_id public.appointments.id%type,
+    p_new_date date,
+    p_new_time time
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_current public.appointments%rowtype;
+    v_slot_id public.slots.id%type;
+    v_appointment public.appointments%rowtype;
+begin
+    select * into v_current
+      from public.appointments
+     where id = p_appointment_id
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'not_found');
+    end if;
+
+    select id into v_slot_id
+      from public.slots
+     where date = p_new_date
+       and time = p_new_time
+       and is_booked = false
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'unavailable');
+    end if;
+
+    if exists (
+        select 1
+          from public.appointments
+         where date = p_new_date
+           and time = p_new_time
+           and status = 'booked'
+           and id <> p_appointment_id
+    ) then
+        return jsonb_build_object('status', 'conflict');
+    end if;
+
+    if v_current.date is not null and v_current.time is not null then
+        update public.slots
+           set is_booked = false
+         where date = v_current.date
+           and time = v_current.time;
+    end if;
+
+    update public.slots
+       set is_booked = true
+     where id = v_slot_id;
+
+    update public.appointments
+       set date = p_new_date,
+           time = p_new_time,
+           status = 'booked'
+     where id = p_appointment_id
+    returning * into v_appointment;
+
+    return jsonb_build_object(
+        'status', 'moved',
+        'appointment', to_jsonb(v_appointment),
+        'old_date', v_current.date,
+        'old_time', v_current.time
+    );
+end;
+$$;
+
+grant execute on function public.move_appointment
+    to anon, authenticated, service_role;
@@ -0,0 +1,8 @@
+-- Supports retrieve_appointments' filtered, keyset-paginated lookup:
+--   where contact_number = $1 [and status = $2] [and date between ...]
+--   order by date, time, id limit $n
+-- so a caller with a long history reads one bounded index range instead of
+-- every row they have ever booked.
+
+create index if not exists appointments_contact_date_time_id
+    on public.appointments (contact_number, date, time, id);
@@ -0,0 +1,6 @@
+-- Stores the per-call cost breakdown next to the summary text. end_conversation
+-- computes it from the session's usage metrics; it was previously only sent to
+-- the frontend and then dropped.
+
+alter table public.call_summaries
+    add column if not exists cost_breakdown jsonb;
@@ -0,0 +1,284 @@
+-- Short leases ("holds") on open slots while a caller confirms a booking.
+--
+-- hold_slot gives one holder (a call session) a lease of p_ttl_seconds on an
+-- open slot and returns a JSON object whose "status" is one of:
+--   held         the caller now holds the slot; "hold" is the lease row
+--                (asking again extends the lease)
+--   taken        another holder has an unexpired lease; "expires_at" says until when
+--   unavailable  no open slot exists for that date/time
+--
+-- A holder keeps at most one hold: taking a new one lets the previous go.
+-- Expired holds are ignored everywhere and deleted by reap_expired_holds.
+-- open_slots hides held slots from availability, and booking or moving onto
+-- a slot someone else holds returns status "held" instead of taking it.
+
+create table if not exists public.slot_holds (
+    date date not null,
+    time time not null,
+    holder text not null,
+    expires_at timestamptz not null,
+    created_at timestamptz not null default now(),
+    primary key (date, time)
+);
+
+create index if not exists slot_holds_holder on public.slot_holds (holder);
+create index if not exists slot_holds_expires_at on public.slot_holds (expires_at);
+
+create or replace view public.open_slots as
+select s.*
+  from public.slots s
+ where s.is_booked = false
+   and not exists (
+        select 1
+          from public.slot_holds h
+         where h.date = s.date
+           and h.time = s.time
+           and h.expires_at > now()
+   );
+
+grant select on public.open_slots to anon, authenticated, service_role;
+
+create or replace function public.hold_slot(
+    p_date date,
+    p_time time,
+    p_holder text,
+    p_ttl_seconds integer default 120
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_slot_id public.slots.id%type;
+    v_hold public.slot_holds%rowtype;
+begin
+    select id into v_slot_id
+      from public.slots
+     where date = p_date
+       and time = p_time
+       and is_booked = false
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'unavailable');
+    end if;
+
+    select * into v_hold
+      from public.slot_holds
+     where date = p_date
+       and time = p_time;
+
+    if found and v_hold.holder <> p_holder and v_hold.expires_at > now() then
+        return jsonb_build_object('status', 'taken', 'expires_at', v_hold.expires_at);
+    end if;
+
+    delete from public.slot_holds
+     where holder = p_holder
+       and (date, time) <> (p_date, p_time);
+
+    insert into public.slot_holds (date, time, holder, expires_at)
+    values (p_date, p_time, p_holder, now() + make_interval(secs => p_ttl_seconds))
+    on conflict (date, time) do update
+        set holder = excluded.holder,
+            expires_at = excluded.expires_at,
+            created_at = now()
+    returning * into v_hold;
+
+    return jsonb_build_object('status', 'held', 'hold', to_jsonb(v_hold));
+end;
+$$;
+
+create or replace function public.release_holds(p_holder text)
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+begin
+    delete from public.slot_holds where holder = p_holder;
+    get diagnostics v_count = row_count;
+    return v_count;
+end;
+$$;
+
+create or replace function public.reap_expired_holds()
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+begin
+    delete from public.slot_holds where expires_at <= now();
+    get diagnostics v_count = row_count;
+    return v_count;
+end;
+$$;
+
+-- book_appointment_atomic and move_appointment gain p_holder: the holder's own
+-- hold is turned into the booking, anyone else's blocks it with status "held".
+
+drop function if exists public.book_appointment_atomic(date, time, text, text);
+
+create or replace function public.book_appointment_atomic(
+    p_date date,
+    p_time time,
+    p_contact_number text,
+    p_name text,
+    p_holder text default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_slot_id public.slots.id%type;
+    v_appointment public.appointments%rowtype;
+begin
+    select id into v_slot_id
+      from public.slots
+     where date = p_date
+       and time = p_time
+       and is_booked = false
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'unavailable');
+    end if;
+
+    if exists (
+        select 1
+          from public.appointments
+         where date = p_date
+           and time = p_time
+           and status = 'booked'
+    ) then
+        return jsonb_build_object('status', 'conflict');
+    end if;
+
+    if exists (
+        select 1
+          from public.slot_holds
+         where date = p_date
+           and time = p_time
+           and expires_at > now()
+           and holder is distinct from p_holder
+    ) then
+        return jsonb_build_object('status', 'held');
+    end if;
+
+    update public.slots
+       set is_booked = true
+     where id = v_slot_id;
+
+    delete from public.slot_holds
+     where date = p_date
+       and time = p_time;
+
+    insert into public.appointments (contact_number, date, time, status, name)
+    values (p_contact_number, p_date, p_time, 'booked', p_name)
+    returning * into v_appointment;
+
+    return jsonb_build_object(
+        'status', 'booked',
+        'appointment', to_jsonb(v_appointment)
+    );
+end;
+$$;
+
+drop function if exists public.move_appointment;
+
+create or replace function public.move_appointment(
+    p_appointment_id public.appointments.id%type,
+    p_new_date date,
+    p_new_time time,
+    p_holder text default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_current public.appointments%rowtype;
+    v_slot_id public.slots.id%type;
+    v_appointment public.appointments%rowtype;
+begin
+    select * into v_current
+      from public.appointments
+     where id = p_appointment_id
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'not_found');
+    end if;
+
+    select id into v_slot_id
+      from public.slots
+     where date = p_new_date
+       and time = p_new_time
+       and is_booked = false
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'unavailable');
+    end if;
+
+    if exists (
+        select 1
+          from public.appointments
+         where date = p_new_date
+           and time = p_new_time
+           and status = 'booked'
+           and id <> p_appointment_id
+    ) then
+        return jsonb_build_object('status', 'conflict');
+    end if;
+
+    if exists (
+        select 1
+          from public.slot_holds
+         where date = p_new_date
+           and time = p_new_time
+           and expires_at > now()
+           and holder is distinct from p_holder
+    ) then
+        return jsonb_build_object('status', 'held');
+    end if;
+
+    if v_current.date is not null and v_current.time is not null then
+        update public.slots
+           set is_booked = false
+         where date = v_current.date
+           and time = v_current.time;
+    end if;
+
+    update public.slots
+       set is_booked = true
+     where id = v_slot_id;
+
+    delete from public.slot_holds
+     where date = p_new_date
+       and time = p_new_time;
+
+    update public.appointments
+       set date = p_new_date,
+           time = p_new_time,
+           status = 'booked'
+     where id = p_appointment_id
+    returning * into v_appointment;
+
+    return jsonb_build_object(
+        'status', 'moved',
+        'appointment', to_jsonb(v_appointment),
+        'old_date', v_current.date,
+        'old_time', v_current.time
+    );
+end;
+$$;
+
+grant execute on function public.hold_slot(date, time, text, integer)
+    to anon, authenticated, service_role;
+grant execute on function public.release_holds(text)
+    to anon, authenticated, service_role;
+grant execute on function public.reap_expired_holds()
+    to anon, authenticated, service_role;
+grant execute on function public.book_appointment_atomic(date, time, text, text, text)
+    to anon, authenticated, service_role;
+grant execute on function public.move_appointment
+    to anon, authenticated, service_role;
@@ -0,0 +1,212 @@
+-- Change log of slot availability, for workers that keep availability in memory.
+--
+-- Any change to a slot, a hold on it or an appointment at its date/time
+-- appends the slot's resulting state to slot_changes. Workers subscribe to
+-- inserts on slot_changes through Supabase realtime. They use `seq` to spot
+-- missed messages and to catch up from the table after a disconnect.
+--
+-- is_booked is true when the slot is booked or a booked appointment exists
+-- for it. held_until is the expiry of the current hold, if any; readers
+-- compare it to the clock, so expiry needs no change of its own.
+--
+-- record_slot_change locks the slot row before taking a seq. Changes to the
+-- same slot therefore commit in seq order. Changes to different slots may
+-- commit out of order, so listeners keep the highest seq per slot.
+--
+-- Old rows can be deleted at will (e.g. anything older than a day). A
+-- listener that finds its catch-up incomplete reloads the snapshot instead.
+
+create table if not exists public.slot_changes (
+    seq bigserial primary key,
+    date date not null,
+    time time not null,
+    display text,
+    is_booked boolean not null,
+    held_until timestamptz,
+    changed_at timestamptz not null default now()
+);
+
+create index if not exists slot_changes_date_time_seq on public.slot_changes (date, time, seq);
+
+create or replace function public.record_slot_change(p_date date, p_time time)
+returns void
+language plpgsql
+as $$
+declare
+    v_slot public.slots%rowtype;
+begin
+    if p_date is null or p_time is null then
+        return;
+    end if;
+
+    select * into v_slot
+      from public.slots
+     where date = p_date
+       and time = p_time
+     for update;
+
+    if not found then
+        return;
+    end if;
+
+    insert into public.slot_changes (date, time, display, is_booked, held_until)
+    values (
+        v_slot.date,
+        v_slot.time,
+        v_slot.display,
+        v_slot.is_booked or exists (
+            select 1
+              from public.appointments
+             where date = p_date
+               and time = p_time
+               and status = 'booked'
+        ),
+        (select expires_at from public.slot_holds where date = p_date and time = p_time)
+    );
+end;
+$$;
+
+create or replace function public.slots_changed()
+returns trigger
+language plpgsql
+as $$
+begin
+    perform public.record_slot_change(new.date, new.time);
+    return null;
+end;
+$$;
+
+create or replace function public.slot_holds_changed()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'DELETE' then
+        perform public.record_slot_change(old.date, old.time);
+    else
+        perform public.record_slot_change(new.date, new.time);
+    end if;
+    return null;
+end;
+$$;
+
+create or replace function public.appointments_changed()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE')
+       and (tg_op = 'DELETE' or (old.date, old.time) is distinct from (new.date, new.time)) then
+        perform public.record_slot_change(old.date, old.time);
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        perform public.record_slot_change(new.date, new.time);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists slots_record_change on public.slots;
+create trigger slots_record_change
+    after insert or update of is_booked, display on public.slots
+    for each row execute function public.slots_changed();
+
+drop trigger if exists slot_holds_record_change on public.slot_holds;
+create trigger slot_holds_record_change
+    after insert or update or delete on public.slot_holds
+    for each row execute function public.slot_holds_changed();
+
+drop trigger if exists appointments_record_change on public.appointments;
+create trigger appointments_record_change
+    after insert or update of date, time, status or delete on public.appointments
+    for each row execute function public.appointments_changed();
+
+-- Deleting holds fires the trigger above, which locks the slot row. Lock the
+-- slots first, in id order, so reaping and releasing take locks in the same
+-- order as booking (slot, then hold) and cannot deadlock with it.
+
+create or replace function public.release_holds(p_holder text)
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+begin
+    perform 1
+       from public.slots s
+       join public.slot_holds h on h.date = s.date and h.time = s.time
+      where h.holder = p_holder
+      order by s.id
+        for update of s;
+
+    delete from public.slot_holds where holder = p_holder;
+    get diagnostics v_count = row_count;
+    return v_count;
+end;
+$$;
+
+create or replace function public.reap_expired_holds()
+returns integer
+language plpgsql
+as $$
+declare
+    v_count integer;
+begin
+    perform 1
+       from public.slots s
+       join public.slot_holds h on h.date = s.date and h.time = s.time
+      where h.expires_at <= now()
+      order by s.id
+        for update of s;
+
+    delete from public.slot_holds where expires_at <= now();
+    get diagnostics v_count = row_count;
+    return v_count;
+end;
+$$;
+
+-- Every slot in [p_start, p_end] with its state and the seq of its latest
+-- change. Also returns the newest seq overall, all from one statement and
+-- so one consistent snapshot.
+create or replace function public.availability_snapshot(p_start date, p_end date)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'seq', coalesce((select max(seq) from public.slot_changes), 0),
+        'slots', coalesce((
+            select jsonb_agg(
+                jsonb_build_object(
+                    'date', s.date,
+                    'time', s.time,
+                    'display', s.display,
+                    'is_booked', s.is_booked or exists (
+                        select 1
+                          from public.appointments a
+                         where a.date = s.date
+                           and a.time = s.time
+                           and a.status = 'booked'
+                    ),
+                    'held_until', h.expires_at,
+                    'seq', coalesce((
+                        select max(c.seq)
+                          from public.slot_changes c
+                         where c.date = s.date
+                           and c.time = s.time
+                    ), 0)
+                )
+                order by s.date, s.time
+            )
+              from public.slots s
+              left join public.slot_holds h on h.date = s.date and h.time = s.time
+             where s.date between p_start and p_end
+        ), '[]'::jsonb)
+    );
+$$;
+
+grant select on public.slot_changes to anon, authenticated, service_role;
+grant execute on function public.availability_snapshot(date, date)
+    to anon, authenticated, service_role;
+
+alter publication supabase_realtime add table public.slot_changes;
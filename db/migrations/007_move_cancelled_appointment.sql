@@ -0,0 +1,99 @@
+-- move_appointment refuses cancelled appointments with status "cancelled".
+--
+-- Moving one used to re-book it and mark its old slot free, even though the
+-- slot may have been booked by someone else since the cancellation. The
+-- caller has to book a new appointment instead; nothing is changed.
+
+create or replace function public.move_appointment(
+    p_appointment_id public.appointments.id%type,
+    p_new_date date,
+    p_new_time time,
+    p_holder text default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_current public.appointments%rowtype;
+    v_slot_id public.slots.id%type;
+    v_appointment public.appointments%rowtype;
+begin
+    select * into v_current
+      from public.appointments
+     where id = p_appointment_id
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'not_found');
+    end if;
+
+    if v_current.status = 'cancelled' then
+        return jsonb_build_object('status', 'cancelled');
+    end if;
+
+    select id into v_slot_id
+      from public.slots
+     where date = p_new_date
+       and time = p_new_time
+       and is_booked = false
+     for update;
+
+    if not found then
+        return jsonb_build_object('status', 'unavailable');
+    end if;
+
+    if exists (
+        select 1
+          from public.appointments
+         where date = p_new_date
+           and time = p_new_time
+           and status = 'booked'
+           and id <> p_appointment_id
+    ) then
+        return jsonb_build_object('status', 'conflict');
+    end if;
+
+    if exists (
+        select 1
+          from public.slot_holds
+         where date = p_new_date
+           and time = p_new_time
+           and expires_at > now()
+           and holder is distinct from p_holder
+    ) then
+        return jsonb_build_object('status', 'held');
+    end if;
+
+    if v_current.date is not null and v_current.time is not null then
+        update public.slots
+           set is_booked = false
+         where date = v_current.date
+           and time = v_current.time;
+    end if;
+
+    update public.slots
+       set is_booked = true
+     where id = v_slot_id;
+
+    delete from public.slot_holds
+     where date = p_new_date
+       and time = p_new_time;
+
+    update public.appointments
+       set date = p_new_date,
+           time = p_new_time,
+           status = 'booked'
+     where id = p_appointment_id
+    returning * into v_appointment;
+
+    return jsonb_build_object(
+        'status', 'moved',
+        'appointment', to_jsonb(v_appointment),
+        'old_date', v_current.date,
+        'old_time', v_current.time
+    );
+end;
+$$;
+
+grant execute on function public.move_appointment
+    to anon, authenticated, service_role;
@@ -0,0 +1,44 @@
+-- availability_snapshot: a slot whose changes were all pruned from
+-- slot_changes gets the seq just before the oldest change still there.
+--
+-- It used to get seq 0, so a listener reloading after a pruned catch-up
+-- kept its own older entry for the slot instead of the snapshot's state.
+-- Any change to the slot that commits later has a seq above that floor
+-- and still wins.
+
+create or replace function public.availability_snapshot(p_start date, p_end date)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'seq', coalesce((select max(seq) from public.slot_changes), 0),
+        'slots', coalesce((
+            select jsonb_agg(
+                jsonb_build_object(
+                    'date', s.date,
+                    'time', s.time,
+                    'display', s.display,
+                    'is_booked', s.is_booked or exists (
+                        select 1
+                          from public.appointments a
+                         where a.date = s.date
+                           and a.time = s.time
+                           and a.status = 'booked'
+                    ),
+                    'held_until', h.expires_at,
+                    'seq', coalesce((
+                        select max(c.seq)
+                          from public.slot_changes c
+                         where c.date = s.date
+                           and c.time = s.time
+                    ), (select min(seq) - 1 from public.slot_changes), 0)
+                )
+                order by s.date, s.time
+            )
+              from public.slots s
+              left join public.slot_holds h on h.date = s.date and h.time = s.time
+             where s.date between p_start and p_end
+        ), '[]'::jsonb)
+    );
+$$;
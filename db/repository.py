@@ -0,0 +1,65 @@
+from db.base import Repository
+from db.local import LocalRepository, get_local_database
+from db.supabase import SupabaseRepository
+from db.resilience import ResilientRepository
+from db.breaker import CircuitBreaker
+from db.fallback import FallbackRepository
+from db.wal import WalReplayer, get_write_ahead_log
+from config import (
+    STORAGE_BACKEND,
+    LOCAL_DB_LATENCY_MS,
+    LOCAL_DB_JITTER_MS,
+    DB_BREAKER_FAILURES,
+    DB_BREAKER_RESET_SECONDS,
+    WAL_REPLAY_INTERVAL_SECONDS,
+    WAL_REPLAY_BATCH,
+    WAL_MAX_ATTEMPTS,
+)
+
+_repository = None
+
+
+def get_repository() -> Repository:
+    """Return the per-worker repository selected by STORAGE_BACKEND.
+
+    Calls go through budgets, retries and a circuit breaker
+    (ResilientRepository) and fall back to last-known reads and the
+    write-ahead log when the backend fails (FallbackRepository).
+    """
+    global _repository
+    if _repository is None:
+        if STORAGE_BACKEND == "local":
+            _repository = LocalRepository(
+                get_local_database(),
+                latency_ms=LOCAL_DB_LATENCY_MS,
+                jitter_ms=LOCAL_DB_JITTER_MS,
+            )
+        elif STORAGE_BACKEND == "supabase":
+            _repository = SupabaseRepository()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+        breaker = CircuitBreaker(DB_BREAKER_FAILURES, DB_BREAKER_RESET_SECONDS)
+        _repository = FallbackRepository(
+            ResilientRepository(_repository, breaker), get_write_ahead_log()
+        )
+    return _repository
+
+
+_replayer = None
+
+
+def get_wal_replayer() -> WalReplayer:
+    """The process's replayer draining deferred writes through the budgeted repository.
+
+    Started once per process by the background services; see startup/services.py.
+    """
+    global _replayer
+    if _replayer is None:
+        _replayer = WalReplayer(
+            get_write_ahead_log(),
+            get_repository().inner,
+            interval=WAL_REPLAY_INTERVAL_SECONDS,
+            batch=WAL_REPLAY_BATCH,
+            max_attempts=WAL_MAX_ATTEMPTS,
+        )
+    return _replayer
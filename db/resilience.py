@@ -0,0 +1,318 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional
+import asyncio
+import functools
+import logging
+import random
+import sqlite3
+import sys
+import time
+
+from config import (
+    DB_TOOL_BUDGET_SECONDS,
+    DB_CALL_TIMEOUT_SECONDS,
+    DB_READ_RETRIES,
+    DB_RETRY_BASE_MS,
+    DB_HEDGE_ENABLED,
+    DB_HEDGE_MIN_MS,
+    DB_HEDGE_QUANTILE,
+    DB_HEDGE_MIN_SAMPLES,
+)
+from db.base import Repository
+from db.breaker import CircuitBreaker, CircuitOpen
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("db.resilience")
+
+DB_QUERY_DURATION = get_registry().histogram(
+    "voice_db_query_seconds", "Latency of each repository call attempt, by operation and outcome."
+)
+DB_RETRIES = get_registry().counter(
+    "voice_db_retries_total", "Read attempts retried after a timeout or transient error, by operation."
+)
+DB_HEDGES = get_registry().counter(
+    "voice_db_hedges_total", "Hedged read requests fired, by operation and which attempt won."
+)
+
+# Monotonic time by which the current tool invocation must have its data.
+_deadline: ContextVar[Optional[float]] = ContextVar("db_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The tool's latency budget ran out before the repository answered."""
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Bound every repository call made inside the block to `seconds` in total.
+
+    Nested blocks can only shorten the budget, never extend it.
+    """
+    until = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(until if outer is None else min(outer, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def budgeted(seconds: float = DB_TOOL_BUDGET_SECONDS):
+    """Run a tool under a `deadline`. Apply below `@function_tool`."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with deadline(seconds):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# Postgres SQLSTATE classes that say the server is unwell rather than the request wrong:
+# connection exception, transaction rollback, insufficient resources, operator
+# intervention (statement timeout, shutdown), system error, internal error.
+_TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57", "58", "XX")
+
+
+def _transient_status(status: int) -> bool:
+    return status >= 500 or status in (408, 429)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether `exc` says the backend is unhealthy rather than that the request was wrong.
+
+    Timeouts, dropped connections and 5xx answers are transient: they are
+    worth retrying and count toward the breaker. A request the backend
+    rejected (a PostgREST 4xx, a constraint or validation error raised by
+    an RPC, a malformed date from a tool call) fails the same way every
+    time, and the backend answered it.
+    """
+    if isinstance(exc, (asyncio.TimeoutError, OSError, CircuitOpen, sqlite3.OperationalError)):
+        return True
+    # The Supabase client's HTTP and PostgREST errors; neither can be raised unless it is loaded.
+    httpx = sys.modules.get("httpx")
+    if httpx is not None:
+        if isinstance(exc, httpx.TransportError):
+            return True
+        if isinstance(exc, httpx.HTTPStatusError):
+            return _transient_status(exc.response.status_code)
+    postgrest = sys.modules.get("postgrest.exceptions")
+    if postgrest is not None and isinstance(exc, postgrest.APIError):
+        code = str(exc.code or "")
+        if code.isdigit() and len(code) == 3:
+            # No JSON body (e.g. a gateway error page): the code is the HTTP status.
+            return _transient_status(int(code))
+        return code.startswith("PGRST0") or code[:2] in _TRANSIENT_SQLSTATE_CLASSES
+    return False
+
+
+def remaining() -> Optional[float]:
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+class ResilientRepository(Repository):
+    """Wraps a repository so no call can outlive the current tool's budget.
+
+    Every call is capped by the smaller of `DB_CALL_TIMEOUT_SECONDS` and the
+    time left in the active `deadline`. Reads are idempotent, so they are
+    retried with jittered exponential backoff and, once enough latency
+    samples exist, hedged: if the first attempt is still running after the
+    operation's observed p95, a second one is fired and the first to answer
+    wins. Writes get exactly one attempt, because a write that timed out may
+    still have committed.
+
+    All attempts go through `breaker`: while it is open they fail at once
+    with CircuitOpen instead of waiting out a timeout, and are not retried.
+    Only transient errors (see `is_transient`) count against the breaker or
+    are retried; a request the backend rejected is raised at once and, since
+    the backend did answer, counts as a success.
+    """
+
+    def __init__(self, inner: Repository, breaker: CircuitBreaker):
+        self.inner = inner
+        self.breaker = breaker
+
+    def __getattr__(self, name):
+        # Backend-specific extras (e.g. LocalRepository.round_trips) pass through.
+        return getattr(self.inner, name)
+
+    def _attempt_timeout(self) -> float:
+        left = remaining()
+        if left is None:
+            return DB_CALL_TIMEOUT_SECONDS
+        if left <= 0:
+            raise DeadlineExceeded("tool latency budget exhausted")
+        return min(DB_CALL_TIMEOUT_SECONDS, left)
+
+    async def _timed(self, op: str, call: Callable[[], Awaitable]):
+        timeout = self._attempt_timeout()
+        if not self.breaker.allow():
+            DB_QUERY_DURATION.observe(0.0, {"op": op, "outcome": "rejected"})
+            raise CircuitOpen(f"{op} rejected: storage circuit is open")
+        t0 = time.perf_counter()
+        outcome = "ok"
+        try:
+            result = await asyncio.wait_for(call(), timeout)
+            self.breaker.record_success()
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            self.breaker.record_failure()
+            raise DeadlineExceeded(f"{op} did not answer within {timeout:.2f}s")
+        except asyncio.CancelledError:
+            # A losing hedge or an abandoned call says nothing about backend health,
+            # but a half-open probe must be released.
+            outcome = "cancelled"
+            self.breaker.release()
+            raise
+        except Exception as e:
+            if not is_transient(e):
+                outcome = "client_error"
+                self.breaker.record_success()
+                raise
+            outcome = "error"
+            self.breaker.record_failure()
+            raise
+        finally:
+            DB_QUERY_DURATION.observe(time.perf_counter() - t0, {"op": op, "outcome": outcome})
+
+    def _hedge_delay(self, op: str) -> Optional[float]:
+        if not DB_HEDGE_ENABLED:
+            return None
+        labels = {"op": op, "outcome": "ok"}
+        if DB_QUERY_DURATION.count(labels) < DB_HEDGE_MIN_SAMPLES:
+            return None
+        p = DB_QUERY_DURATION.quantile(DB_HEDGE_QUANTILE, labels)
+        return max(p or 0.0, DB_HEDGE_MIN_MS / 1000)
+
+    async def _hedged(self, op: str, call: Callable[[], Awaitable]):
+        delay = self._hedge_delay(op)
+        if delay is None:
+            return await self._timed(op, call)
+        first = asyncio.ensure_future(self._timed(op, call))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        left = remaining()
+        if left is not None and left <= delay:
+            return await first
+        DB_HEDGES.inc(1, {"op": op, "winner": "fired"})
+        second = asyncio.ensure_future(self._timed(op, call))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        DB_HEDGES.inc(1, {"op": op, "winner": "primary" if task is first else "hedge"})
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _read(self, op: str, call: Callable[[], Awaitable]):
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged(op, call)
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                if not is_transient(e):
+                    raise
+                left = remaining()
+                if attempt >= DB_READ_RETRIES or (left is not None and left <= 0):
+                    raise
+                backoff = random.uniform(0, DB_RETRY_BASE_MS * (2 ** attempt)) / 1000
+                if left is not None and backoff >= left:
+                    raise
+                attempt += 1
+                DB_RETRIES.inc(1, {"op": op})
+                logger.warning(f"Retrying {op} (attempt {attempt + 1}) after {type(e).__name__}: {e}")
+                await asyncio.sleep(backoff)
+
+    async def list_open_slots(self, date: Optional[str] = None) -> list[dict]:
+        return await self._read("list_open_slots", lambda: self.inner.list_open_slots(date))
+
+    async def list_open_slots_between(self, start_date: str, end_date: str) -> list[dict]:
+        return await self._read(
+            "list_open_slots_between",
+            lambda: self.inner.list_open_slots_between(start_date, end_date),
+        )
+
+    async def book_appointment(
+        self, date: str, time: str, contact_number: str, name: str, holder: Optional[str] = None
+    ) -> dict:
+        return await self._timed(
+            "book_appointment",
+            lambda: self.inner.book_appointment(date, time, contact_number, name, holder),
+        )
+
+    async def move_appointment(
+        self, appointment_id: str, new_date: str, new_time: str, holder: Optional[str] = None
+    ) -> dict:
+        return await self._timed(
+            "move_appointment",
+            lambda: self.inner.move_appointment(appointment_id, new_date, new_time, holder),
+        )
+
+    async def hold_slot(self, date: str, time: str, holder: str, ttl_seconds: int) -> dict:
+        return await self._timed(
+            "hold_slot",
+            lambda: self.inner.hold_slot(date, time, holder, ttl_seconds),
+        )
+
+    async def release_holds(self, holder: str) -> int:
+        return await self._timed("release_holds", lambda: self.inner.release_holds(holder))
+
+    async def reap_expired_holds(self) -> int:
+        return await self._timed("reap_expired_holds", self.inner.reap_expired_holds)
+
+    async def availability_snapshot(self, start_date: str, end_date: str) -> dict:
+        return await self._read(
+            "availability_snapshot",
+            lambda: self.inner.availability_snapshot(start_date, end_date),
+        )
+
+    async def list_slot_changes(self, after_seq: int, limit: int) -> list[dict]:
+        return await self._read(
+            "list_slot_changes",
+            lambda: self.inner.list_slot_changes(after_seq, limit),
+        )
+
+    async def list_appointments(
+        self,
+        contact_number: str,
+        status: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        return await self._read(
+            "list_appointments",
+            lambda: self.inner.list_appointments(
+                contact_number, status, start_date, end_date, after, limit
+            ),
+        )
+
+    async def cancel_appointment(self, appointment_id: str, known: Optional[dict] = None) -> Optional[dict]:
+        return await self._timed(
+            "cancel_appointment",
+            lambda: self.inner.cancel_appointment(appointment_id, known=known),
+        )
+
+    async def insert_call_summaries(self, rows: list[dict]) -> None:
+        return await self._timed("insert_call_summaries", lambda: self.inner.insert_call_summaries(rows))
+
+    async def ping(self) -> None:
+        # Counts toward the breaker, so a backend that is down at start-up is found out early.
+        return await self._timed("ping", self.inner.ping)
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from typing import Optional
+import logging
+import time
+
+from config import SLOT_CACHE_TTL_SECONDS, SLOT_CACHE_MAX_ENTRIES
+
+logger = logging.getLogger("db.slot_cache")
+
+# Cache key used for the "no date given" view of availability.
+ALL_DATES = "*"
+
+
+def same_time(a: Optional[str], b: Optional[str]) -> bool:
+    # Postgres returns "HH:MM:SS" while tools pass "HH:MM".
+    if not a or not b:
+        return False
+    return a[:5] == b[:5]
+
+
+class SlotCache:
+    """Per-worker cache of open slots, keyed by date (plus an all-dates view).
+
+    Entries expire after `ttl_seconds` and the least recently used entry is
+    evicted once `max_entries` is exceeded. Booking tools write through it
+    so repeat lookups stay consistent with what this worker has changed.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, list[dict]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, date: Optional[str]) -> str:
+        return date or ALL_DATES
+
+    def get(self, date: Optional[str]) -> Optional[list[dict]]:
+        key = self._key(date)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, slots = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return slots
+
+    def put(self, date: Optional[str], slots: list[dict]) -> None:
+        key = self._key(date)
+        self._entries[key] = (time.monotonic(), list(slots))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            logger.debug(f"Evicted slot cache entry for {evicted}")
+
+    def mark_booked(self, date: str, time_: str) -> None:
+        """Drop a just-booked slot from every cached view that contains it."""
+        for key in (date, ALL_DATES):
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            stored_at, slots = entry
+            remaining = [
+                s for s in slots
+                if not (s.get("date") == date and same_time(s.get("time"), time_))
+            ]
+            self._entries[key] = (stored_at, remaining)
+
+    def invalidate(self, date: Optional[str] = None) -> None:
+        """Forget a date (and the all-dates view), or everything if no date is given."""
+        if date is None:
+            self._entries.clear()
+            return
+        self._entries.pop(date, None)
+        self._entries.pop(ALL_DATES, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_slot_cache = None
+
+
+def get_slot_cache() -> SlotCache:
+    global _slot_cache
+    if _slot_cache is None:
+        _slot_cache = SlotCache(SLOT_CACHE_TTL_SECONDS, SLOT_CACHE_MAX_ENTRIES)
+    return _slot_cache
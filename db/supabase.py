@@ -1,13 +1,195 @@
-from supabase import create_async_client
 from config import SUPABASE_URL, SUPABASE_KEY
+from db.base import APPOINTMENT_COLUMNS, Repository
+from providers.registry import resolve
+from typing import Optional
 import asyncio
+import weakref
 
-_supabase = None
+# The async client's connections belong to the loop that opened them, so the
+# background services loop and each job's loop get a client of their own.
+_supabase = weakref.WeakKeyDictionary()
 
 async def get_supabase():
-    global _supabase
-    if _supabase is None:
+    loop = asyncio.get_running_loop()
+    client = _supabase.get(loop)
+    if client is None:
         if not SUPABASE_URL or not SUPABASE_KEY:
             raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set")
-        _supabase = await create_async_client(SUPABASE_URL, SUPABASE_KEY)
-    return _supabase
+        create_async_client = resolve("storage", "supabase")
+        client = _supabase[loop] = await create_async_client(SUPABASE_URL, SUPABASE_KEY)
+    return client
+
+
+class SupabaseRepository(Repository):
+    """Repository backed by the hosted Supabase project over PostgREST."""
+
+    async def list_open_slots(self, date: Optional[str] = None) -> list[dict]:
+        supabase = await get_supabase()
+        query = supabase.table("open_slots").select("*")
+        if date:
+            query = query.eq("date", date)
+        res = await query.order("date").order("time").execute()
+        return res.data or []
+
+    async def list_open_slots_between(self, start_date: str, end_date: str) -> list[dict]:
+        supabase = await get_supabase()
+        res = (
+            await supabase.table("open_slots")
+            .select("*")
+            .gte("date", start_date)
+            .lte("date", end_date)
+            .order("date")
+            .order("time")
+            .execute()
+        )
+        return res.data or []
+
+    async def book_appointment(
+        self, date: str, time: str, contact_number: str, name: str, holder: Optional[str] = None
+    ) -> dict:
+        supabase = await get_supabase()
+        res = await supabase.rpc(
+            "book_appointment_atomic",
+            {
+                "p_date": date,
+                "p_time": time,
+                "p_contact_number": contact_number,
+                "p_name": name,
+                "p_holder": holder,
+            },
+        ).execute()
+        return res.data
+
+    async def move_appointment(
+        self, appointment_id: str, new_date: str, new_time: str, holder: Optional[str] = None
+    ) -> dict:
+        supabase = await get_supabase()
+        res = await supabase.rpc(
+            "move_appointment",
+            {
+                "p_appointment_id": appointment_id,
+                "p_new_date": new_date,
+                "p_new_time": new_time,
+                "p_holder": holder,
+            },
+        ).execute()
+        return res.data
+
+    async def hold_slot(self, date: str, time: str, holder: str, ttl_seconds: int) -> dict:
+        supabase = await get_supabase()
+        res = await supabase.rpc(
+            "hold_slot",
+            {
+                "p_date": date,
+                "p_time": time,
+                "p_holder": holder,
+                "p_ttl_seconds": int(ttl_seconds),
+            },
+        ).execute()
+        return res.data
+
+    async def release_holds(self, holder: str) -> int:
+        supabase = await get_supabase()
+        res = await supabase.rpc("release_holds", {"p_holder": holder}).execute()
+        return res.data or 0
+
+    async def reap_expired_holds(self) -> int:
+        supabase = await get_supabase()
+        res = await supabase.rpc("reap_expired_holds", {}).execute()
+        return res.data or 0
+
+    async def availability_snapshot(self, start_date: str, end_date: str) -> dict:
+        supabase = await get_supabase()
+        res = await supabase.rpc(
+            "availability_snapshot", {"p_start": start_date, "p_end": end_date}
+        ).execute()
+        return res.data
+
+    async def list_slot_changes(self, after_seq: int, limit: int) -> list[dict]:
+        supabase = await get_supabase()
+        res = (
+            await supabase.table("slot_changes")
+            .select("*")
+            .gt("seq", after_seq)
+            .order("seq")
+            .limit(limit)
+            .execute()
+        )
+        return res.data or []
+
+    async def list_appointments(
+        self,
+        contact_number: str,
+        status: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        after: Optional[tuple] = None,
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        supabase = await get_supabase()
+        query = (
+            supabase.table("appointments")
+            .select(",".join(APPOINTMENT_COLUMNS))
+            .eq("contact_number", contact_number)
+        )
+        if status:
+            query = query.eq("status", status)
+        if start_date:
+            query = query.gte("date", start_date)
+        if end_date:
+            query = query.lte("date", end_date)
+        if after:
+            date, time, id_ = after
+            query = query.or_(
+                f"date.gt.{date},"
+                f"and(date.eq.{date},time.gt.{time}),"
+                f"and(date.eq.{date},time.eq.{time},id.gt.{id_})"
+            )
+        query = query.order("date").order("time").order("id")
+        if limit:
+            query = query.limit(limit)
+        res = await query.execute()
+        return res.data or []
+
+    async def cancel_appointment(self, appointment_id: str, known: Optional[dict] = None) -> Optional[dict]:
+        if known and known.get("status") == "cancelled":
+            return known
+        supabase = await get_supabase()
+        # Only a booked row flips, and the update returns it, so the slot to free
+        # comes from the database rather than from a possibly stale `known`.
+        res = (
+            await supabase.table("appointments")
+            .update({"status": "cancelled"})
+            .eq("id", appointment_id)
+            .eq("status", "booked")
+            .execute()
+        )
+        if not res.data:
+            # Already cancelled (e.g. a replayed write) or no such appointment.
+            appt_res = (
+                await supabase.table("appointments")
+                .select("date,time,status")
+                .eq("id", appointment_id)
+                .execute()
+            )
+            return appt_res.data[0] if appt_res.data else None
+
+        appointment = dict(res.data[0], status="booked")
+        date = appointment.get("date")
+        time = appointment.get("time")
+        if date and time:
+            await supabase.table("slots") \
+                .update({"is_booked": False}) \
+                .eq("date", date) \
+                .eq("time", time) \
+                .execute()
+        return appointment
+
+    async def insert_call_summaries(self, rows: list[dict]) -> None:
+        supabase = await get_supabase()
+        await supabase.table("call_summaries").insert(rows).execute()
+
+    async def ping(self) -> None:
+        # Creating the client is the expensive part; the query opens and checks the connection.
+        supabase = await get_supabase()
+        await supabase.table("slots").select("id").limit(1).execute()
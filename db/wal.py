@@ -0,0 +1,231 @@
+from typing import Optional
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import WAL_PATH
+from db.breaker import CircuitOpen
+from db.resilience import is_transient
+
+logger = logging.getLogger("db.wal")
+
+WAL_SCHEMA = """
+create table if not exists pending_writes (
+    id integer primary key autoincrement,
+    op text not null,
+    payload text not null,
+    created_at real not null,
+    attempts integer not null default 0,
+    last_error text
+);
+create table if not exists dead_writes (
+    id integer primary key,
+    op text not null,
+    payload text not null,
+    created_at real not null,
+    attempts integer not null,
+    last_error text,
+    dead_at real not null
+);
+create table if not exists replay_lease (
+    id integer primary key check (id = 1),
+    holder text not null,
+    expires_at real not null
+);
+"""
+
+# Writes that may be deferred: replaying them later gives the same end state.
+REPLAYABLE_OPS = ("insert_call_summaries", "cancel_appointment")
+
+
+class WriteAheadLog:
+    """Durable local queue of writes the storage backend could not take.
+
+    Entries are committed to a SQLite file (journal_mode=WAL,
+    synchronous=FULL) before the tool reports success, so they survive a
+    worker restart and are replayed in order once the backend recovers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=full")
+        self._conn.executescript(WAL_SCHEMA)
+
+    def append(self, op: str, payload: dict) -> int:
+        if op not in REPLAYABLE_OPS:
+            raise ValueError(f"{op} cannot be deferred")
+        with self._lock:
+            cur = self._conn.execute(
+                "insert into pending_writes (op, payload, created_at) values (?, ?, ?)",
+                (op, json.dumps(payload, default=str), time.time()),
+            )
+        logger.info(f"Deferred {op} to the write-ahead log (entry {cur.lastrowid})")
+        return cur.lastrowid
+
+    def pending(self, limit: int) -> list[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "select id, op, payload, attempts from pending_writes order by id limit ?", (limit,)
+            ).fetchall()
+        return [dict(row, payload=json.loads(row["payload"])) for row in rows]
+
+    def done(self, entry_id: int) -> None:
+        with self._lock:
+            self._conn.execute("delete from pending_writes where id = ?", (entry_id,))
+
+    def failed(self, entry_id: int, error: str, max_attempts: int) -> bool:
+        """Count a failed replay; returns True if the entry was moved to `dead_writes`.
+
+        An entry is given up on once it has failed `max_attempts` times
+        (pass 1 for an error that no retry will fix), so it can't hold up
+        the entries queued behind it. Dead entries are kept for inspection.
+        """
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                self._conn.execute(
+                    "update pending_writes set attempts = attempts + 1, last_error = ? where id = ?",
+                    (error[:500], entry_id),
+                )
+                moved = self._conn.execute(
+                    "insert into dead_writes (id, op, payload, created_at, attempts, last_error, dead_at)"
+                    " select id, op, payload, created_at, attempts, last_error, ? from pending_writes"
+                    " where id = ? and attempts >= ?",
+                    (time.time(), entry_id, max_attempts),
+                ).rowcount
+                if moved:
+                    self._conn.execute("delete from pending_writes where id = ?", (entry_id,))
+                self._conn.execute("commit")
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+        return bool(moved)
+
+    def lease(self, holder: str, ttl: float) -> bool:
+        """Take or renew the right to replay for `ttl` seconds; False while another holder has it.
+
+        Every worker process shares the log file, and only one of them may
+        replay at a time, or entries would be applied twice and out of order.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                row = self._conn.execute("select holder, expires_at from replay_lease where id = 1").fetchone()
+                ok = row is None or row["holder"] == holder or row["expires_at"] <= now
+                if ok:
+                    self._conn.execute(
+                        "insert or replace into replay_lease (id, holder, expires_at) values (1, ?, ?)",
+                        (holder, now + ttl),
+                    )
+                self._conn.execute("commit")
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+        return ok
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from pending_writes").fetchone()[0]
+
+    def dead(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from dead_writes").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"pending": len(self), "dead": self.dead()}
+
+
+class WalReplayer:
+    """Background task that drains the write-ahead log into the repository.
+
+    Every `interval` seconds it replays pending entries oldest first and
+    stops at the first failure, so order is preserved and a backend that is
+    still down sees one probe per interval rather than a burst. An entry
+    the backend rejects outright, or that has failed `max_attempts` times,
+    is moved to the dead-letter table and draining carries on. Each worker
+    process runs one, and they take turns through the log's replay lease;
+    a process that dies mid-pass leaves the lease to expire.
+    """
+
+    def __init__(self, wal: WriteAheadLog, repository, interval: float, batch: int, max_attempts: int):
+        self.wal = wal
+        self.repository = repository
+        self.interval = interval
+        self.batch = batch
+        self.max_attempts = max_attempts
+        self.replayed = 0
+        self.dead_lettered = 0
+        self.holder = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.debug(f"WAL replay pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def drain(self) -> int:
+        """Replay what the backend will take now. Returns how many entries were applied."""
+        applied = 0
+        while True:
+            if not self.wal.lease(self.holder, max(self.interval * 3, 30.0)):
+                return applied
+            entries = self.wal.pending(self.batch)
+            if not entries:
+                return applied
+            for entry in entries:
+                try:
+                    await getattr(self.repository, entry["op"])(**entry["payload"])
+                except CircuitOpen as e:
+                    # Not an attempt: nothing was sent.
+                    logger.info(f"WAL replay paused at entry {entry['id']}: {e}")
+                    return applied
+                except Exception as e:
+                    max_attempts = self.max_attempts if is_transient(e) else 1
+                    if not self.wal.failed(entry["id"], f"{type(e).__name__}: {e}", max_attempts):
+                        logger.info(f"WAL replay paused at entry {entry['id']}: {e}")
+                        return applied
+                    self.dead_lettered += 1
+                    logger.error(
+                        f"Gave up replaying {entry['op']} entry {entry['id']} after "
+                        f"{entry['attempts'] + 1} attempts: {type(e).__name__}: {e}"
+                    )
+                    continue
+                self.wal.done(entry["id"])
+                applied += 1
+                self.replayed += 1
+            logger.info(f"Replayed {applied} deferred writes")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+_wal = None
+
+
+def get_write_ahead_log() -> WriteAheadLog:
+    global _wal
+    if _wal is None:
+        _wal = WriteAheadLog(WAL_PATH)
+    return _wal
@@ -0,0 +1,247 @@
+from typing import Optional
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from config import SUMMARY_FLUSH_BATCH, SUMMARY_FLUSH_INTERVAL_SECONDS, SUMMARY_QUEUE_MAX, SUMMARY_SPOOL_PATH
+from db.repository import get_repository
+from db.resilience import is_transient
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("db.write_behind")
+
+SUMMARY_FLUSH_ROWS = get_registry().histogram(
+    "voice_call_summary_flush_rows",
+    "Rows per call_summaries batch insert.",
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+
+SPOOL_SCHEMA = """
+create table if not exists queued_summaries (
+    id integer primary key autoincrement,
+    row text not null,
+    queued_at real not null,
+    claimed_until real not null default 0
+);
+"""
+
+
+class SummarySpool:
+    """call_summaries rows waiting to be written, in a SQLite file shared by every worker process.
+
+    Under the process executor each job process takes one call, so a queue
+    in memory would never batch more than one row. Here any process may
+    queue a row and any process may claim a batch of them. A claim is a
+    lease: rows claimed by a process that dies become claimable again once
+    it expires, so a row may be written twice but is never lost.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.executescript(SPOOL_SCHEMA)
+
+    def append(self, row: dict, max_rows: int) -> int:
+        """Queue a row; returns how many of the oldest unclaimed rows were dropped to stay under `max_rows`."""
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                self._conn.execute(
+                    "insert into queued_summaries (row, queued_at) values (?, ?)",
+                    (json.dumps(row, default=str), time.time()),
+                )
+                # Only reachable if flushes keep failing outright; keep the newest.
+                dropped = self._conn.execute(
+                    "delete from queued_summaries where id in ("
+                    " select id from queued_summaries where claimed_until < ? order by id"
+                    " limit max((select count(*) from queued_summaries) - ?, 0))",
+                    (time.time(), max_rows),
+                ).rowcount
+                self._conn.execute("commit")
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+        return dropped
+
+    def claim(self, limit: int, lease: float) -> list[tuple[int, dict]]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("begin immediate")
+            try:
+                rows = self._conn.execute(
+                    "select id, row from queued_summaries where claimed_until < ? order by id limit ?",
+                    (now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "update queued_summaries set claimed_until = ? where id = ?",
+                    [(now + lease, row_id) for row_id, _ in rows],
+                )
+                self._conn.execute("commit")
+            except BaseException:
+                self._conn.execute("rollback")
+                raise
+        return [(row_id, json.loads(row)) for row_id, row in rows]
+
+    def remove(self, ids: list[int]) -> None:
+        with self._lock:
+            self._conn.executemany("delete from queued_summaries where id = ?", [(i,) for i in ids])
+
+    def release(self, ids: list[int]) -> None:
+        with self._lock:
+            self._conn.executemany("update queued_summaries set claimed_until = 0 where id = ?", [(i,) for i in ids])
+
+    def waiting(self) -> tuple[int, Optional[float]]:
+        """How many unclaimed rows are queued, and when the oldest of them was (wall clock)."""
+        with self._lock:
+            count, oldest = self._conn.execute(
+                "select count(*), min(queued_at) from queued_summaries where claimed_until < ?", (time.time(),)
+            ).fetchone()
+        return count, oldest
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from queued_summaries").fetchone()[0]
+
+
+class SummaryWriter:
+    """Write-behind queue for call_summaries rows, shared by every worker process on the host.
+
+    `submit` only appends to the spool file, so hanging up never waits on
+    the database; it may be called from any job's thread. Each process runs
+    a flusher on the loop that called `start`, which writes queued rows as
+    one multi-row insert once `max_batch` rows are waiting or the oldest has
+    waited `flush_interval` seconds, whichever process queued them; rows
+    left by a process that has exited are picked up within another
+    `flush_interval`. Failed inserts land in the repository's write-ahead
+    log, so rows are not lost.
+    """
+
+    def __init__(self, spool: SummarySpool, max_batch: int, flush_interval: float, max_queue: int):
+        self.spool = spool
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.lease = max(flush_interval * 5, 30.0)
+        self.flushed = 0
+        self.dropped = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def submit(self, row: dict) -> None:
+        if self._task is None:
+            # Not started by the background services (benchmarks): flush from this loop.
+            self.start()
+        dropped = self.spool.append(row, self.max_queue)
+        self.dropped += dropped
+        # Let the flusher pick up the deadline of a new batch, or a full one.
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                count, oldest = self.spool.waiting()
+                due = count >= self.max_batch or (
+                    oldest is not None and time.time() - oldest >= self.flush_interval
+                )
+                if due:
+                    await self.flush()
+                    count, oldest = self.spool.waiting()
+            except Exception as e:
+                logger.error(f"Call summary flush failed: {e}")
+                count, oldest = 0, None
+            # Other processes' rows arrive without waking us, so look again every interval.
+            timeout = self.flush_interval
+            if oldest is not None:
+                timeout = min(timeout, max(oldest + self.flush_interval - time.time(), 0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def flush(self) -> int:
+        """Write every unclaimed queued row now. Returns how many rows were handed to the repository."""
+        written = 0
+        while True:
+            claimed = self.spool.claim(self.max_batch, self.lease)
+            if not claimed:
+                break
+            ids = [row_id for row_id, _ in claimed]
+            batch = [row for _, row in claimed]
+            try:
+                await get_repository().insert_call_summaries(batch)
+            except Exception as e:
+                if is_transient(e):
+                    logger.error(f"Failed to write {len(batch)} call summaries: {e}")
+                    self.spool.release(ids)
+                    break
+                # The backend rejected the batch, and would again: find the rows at fault.
+                written += await self._write_each(claimed)
+                continue
+            self.spool.remove(ids)
+            written += len(batch)
+            self.flushed += len(batch)
+            SUMMARY_FLUSH_ROWS.observe(len(batch))
+        if written:
+            logger.info(f"Flushed {written} call summaries")
+        return written
+
+    async def _write_each(self, claimed: list[tuple[int, dict]]) -> int:
+        """Insert rows one at a time, dropping those the backend rejects. Returns how many were written."""
+        written = 0
+        for row_id, row in claimed:
+            try:
+                await get_repository().insert_call_summaries([row])
+            except Exception as e:
+                if is_transient(e):
+                    self.spool.release([row_id])
+                    continue
+                logger.error(f"Dropping call summary rejected by the backend: {e}")
+                self.dropped += 1
+            else:
+                written += 1
+                self.flushed += 1
+                SUMMARY_FLUSH_ROWS.observe(1)
+            self.spool.remove([row_id])
+        return written
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {"queued": len(self.spool), "flushed": self.flushed, "dropped": self.dropped}
+
+
+_summary_writer = None
+
+
+def get_summary_writer() -> SummaryWriter:
+    global _summary_writer
+    if _summary_writer is None:
+        _summary_writer = SummaryWriter(
+            SummarySpool(SUMMARY_SPOOL_PATH),
+            SUMMARY_FLUSH_BATCH,
+            SUMMARY_FLUSH_INTERVAL_SECONDS,
+            SUMMARY_QUEUE_MAX,
+        )
+    return _summary_writer
@@ -1,13 +1,13 @@
-from livekit.plugins import openai as lk_openai
-from config import OPENROUTER_API_KEY
+from providers.registry import resolve
+from config import OPENROUTER_API_KEY, OPENROUTER_BASE_URL, OPENROUTER_MODEL
 
 def get_openrouter_llm():
     """Returns an LLM configured for OpenRouter using OpenAI-compatible client."""
     if not OPENROUTER_API_KEY:
         raise ValueError("OPENROUTER_API_KEY must be set")
-    # Using meta-llama model which supports function/tool calling
-    return lk_openai.LLM(
-        model="meta-llama/llama-3.3-70b-instruct:free",
-        base_url="https://openrouter.ai/api/v1",
+    # Default is a meta-llama model, which supports function/tool calling
+    return resolve("llm", "openai")(
+        model=OPENROUTER_MODEL,
+        base_url=OPENROUTER_BASE_URL,
         api_key=OPENROUTER_API_KEY,
     )
@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Optional
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import threading
+import time
+
+from livekit.agents import APIConnectionError, llm
+from livekit.agents.llm import ChatChunk, ChatContext, LLMStream, Tool, ToolChoice
+from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, APIConnectOptions, NotGivenOr
+
+from config import (
+    LLM_BACKENDS,
+    LLM_FIRST_TOKEN_TIMEOUT,
+    LLM_CHUNK_TIMEOUT,
+    LLM_ROUTER_EWMA_ALPHA,
+    LLM_ROUTER_ERROR_WINDOW,
+    LLM_ROUTER_MAX_ERROR_RATE,
+    LLM_ROUTER_COOLDOWN_SECONDS,
+    LLM_ROUTER_STALE_SECONDS,
+    LLM_ROUTER_STATS_DIR,
+)
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("llm.router")
+
+BACKEND_TTFT = get_registry().histogram(
+    "voice_llm_backend_ttft_seconds", "Time to first token per LLM backend, as seen by the router."
+)
+BACKEND_ERRORS = get_registry().counter(
+    "voice_llm_backend_errors_total", "LLM backend attempts that failed, by backend and kind."
+)
+BACKEND_ROUTED = get_registry().counter(
+    "voice_llm_routed_total", "Turns answered by each LLM backend."
+)
+
+# The router retries across backends itself, so each backend gets one attempt.
+ROUTER_CONN_OPTIONS = APIConnectOptions(max_retry=0, timeout=DEFAULT_API_CONNECT_OPTIONS.timeout)
+
+
+class BackendStats:
+    """Rolling health of one LLM backend, shared by every worker process on the host.
+
+    `ttft` is an exponentially weighted mean of time to first token. `outcomes`
+    holds the last `window` attempts (True = failed); once the failure rate
+    exceeds `max_error_rate` the backend sits out `cooldown` seconds. Stats
+    older than `stale_after` are treated as unknown so a backend that was
+    slow or throttled earlier gets tried again.
+
+    Each job process takes one call, so the stats are also kept in a small
+    JSON file at `path`, written after every update and read back whenever
+    it changes. A backend found dead by one call is then routed around by
+    the next, instead of costing every new process a first-token timeout.
+    Concurrent updates are last writer wins, which is close enough for a
+    rolling average.
+    """
+
+    def __init__(self, name: str, alpha: float, window: int, max_error_rate: float,
+                 cooldown: float, stale_after: float, path: Optional[str] = None):
+        self.name = name
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.stale_after = stale_after
+        self.path = path
+        self.ttft: Optional[float] = None
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        # Wall clock, so the times mean the same in every process.
+        self.updated_at = 0.0
+        self.cooldown_until = 0.0
+        self._mtime_ns: Optional[int] = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Pick up what other worker processes recorded since we last looked."""
+        if self.path is None:
+            return
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            if mtime_ns == self._mtime_ns:
+                return
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not read LLM backend stats from {self.path}: {e}")
+            return
+        self._mtime_ns = mtime_ns
+        self.ttft = state.get("ttft")
+        self.outcomes = deque(state.get("outcomes", []), maxlen=self.outcomes.maxlen)
+        self.updated_at = float(state.get("updated_at", 0.0))
+        self.cooldown_until = float(state.get("cooldown_until", 0.0))
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        state = {
+            "ttft": self.ttft,
+            "outcomes": list(self.outcomes),
+            "updated_at": self.updated_at,
+            "cooldown_until": self.cooldown_until,
+        }
+        tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, self.path)
+            self._mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            logger.debug(f"Could not save LLM backend stats to {self.path}: {e}")
+
+    def record_ttft(self, seconds: float) -> None:
+        self.refresh()
+        self.ttft = seconds if self.ttft is None else self.alpha * seconds + (1 - self.alpha) * self.ttft
+        self.outcomes.append(False)
+        self.updated_at = time.time()
+        self._save()
+        BACKEND_TTFT.observe(seconds, {"backend": self.name})
+
+    def record_failure(self, kind: str) -> None:
+        self.refresh()
+        self.outcomes.append(True)
+        self.updated_at = time.time()
+        BACKEND_ERRORS.inc(1, {"backend": self.name, "kind": kind})
+        if kind == "stall" or self.error_rate > self.max_error_rate:
+            self.cooldown_until = time.time() + self.cooldown
+            logger.warning(f"LLM backend {self.name} cooling down for {self.cooldown:.0f}s after {kind}")
+        self._save()
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.time() >= self.cooldown_until
+
+    def score(self) -> float:
+        """Expected TTFT; unknown or stale backends score 0 so they get (re)measured."""
+        if self.ttft is None or time.time() - self.updated_at > self.stale_after:
+            return 0.0
+        return self.ttft
+
+    def stats(self) -> dict:
+        return {
+            f"{self.name}_ttft_seconds": round(self.ttft or 0.0, 4),
+            f"{self.name}_error_rate": round(self.error_rate, 4),
+            f"{self.name}_healthy": int(self.healthy),
+        }
+
+
+_backend_stats: dict[str, BackendStats] = {}
+
+
+def get_backend_stats(name: str) -> BackendStats:
+    stats = _backend_stats.get(name)
+    if stats is None:
+        stats = _backend_stats[name] = BackendStats(
+            name,
+            alpha=LLM_ROUTER_EWMA_ALPHA,
+            window=LLM_ROUTER_ERROR_WINDOW,
+            max_error_rate=LLM_ROUTER_MAX_ERROR_RATE,
+            cooldown=LLM_ROUTER_COOLDOWN_SECONDS,
+            stale_after=LLM_ROUTER_STALE_SECONDS,
+            path=os.path.join(LLM_ROUTER_STATS_DIR, f"{name}.json") if LLM_ROUTER_STATS_DIR else None,
+        )
+    else:
+        stats.refresh()
+    return stats
+
+
+def router_stats() -> dict:
+    merged = {}
+    for stats in _backend_stats.values():
+        merged.update(stats.stats())
+    return merged
+
+
+class _Stalled(Exception):
+    pass
+
+
+async def _open_connection(instance: llm.LLM) -> None:
+    """Make one request on the backend's HTTP client so a connection sits in its keep-alive pool."""
+    client = getattr(instance, "_client", None)
+    http = getattr(client, "_client", None)
+    if http is None:
+        instance.prewarm()
+        return
+    # Any status will do; the point is the open connection, not the answer.
+    response = await http.request("HEAD", str(client.base_url))
+    await response.aclose()
+
+
+class LLMRouter(llm.LLM):
+    """Routes each LLM request to the fastest healthy backend.
+
+    Backends are ordered by health, then rolling time to first token, then
+    configured preference. A backend that errors, or produces no token
+    within `first_token_timeout` (or stops for `chunk_timeout` mid-stream),
+    is marked down and the request moves to the next one, as long as
+    nothing has been streamed to the session yet.
+    """
+
+    def __init__(
+        self,
+        backends: list[tuple[str, llm.LLM]],
+        *,
+        first_token_timeout: float = LLM_FIRST_TOKEN_TIMEOUT,
+        chunk_timeout: float = LLM_CHUNK_TIMEOUT,
+    ) -> None:
+        if not backends:
+            raise ValueError("at least one LLM backend must be configured")
+        super().__init__()
+        self._backends = backends
+        self._first_token_timeout = first_token_timeout
+        self._chunk_timeout = chunk_timeout
+        self._warm_task: Optional[asyncio.Task] = None
+        for _, instance in backends:
+            instance.on("metrics_collected", self._on_metrics_collected)
+
+    @property
+    def model(self) -> str:
+        return "LLMRouter"
+
+    @property
+    def provider(self) -> str:
+        return "router"
+
+    def ranked(self) -> list[tuple[str, llm.LLM]]:
+        order = {name: i for i, (name, _) in enumerate(self._backends)}
+
+        def key(backend):
+            stats = get_backend_stats(backend[0])
+            return (not stats.healthy, stats.score(), order[backend[0]])
+
+        return sorted(self._backends, key=key)
+
+    def prewarm(self) -> None:
+        # The session calls this when it starts; usually `warm` has run already.
+        if self._warm_task is None:
+            self._warm_task = asyncio.ensure_future(self.warm())
+
+    async def warm(self) -> dict[str, float]:
+        """Open a keep-alive connection to every backend so the first turn skips TCP and TLS setup.
+
+        Backends that can't be reached are recorded as failed, so the first
+        turn is routed around them. Returns connect seconds per reachable backend.
+        """
+        if self._warm_task is None:
+            self._warm_task = asyncio.ensure_future(self._warm_all())
+        return await asyncio.shield(self._warm_task)
+
+    async def _warm_all(self) -> dict[str, float]:
+        async def warm_one(name: str, instance: llm.LLM) -> tuple[str, Optional[float]]:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(_open_connection(instance), self._first_token_timeout)
+            except Exception as e:
+                get_backend_stats(name).record_failure("warmup")
+                logger.warning(f"LLM backend {name} unreachable at warm-up: {type(e).__name__}: {e}")
+                return name, None
+            return name, time.perf_counter() - started
+
+        results = await asyncio.gather(*(warm_one(name, instance) for name, instance in self._backends))
+        return {name: seconds for name, seconds in results if seconds is not None}
+
+    def chat(
+        self,
+        *,
+        chat_ctx: ChatContext,
+        tools: list[Tool] | None = None,
+        conn_options: APIConnectOptions = ROUTER_CONN_OPTIONS,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> LLMStream:
+        return RoutedLLMStream(
+            self,
+            chat_ctx=chat_ctx,
+            tools=tools or [],
+            conn_options=conn_options,
+            parallel_tool_calls=parallel_tool_calls,
+            tool_choice=tool_choice,
+            extra_kwargs=extra_kwargs,
+        )
+
+    async def aclose(self) -> None:
+        for _, instance in self._backends:
+            instance.off("metrics_collected", self._on_metrics_collected)
+
+    def _on_metrics_collected(self, *args: Any, **kwargs: Any) -> None:
+        # Usage accounting and tracing listen on the session's LLM.
+        self.emit("metrics_collected", *args, **kwargs)
+
+
+class RoutedLLMStream(LLMStream):
+    def __init__(
+        self,
+        router: LLMRouter,
+        *,
+        chat_ctx: ChatContext,
+        tools: list[Tool],
+        conn_options: APIConnectOptions,
+        parallel_tool_calls: NotGivenOr[bool] = NOT_GIVEN,
+        tool_choice: NotGivenOr[ToolChoice] = NOT_GIVEN,
+        extra_kwargs: NotGivenOr[dict[str, Any]] = NOT_GIVEN,
+    ) -> None:
+        super().__init__(router, chat_ctx=chat_ctx, tools=tools, conn_options=conn_options)
+        self._router = router
+        self._parallel_tool_calls = parallel_tool_calls
+        self._tool_choice = tool_choice
+        self._extra_kwargs = extra_kwargs
+        self._sent = False
+
+    async def _attempt(self, name: str, instance: llm.LLM) -> None:
+        """Stream one backend's answer into this stream, guarding against stalls."""
+        stats = get_backend_stats(name)
+        started = time.perf_counter()
+        async with instance.chat(
+            chat_ctx=self._chat_ctx,
+            tools=self._tools,
+            parallel_tool_calls=self._parallel_tool_calls,
+            tool_choice=self._tool_choice,
+            extra_kwargs=self._extra_kwargs,
+            conn_options=dataclasses.replace(self._conn_options, max_retry=0),
+        ) as stream:
+            chunks = stream.__aiter__()
+            while True:
+                timeout = self._router._chunk_timeout if self._sent else self._router._first_token_timeout
+                try:
+                    chunk: ChatChunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise _Stalled(f"{name} produced nothing for {timeout:.1f}s")
+                if not self._sent:
+                    stats.record_ttft(time.perf_counter() - started)
+                    self._sent = True
+                self._event_ch.send_nowait(chunk)
+        if not self._sent:
+            # An empty answer still tells us how fast the backend responded.
+            stats.record_ttft(time.perf_counter() - started)
+
+    async def _run(self) -> None:
+        started = time.time()
+        tried = []
+        for name, instance in self._router.ranked():
+            stats = get_backend_stats(name)
+            tried.append(name)
+            try:
+                await self._attempt(name, instance)
+                BACKEND_ROUTED.inc(1, {"backend": name})
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stats.record_failure("stall" if isinstance(e, _Stalled) else "error")
+                if self._sent:
+                    # Part of the answer already reached the session; it can't be retracted.
+                    raise
+                logger.warning(f"LLM backend {name} failed ({e}); trying the next backend")
+        raise APIConnectionError(f"all LLM backends failed ({tried}) after {time.time() - started:.1f}s")
+
+    async def _metrics_monitor_task(self, event_aiter) -> None:
+        # The backend's own stream reports LLMMetrics; reporting here too would double count.
+        return
+
+
+def _factories() -> dict[str, Callable[[], llm.LLM]]:
+    from llm.ollama_llm import get_ollama_llm
+    from llm.openrouter_llm import get_openrouter_llm
+
+    return {"openrouter": get_openrouter_llm, "ollama": get_ollama_llm}
+
+
+def build_llm_router() -> LLMRouter:
+    """Create the configured backends (skipping any that can't be built) behind one router."""
+    factories = _factories()
+    backends = []
+    for name in LLM_BACKENDS:
+        factory = factories.get(name)
+        if factory is None:
+            logger.warning(f"Unknown LLM backend {name!r} in LLM_BACKENDS")
+            continue
+        try:
+            backends.append((name, factory()))
+        except Exception as e:
+            logger.warning(f"Skipping LLM backend {name}: {e}")
+    return LLMRouter(backends)
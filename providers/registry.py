@@ -0,0 +1,85 @@
+from typing import Any
+import importlib
+import logging
+import threading
+import time
+
+from config import BEYOND_API_KEY, LLM_BACKENDS, STORAGE_BACKEND
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("providers.registry")
+
+PROVIDER_IMPORT_SECONDS = get_registry().histogram(
+    "voice_provider_import_seconds", "Time to import a provider package the first time it is resolved."
+)
+
+# (kind, name) -> (module, attribute). Nothing here is imported until it is resolved.
+PROVIDERS = {
+    ("vad", "silero"): ("livekit.plugins.silero", "VAD"),
+    ("stt", "deepgram"): ("livekit.plugins.deepgram", "STT"),
+    ("tts", "cartesia"): ("livekit.plugins.cartesia", "TTS"),
+    ("llm", "openai"): ("livekit.plugins.openai", "LLM"),
+    ("avatar", "bey"): ("livekit.plugins.bey", "AvatarSession"),
+    ("storage", "supabase"): ("supabase", "create_async_client"),
+}
+
+# LLM backends and the plugin that talks to them.
+LLM_BACKEND_PLUGINS = {"openrouter": "openai", "ollama": "openai"}
+
+_resolved: dict[tuple[str, str], Any] = {}
+_import_seconds: dict[str, float] = {}
+
+
+def resolve(kind: str, name: str) -> Any:
+    """Import the provider's package on first use and return its class or factory."""
+    key = (kind, name)
+    found = _resolved.get(key)
+    if found is not None:
+        return found
+    if key not in PROVIDERS:
+        raise ValueError(f"Unknown {kind} provider {name!r}")
+    module_name, attribute = PROVIDERS[key]
+    started = time.perf_counter()
+    module = importlib.import_module(module_name)
+    seconds = time.perf_counter() - started
+    # Already imported (e.g. preloaded by the forkserver) costs next to nothing; only count real imports.
+    if seconds > 0.001:
+        _import_seconds[f"{kind}.{name}"] = seconds
+        PROVIDER_IMPORT_SECONDS.observe(seconds, {"provider": f"{kind}.{name}"})
+    found = _resolved[key] = getattr(module, attribute)
+    return found
+
+
+def configured() -> list[tuple[str, str]]:
+    """The providers this configuration will use; everything else stays unimported."""
+    wanted = [("vad", "silero"), ("stt", "deepgram"), ("tts", "cartesia")]
+    for plugin in sorted({LLM_BACKEND_PLUGINS[b] for b in LLM_BACKENDS if b in LLM_BACKEND_PLUGINS}):
+        wanted.append(("llm", plugin))
+    if BEYOND_API_KEY:
+        wanted.append(("avatar", "bey"))
+    if STORAGE_BACKEND == "supabase":
+        wanted.append(("storage", "supabase"))
+    return wanted
+
+
+def load_configured() -> dict[str, float]:
+    """Import every configured provider now; returns import seconds for those that weren't loaded yet.
+
+    livekit plugins register themselves on import and must do so on the
+    main thread, so call this from the main process before the worker
+    starts (the forkserver then preloads them for every job process) and
+    from the setup function (for spawned processes).
+    """
+    if threading.current_thread() is not threading.main_thread():
+        logger.warning("Loading providers off the main thread; livekit plugins may refuse to register")
+    before = dict(_import_seconds)
+    for kind, name in configured():
+        try:
+            resolve(kind, name)
+        except ImportError as e:
+            logger.error(f"{kind} provider {name} is configured but not installed: {e}")
+    return {k: v for k, v in _import_seconds.items() if k not in before}
+
+
+def import_stats() -> dict:
+    return {f"{name}_import_seconds": round(seconds, 4) for name, seconds in _import_seconds.items()}
@@ -0,0 +1,289 @@
+from collections import OrderedDict
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional
+import hashlib
+import logging
+import mmap
+import os
+import time
+
+from livekit import rtc
+
+from config import PHRASE_CACHE_DIR, PHRASE_CACHE_MAX_BYTES, PHRASE_CACHE_MAX_OPEN
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("speech.phrase_cache")
+
+PHRASE_CACHE_HITS = get_registry().counter(
+    "voice_tts_phrase_cache_hits_total", "Fixed phrases played from pre-synthesized audio."
+)
+PHRASE_CACHE_MISSES = get_registry().counter(
+    "voice_tts_phrase_cache_misses_total", "Fixed phrases that had to be synthesized by the TTS."
+)
+PHRASE_WARM_SECONDS = get_registry().histogram(
+    "voice_tts_phrase_warm_seconds", "Time to synthesize one fixed phrase into the cache."
+)
+
+FRAME_MS = 20
+_SUFFIX = ".pcm"
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def audio_frames(pcm, sample_rate: int, num_channels: int, frame_ms: int = FRAME_MS) -> Iterator[rtc.AudioFrame]:
+    """Slice raw int16 PCM into fixed-length frames."""
+    samples = sample_rate * frame_ms // 1000
+    step = samples * num_channels * 2
+    for offset in range(0, len(pcm), step):
+        chunk = pcm[offset:offset + step]
+        yield rtc.AudioFrame(
+            data=bytes(chunk),
+            sample_rate=sample_rate,
+            num_channels=num_channels,
+            samples_per_channel=len(chunk) // (2 * num_channels),
+        )
+
+
+class PhraseAudioCache:
+    """Pre-synthesized audio for fixed phrases, shared by every worker on the host.
+
+    Each entry is a raw int16 PCM file named by the hash of (text, voice,
+    model, sample rate, channels). Files are written to a temp name and
+    renamed into place, so readers in other processes never see a partial
+    entry, and they are read through mmap so concurrent workers share one
+    copy in the page cache. Up to `max_open` maps are kept open per process;
+    on disk the directory is held under `max_bytes` by deleting the least
+    recently used files (a hit touches the file's mtime).
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_open: int = 64):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_open = max_open
+        self._open: OrderedDict[str, mmap.mmap] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(text: str, voice: str, model: str, sample_rate: int, num_channels: int) -> str:
+        raw = "\x1f".join((normalize(text), voice, model, str(sample_rate), str(num_channels)))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional[mmap.mmap]:
+        """The entry's PCM as a read-only map, or None on a miss."""
+        pcm = self._open.get(key)
+        if pcm is not None:
+            self._open.move_to_end(key)
+        else:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    pcm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                # ValueError: an empty file can't be mapped.
+                self.misses += 1
+                PHRASE_CACHE_MISSES.inc()
+                return None
+            self._open[key] = pcm
+            while len(self._open) > self.max_open:
+                # Frames being played keep their own reference, so just drop ours.
+                self._open.popitem(last=False)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        self.hits += 1
+        PHRASE_CACHE_HITS.inc()
+        return pcm
+
+    def contains(self, key: str) -> bool:
+        return key in self._open or os.path.exists(self._path(key))
+
+    def put(self, key: str, pcm: bytes) -> None:
+        if not pcm:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(pcm)
+        os.replace(tmp, path)
+        self._open.pop(key, None)
+        self.stores += 1
+        self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(_SUFFIX)]
+        except FileNotFoundError:
+            return
+        sized = []
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except FileNotFoundError:
+                continue
+            sized.append((st.st_mtime, st.st_size, entry))
+        total = sum(size for _, size, _ in sized)
+        for _, size, entry in sorted(sized, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+            self._open.pop(entry.name[: -len(_SUFFIX)], None)
+            total -= size
+            self.evictions += 1
+
+    def preload(self) -> int:
+        """Map the most recently used entries now so the first hit doesn't touch the disk."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(_SUFFIX)]
+        except FileNotFoundError:
+            return 0
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        loaded = 0
+        for entry in entries[: self.max_open]:
+            key = entry.name[: -len(_SUFFIX)]
+            if key in self._open:
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    self._open[key] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                loaded += 1
+            except (OSError, ValueError):
+                continue
+        return loaded
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "open": len(self._open),
+        }
+
+
+_phrase_cache: Optional[PhraseAudioCache] = None
+
+
+def get_phrase_cache() -> PhraseAudioCache:
+    global _phrase_cache
+    if _phrase_cache is None:
+        _phrase_cache = PhraseAudioCache(PHRASE_CACHE_DIR, PHRASE_CACHE_MAX_BYTES, PHRASE_CACHE_MAX_OPEN)
+    return _phrase_cache
+
+
+def _voice_of(tts) -> str:
+    # Plugins keep the voice in their options; fall back to the label so
+    # different providers never share entries.
+    opts = getattr(tts, "_opts", None)
+    voice = getattr(opts, "voice", None)
+    return str(voice) if voice is not None else tts.label
+
+
+async def _replay(buffered: list[str], rest: Optional[AsyncIterator[str]]) -> AsyncIterator[str]:
+    for chunk in buffered:
+        yield chunk
+    if rest is not None:
+        async for chunk in rest:
+            yield chunk
+
+
+class PhraseVoice:
+    """The phrase cache bound to one session's TTS.
+
+    `tts_node` wraps the agent's normal TTS node. While the text coming in
+    could still be one of the known phrases it is held back; if it turns out
+    to be exactly one, the cached audio is played straight away with no TTS
+    request. Anything else is passed on to the TTS unchanged. A known phrase
+    that isn't cached yet is synthesized normally and stored on the way out.
+    """
+
+    def __init__(self, tts, phrases: Iterable[str], cache: Optional[PhraseAudioCache] = None):
+        self.tts = tts
+        self.cache = cache or get_phrase_cache()
+        self.phrases = {normalize(p) for p in phrases if p and p.strip()}
+        self._voice = _voice_of(tts)
+
+    def key(self, phrase: str) -> str:
+        return self.cache.key(phrase, self._voice, self.tts.model, self.tts.sample_rate, self.tts.num_channels)
+
+    def _could_match(self, text: str) -> bool:
+        prefix = normalize(text)
+        if not prefix:
+            return True
+        if text[-1].isspace():
+            prefix += " "
+        return any(phrase.startswith(prefix) for phrase in self.phrases)
+
+    def _store(self, phrase: str, frames: list[rtc.AudioFrame]) -> None:
+        if not frames or any(
+            f.sample_rate != self.tts.sample_rate or f.num_channels != self.tts.num_channels for f in frames
+        ):
+            return
+        self.cache.put(self.key(phrase), b"".join(f.data.tobytes() for f in frames))
+
+    async def tts_node(
+        self,
+        text: AsyncIterable[str],
+        synthesize: Callable[[AsyncIterable[str]], AsyncIterable[rtc.AudioFrame]],
+    ) -> AsyncIterator[rtc.AudioFrame]:
+        chunks = text.__aiter__()
+        buffered: list[str] = []
+        ended = True
+        async for chunk in chunks:
+            buffered.append(chunk)
+            if not self._could_match("".join(buffered)):
+                ended = False
+                break
+
+        phrase = normalize("".join(buffered)) if ended else ""
+        if phrase not in self.phrases:
+            async for frame in synthesize(_replay(buffered, None if ended else chunks)):
+                yield frame
+            return
+
+        pcm = self.cache.get(self.key(phrase))
+        if pcm is not None:
+            for frame in audio_frames(pcm, self.tts.sample_rate, self.tts.num_channels):
+                yield frame
+            return
+
+        frames = []
+        async for frame in synthesize(_replay(buffered, None)):
+            frames.append(frame)
+            yield frame
+        # Only reached if playback wasn't interrupted, so the audio is complete.
+        self._store(phrase, frames)
+
+    async def warm(self) -> int:
+        """Synthesize every known phrase that isn't cached yet; returns how many were added."""
+        added = 0
+        for phrase in sorted(self.phrases):
+            key = self.key(phrase)
+            if self.cache.contains(key):
+                continue
+            started = time.perf_counter()
+            try:
+                frames = []
+                async with self.tts.synthesize(phrase) as stream:
+                    async for ev in stream:
+                        frames.append(ev.frame)
+            except Exception as e:
+                logger.warning(f"Could not pre-synthesize {phrase!r}: {e}")
+                continue
+            self._store(phrase, frames)
+            PHRASE_WARM_SECONDS.observe(time.perf_counter() - started)
+            added += 1
+        if added:
+            logger.info(f"Pre-synthesized {added} fixed phrases")
+        return added
@@ -0,0 +1,120 @@
+from typing import Awaitable, Callable, Iterable
+import asyncio
+import logging
+
+from startup.warmup import StartupPhases
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("startup.bringup")
+
+TIME_TO_FIRST_GREETING = get_registry().histogram(
+    "voice_time_to_first_greeting_seconds", "From the start of the job until the greeting's first audio plays."
+)
+STAGES_DEGRADED = get_registry().counter(
+    "voice_bringup_degraded_total", "Optional bring-up stages that failed or timed out; the call went on without them."
+)
+
+
+class BringUpFailed(Exception):
+    pass
+
+
+class _Stage:
+    __slots__ = ("name", "run", "after", "timeout", "required")
+
+    def __init__(self, name: str, run: Callable[[], Awaitable], after: tuple, timeout: float, required: bool):
+        self.name = name
+        self.run = run
+        self.after = after
+        self.timeout = timeout
+        self.required = required
+
+
+class BringUp:
+    """Runs the steps of starting a call concurrently, in dependency order.
+
+    Each stage starts as soon as the stages it comes `after` have finished,
+    and is bounded by its own `timeout`. A required stage that fails fails
+    the bring-up, and the stages that depend on it are skipped. An optional
+    stage that fails is logged and counted, and the stages after it run
+    anyway. That way the call degrades (no avatar, a cold connection)
+    instead of stopping. Stages must be added after the stages they depend
+    on, which keeps the graph acyclic. Timings go to `phases`.
+    """
+
+    def __init__(self, phases: StartupPhases):
+        self.phases = phases
+        self._stages: dict[str, _Stage] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[], Awaitable],
+        *,
+        after: Iterable[str] = (),
+        timeout: float,
+        required: bool = False,
+    ) -> None:
+        after = tuple(after)
+        for dep in after:
+            if dep not in self._stages:
+                raise ValueError(f"stage {name!r} depends on unknown stage {dep!r}")
+        if name in self._stages:
+            raise ValueError(f"stage {name!r} added twice")
+        self._stages[name] = _Stage(name, run, after, timeout, required)
+        if self._tasks:
+            # Already running: start the new stage right away.
+            self._tasks[name] = asyncio.create_task(self._run(self._stages[name]), name=f"bringup_{name}")
+
+    def start(self) -> None:
+        for stage in self._stages.values():
+            if stage.name not in self._tasks:
+                self._tasks[stage.name] = asyncio.create_task(self._run(stage), name=f"bringup_{stage.name}")
+
+    async def _run(self, stage: _Stage) -> bool:
+        for dep in stage.after:
+            if not await asyncio.shield(self._tasks[dep]) and self._stages[dep].required:
+                logger.warning(f"Skipping {stage.name}: {dep} failed")
+                return False
+        ok = await self.phases.run(stage.name, stage.run(), stage.timeout)
+        if not ok and not stage.required:
+            STAGES_DEGRADED.inc(1, {"stage": stage.name})
+        return ok
+
+    def has(self, name: str) -> bool:
+        return name in self._stages
+
+    async def wait(self, *names: str) -> dict[str, bool]:
+        """Wait for the named stages (ones never added are ignored); raises if a required one failed."""
+        names = [name for name in names if name in self._tasks]
+        results = await asyncio.gather(*(asyncio.shield(self._tasks[name]) for name in names))
+        outcome = dict(zip(names, results))
+        for name, ok in outcome.items():
+            if not ok and self._stages[name].required:
+                raise BringUpFailed(f"required stage {name} failed")
+        return outcome
+
+    async def aclose(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+
+async def greet(session, text: str, phases: StartupPhases) -> float:
+    """Say the greeting and return when its first audio plays; records time to first greeting."""
+    playing: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def on_state(event):
+        if getattr(event, "new_state", None) == "speaking" and not playing.done():
+            playing.set_result(phases.elapsed)
+
+    session.on("agent_state_changed", on_state)
+    try:
+        session.say(text)
+        seconds = await playing
+    finally:
+        session.off("agent_state_changed", on_state)
+    TIME_TO_FIRST_GREETING.observe(seconds)
+    logger.info(f"Time to first greeting: {seconds * 1000:.0f}ms")
+    return seconds
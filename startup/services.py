@@ -0,0 +1,88 @@
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Coroutine, Optional
+import asyncio
+import inspect
+import logging
+import threading
+
+logger = logging.getLogger("startup.services")
+
+
+class BackgroundServices:
+    """Process-lifetime background work, on an event loop of its own.
+
+    A job's event loop only lives as long as its call: under the process
+    executor each job process takes one call and exits, and under the
+    thread executor every job thread runs a loop of its own. Work that
+    belongs to the process instead (draining the write-ahead log, reaping
+    holds, flushing call summaries) runs here, on a daemon thread that
+    prewarm starts. Each service is started once per process and is never
+    stopped by a job; it ends with the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started: dict[str, Future] = {}
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="background_services", daemon=True).start()
+            return self._loop
+
+    def start(self, name: str, start: Callable[[], Optional[Awaitable]]) -> Future:
+        """Run `start` on the services loop, once per process.
+
+        Later calls with the same name return the first call's future,
+        unless it failed, in which case `start` is tried again.
+        """
+        loop = self.loop
+        with self._lock:
+            future = self._started.get(name)
+            if future is not None and not (future.done() and (future.cancelled() or future.exception())):
+                return future
+
+            async def _start():
+                result = start()
+                if inspect.isawaitable(result):
+                    await result
+
+            future = asyncio.run_coroutine_threadsafe(_start(), loop)
+            self._started[name] = future
+
+        def _done(f: Future):
+            if not f.cancelled() and f.exception() is not None:
+                logger.warning(f"Background service {name} failed to start: {f.exception()}")
+
+        future.add_done_callback(_done)
+        return future
+
+    async def run(self, coro: Coroutine, timeout: float):
+        """Await `coro` on the services loop from a job's loop, for at most `timeout` seconds."""
+        return await asyncio.wait_for(asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop)), timeout)
+
+    def stats(self) -> dict:
+        """`{name}_running` and `{name}_failed` (0 or 1) per service; both are 0 while it starts."""
+        stats = {}
+        with self._lock:
+            for name, f in self._started.items():
+                failed = f.done() and bool(f.cancelled() or f.exception())
+                stats[f"{name}_running"] = int(f.done() and not failed)
+                stats[f"{name}_failed"] = int(failed)
+        return stats
+
+
+_services = None
+_services_lock = threading.Lock()
+
+
+def get_background_services() -> BackgroundServices:
+    # Under the thread executor every job thread runs prewarm, possibly at once.
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = BackgroundServices()
+        return _services
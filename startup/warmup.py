@@ -0,0 +1,98 @@
+from contextlib import contextmanager
+from typing import Awaitable
+import asyncio
+import logging
+import time
+
+from config import STARTUP_WARM_TIMEOUT_SECONDS
+from db.repository import get_repository
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("startup.warmup")
+
+STARTUP_PHASE_DURATION = get_registry().histogram(
+    "voice_startup_phase_seconds", "Time spent in each start-up phase, by stage (prewarm or session)."
+)
+STARTUP_PHASE_FAILURES = get_registry().counter(
+    "voice_startup_phase_failures_total", "Start-up phases that failed or timed out."
+)
+
+
+class StartupPhases:
+    """Times the named phases of one start-up stage and logs them as one line."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.phases: dict[str, float] = {}
+        self.failed: list[str] = []
+        self._started = time.perf_counter()
+
+    def record(self, name: str, seconds: float, ok: bool = True) -> None:
+        self.phases[name] = seconds
+        STARTUP_PHASE_DURATION.observe(seconds, {"stage": self.stage, "phase": name})
+        if not ok:
+            self.failed.append(name)
+            STARTUP_PHASE_FAILURES.inc(1, {"stage": self.stage, "phase": name})
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(name, time.perf_counter() - started, ok)
+
+    async def run(self, name: str, awaitable: Awaitable, timeout: float) -> bool:
+        """Await one start-up step under `timeout`; failures are logged, not raised."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(awaitable, timeout)
+        except Exception as e:
+            self.record(name, time.perf_counter() - started, ok=False)
+            logger.warning(f"{self.stage} start-up step {name} failed: {type(e).__name__}: {e}")
+            return False
+        self.record(name, time.perf_counter() - started)
+        return True
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def summary(self) -> str:
+        parts = [
+            f"{name}={seconds * 1000:.0f}ms{' (failed)' if name in self.failed else ''}"
+            for name, seconds in self.phases.items()
+        ]
+        return f"{self.stage} start-up: {', '.join(parts)}; total {self.elapsed * 1000:.0f}ms"
+
+    def log(self) -> None:
+        logger.info(self.summary())
+
+
+async def _open_pooled_connection(pool, timeout: float) -> None:
+    """Open one connection in a STT/TTS plugin's pool and hand it back for the session to reuse."""
+    async with pool.connection(timeout=timeout):
+        pass
+
+
+def add_warm_stages(bringup, *, llm=None, tts=None, stt=None, timeout: float = STARTUP_WARM_TIMEOUT_SECONDS) -> None:
+    """Add optional bring-up stages that open the per-process connections a call needs.
+
+    They run on the job's event loop, which the clients are bound to, and
+    overlap the room connection. A stage that fails just leaves that
+    client to connect on first use.
+    """
+    bringup.add("storage", get_repository().ping, timeout=timeout)
+    if llm is not None:
+        bringup.add("llm", llm.warm, timeout=timeout)
+    for name, plugin in (("tts", tts), ("stt", stt)):
+        if plugin is None:
+            continue
+        pool = getattr(plugin, "_pool", None)
+        if pool is None:
+            # No pool to fill (e.g. Deepgram STT opens a websocket per stream).
+            plugin.prewarm()
+            continue
+        bringup.add(name, lambda pool=pool: _open_pooled_connection(pool, timeout), timeout=timeout)
@@ -0,0 +1,128 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+import json
+import logging
+import threading
+
+from telemetry.metrics import MetricsRegistry, get_registry
+
+logger = logging.getLogger("telemetry.exporter")
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(host: str, port: int, registry: Optional[MetricsRegistry] = None,
+                         max_attempts: int = 16) -> Optional[int]:
+    """Serve `registry` as Prometheus text on http://host:port/metrics in a daemon thread.
+
+    Each job process runs its own endpoint, so if `port` is taken the next
+    ports are tried in turn. Returns the bound port, or None if none was free.
+    """
+    global _server
+    if _server is not None:
+        return _server.server_address[1]
+    registry = registry or get_registry()
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    for candidate in range(port, port + max_attempts):
+        try:
+            _server = ThreadingHTTPServer((host, candidate), _Handler)
+        except OSError:
+            continue
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics_server", daemon=True).start()
+        logger.info(f"Metrics endpoint listening on http://{host}:{candidate}/metrics")
+        return candidate
+
+    logger.warning(f"No free port for the metrics endpoint in {port}-{port + max_attempts - 1}")
+    return None
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    out = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        out.append({"key": key, "value": typed})
+    return out
+
+
+class OtlpJsonFileExporter:
+    """Appends each finished turn to a file as one OTLP/JSON `TracesData` line."""
+
+    def __init__(self, path: str, service_name: str = "voice-agent-backend"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def _spans(self, trace_id: str, span, parent_id: Optional[str], session_id: str) -> list[dict]:
+        end = span.end if span.end is not None else span.start
+        record = {
+            "traceId": trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(int(span.start * 1e9)),
+            "endTimeUnixNano": str(int(end * 1e9)),
+            "attributes": _otlp_attributes({"session.id": session_id, **span.attributes}),
+        }
+        if parent_id:
+            record["parentSpanId"] = parent_id
+        spans = [record]
+        for child in span.children:
+            spans.extend(self._spans(trace_id, child, span.span_id, session_id))
+        return spans
+
+    def export(self, tracer, turn) -> None:
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": _otlp_attributes({"service.name": self.service_name})
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "voice-agent.turns"},
+                            "spans": self._spans(tracer.trace_id, turn, None, tracer.session_id),
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(payload)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+_otlp_exporter = None
+
+
+def get_otlp_exporter(path: Optional[str]) -> Optional[OtlpJsonFileExporter]:
+    """Per-worker OTLP/JSON file exporter, or None when no path is configured."""
+    global _otlp_exporter
+    if not path:
+        return None
+    if _otlp_exporter is None:
+        _otlp_exporter = OtlpJsonFileExporter(path)
+    return _otlp_exporter
@@ -0,0 +1,203 @@
+from collections import deque
+from typing import Optional
+import functools
+import logging
+import os
+import time
+
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("telemetry.tracing")
+
+_registry = get_registry()
+EOU_DELAY = _registry.histogram(
+    "voice_eou_delay_seconds", "End of user speech to end-of-utterance decision."
+)
+STT_FINAL_DELAY = _registry.histogram(
+    "voice_stt_final_transcript_seconds", "End of user speech to final transcript."
+)
+LLM_TTFT = _registry.histogram("voice_llm_ttft_seconds", "LLM time to first token.")
+LLM_DURATION = _registry.histogram("voice_llm_duration_seconds", "Full LLM generation time.")
+TTS_TTFB = _registry.histogram("voice_tts_ttfb_seconds", "TTS time to first audio byte.")
+TOOL_DURATION = _registry.histogram("voice_tool_duration_seconds", "Function tool execution time.")
+TURN_RESPONSE = _registry.histogram(
+    "voice_turn_response_seconds", "End of user speech to agent starting to speak."
+)
+TURN_DURATION = _registry.histogram(
+    "voice_turn_duration_seconds", "End of user speech to agent finishing its reply."
+)
+TURNS = _registry.counter("voice_turns_total", "Completed conversational turns.")
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    __slots__ = ("name", "span_id", "start", "end", "attributes", "children")
+
+    def __init__(self, name: str, start: Optional[float] = None, attributes: Optional[dict] = None):
+        self.name = name
+        self.span_id = _new_id(8)
+        self.start = start if start is not None else time.time()
+        self.end: Optional[float] = None
+        self.attributes = attributes or {}
+        self.children: list["Span"] = []
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def add_child(self, name: str, start: float, end: float, **attributes) -> "Span":
+        child = Span(name, start, attributes)
+        child.end = end
+        self.children.append(child)
+        return child
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": None if self.end is None else round(self.duration * 1000, 2),
+            "attributes": self.attributes,
+            "children": [c.to_dict() for c in self.children],
+        }
+
+
+class TurnTracer:
+    """Builds a span tree per conversational turn from AgentSession events.
+
+    A turn opens when the user stops speaking (or when the agent speaks
+    unprompted, e.g. the greeting) and closes when the agent stops speaking.
+    Stage timings come from the session's metrics events; tool spans come from
+    `traced_tool`. Every stage is also observed into the worker histograms.
+    """
+
+    def __init__(self, session_id: str, exporter=None, keep_turns: int = 50):
+        self.session_id = session_id
+        self.trace_id = _new_id(16)
+        self._exporter = exporter
+        self.current: Optional[Span] = None
+        self.completed: deque = deque(maxlen=keep_turns)
+        self._turn_index = 0
+
+    def attach(self, session) -> None:
+        session.on("user_state_changed", self._on_user_state_changed)
+        session.on("agent_state_changed", self._on_agent_state_changed)
+        session.on("metrics_collected", self._on_metrics_collected)
+        session.on("close", lambda _ev: self._finish_turn(status="closed"))
+
+    def _start_turn(self, origin: str) -> Span:
+        if self.current is not None:
+            self._finish_turn(status="interrupted")
+        self._turn_index += 1
+        self.current = Span("turn", attributes={"turn.index": self._turn_index, "turn.origin": origin})
+        return self.current
+
+    def _ensure_turn(self) -> Span:
+        return self.current if self.current is not None else self._start_turn("agent")
+
+    def _finish_turn(self, status: str = "ok") -> None:
+        turn = self.current
+        if turn is None:
+            return
+        self.current = None
+        turn.end = time.time()
+        turn.attributes["turn.status"] = status
+        TURNS.inc(labels={"status": status})
+        if status == "ok" and turn.attributes.get("turn.origin") == "user":
+            TURN_DURATION.observe(turn.duration)
+        self.completed.append(turn)
+        logger.debug(f"Turn {turn.attributes['turn.index']} finished: {turn.to_dict()}")
+        if self._exporter is not None:
+            try:
+                self._exporter.export(self, turn)
+            except Exception as e:
+                logger.debug(f"Failed to export turn trace: {e}")
+
+    def _on_user_state_changed(self, ev) -> None:
+        if getattr(ev, "old_state", None) == "speaking" and getattr(ev, "new_state", None) != "speaking":
+            self._start_turn("user")
+
+    def _on_agent_state_changed(self, ev) -> None:
+        old_state = getattr(ev, "old_state", None)
+        new_state = getattr(ev, "new_state", None)
+        if new_state == "speaking":
+            turn = self._ensure_turn()
+            if "turn.first_audio_at" not in turn.attributes:
+                now = time.time()
+                turn.attributes["turn.first_audio_at"] = now
+                if turn.attributes.get("turn.origin") == "user":
+                    TURN_RESPONSE.observe(now - turn.start)
+        elif old_state == "speaking" and new_state in ("listening", "idle"):
+            self._finish_turn()
+
+    def _on_metrics_collected(self, ev) -> None:
+        metrics = getattr(ev, "metrics", None)
+        kind = type(metrics).__name__
+        if kind == "EOUMetrics":
+            turn = self._ensure_turn()
+            eou = metrics.end_of_utterance_delay
+            stt = metrics.transcription_delay
+            turn.add_child("eou", turn.start, turn.start + eou, delay=eou)
+            turn.add_child("stt.final_transcript", turn.start, turn.start + stt, delay=stt)
+            EOU_DELAY.observe(eou)
+            STT_FINAL_DELAY.observe(stt)
+        elif kind == "LLMMetrics":
+            turn = self._ensure_turn()
+            end = metrics.timestamp
+            turn.add_child(
+                "llm",
+                end - metrics.duration,
+                end,
+                ttft=metrics.ttft,
+                prompt_tokens=metrics.prompt_tokens,
+                completion_tokens=metrics.completion_tokens,
+            )
+            if metrics.ttft >= 0:
+                LLM_TTFT.observe(metrics.ttft)
+            LLM_DURATION.observe(metrics.duration)
+        elif kind == "TTSMetrics":
+            turn = self._ensure_turn()
+            end = metrics.timestamp
+            turn.add_child(
+                "tts",
+                end - metrics.duration,
+                end,
+                ttfb=metrics.ttfb,
+                characters=metrics.characters_count,
+            )
+            if metrics.ttfb >= 0:
+                TTS_TTFB.observe(metrics.ttfb)
+
+    def record_tool(self, name: str, start: float, duration: float, status: str) -> None:
+        turn = self._ensure_turn()
+        turn.add_child(f"tool.{name}", start, start + duration, status=status)
+
+
+def traced_tool(fn):
+    """Time a function tool into the tool histogram and the session's current turn.
+
+    Apply below `@function_tool`; the wrapper keeps the tool's signature and docstring.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(context, *args, **kwargs):
+        started_at = time.time()
+        t0 = time.perf_counter()
+        status = "ok"
+        try:
+            return await fn(context, *args, **kwargs)
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration = time.perf_counter() - t0
+            TOOL_DURATION.observe(duration, {"tool": name})
+            userdata = context.session.userdata if context and context.session else None
+            tracer = userdata.get("tracer") if userdata else None
+            if tracer is not None:
+                tracer.record_tool(name, started_at, duration, status)
+
+    return wrapper
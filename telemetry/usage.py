@@ -0,0 +1,130 @@
+from typing import Optional
+import logging
+import time
+
+from config import RATE_TABLES, LLM_PROVIDER, STT_PROVIDER, TTS_PROVIDER
+from telemetry.metrics import get_registry
+
+logger = logging.getLogger("telemetry.usage")
+
+SESSION_COST = get_registry().counter(
+    "voice_session_cost_usd_total", "Estimated provider cost accrued by sessions on this worker."
+)
+PROMPT_TOKENS = get_registry().counter(
+    "voice_llm_prompt_tokens_total", "LLM prompt tokens, split by provider prefix-cache hit or miss."
+)
+
+
+def _rates(kind: str, provider: Optional[str], default: str) -> dict:
+    table = RATE_TABLES.get(kind, {})
+    return table.get(provider or default) or table.get(default) or {}
+
+
+class UsageAccumulator:
+    """Running usage and cost for one session, fed by `metrics_collected` events.
+
+    Each LLM, STT and TTS metrics event is priced as it arrives using the
+    provider rate tables in config, so the cost so far is always an O(1) read.
+    """
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = started_at if started_at is not None else time.time()
+        self.llm_prompt_tokens = 0
+        self.llm_cached_tokens = 0
+        self.llm_completion_tokens = 0
+        self.stt_audio_seconds = 0.0
+        self.tts_characters = 0
+        self.tts_audio_seconds = 0.0
+        self.llm_cost = 0.0
+        self.stt_cost = 0.0
+        self.tts_cost = 0.0
+
+    def attach(self, session) -> None:
+        session.on("metrics_collected", self._on_metrics_collected)
+
+    def _on_metrics_collected(self, ev) -> None:
+        metrics = getattr(ev, "metrics", None)
+        kind = type(metrics).__name__
+        try:
+            if kind == "LLMMetrics":
+                self.add_llm(
+                    metrics.prompt_tokens,
+                    metrics.completion_tokens,
+                    getattr(metrics, "prompt_cached_tokens", 0) or 0,
+                    provider=self._provider_of(metrics),
+                )
+            elif kind == "STTMetrics":
+                self.add_stt(metrics.audio_duration, provider=self._provider_of(metrics))
+            elif kind == "TTSMetrics":
+                self.add_tts(
+                    metrics.characters_count,
+                    metrics.audio_duration,
+                    provider=self._provider_of(metrics),
+                )
+        except Exception as e:
+            logger.debug(f"Failed to account usage for {kind}: {e}")
+
+    @staticmethod
+    def _provider_of(metrics) -> Optional[str]:
+        metadata = getattr(metrics, "metadata", None)
+        return getattr(metadata, "model_provider", None)
+
+    def add_llm(self, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0,
+                provider: Optional[str] = None) -> None:
+        rates = _rates("llm", provider, LLM_PROVIDER)
+        uncached = max(prompt_tokens - cached_tokens, 0)
+        cost = (
+            uncached * rates.get("input_per_1m", 0.0)
+            + cached_tokens * rates.get("cached_input_per_1m", rates.get("input_per_1m", 0.0))
+            + completion_tokens * rates.get("output_per_1m", 0.0)
+        ) / 1_000_000
+        self.llm_prompt_tokens += prompt_tokens
+        self.llm_cached_tokens += cached_tokens
+        self.llm_completion_tokens += completion_tokens
+        self.llm_cost += cost
+        SESSION_COST.inc(cost, {"component": "llm"})
+        PROMPT_TOKENS.inc(cached_tokens, {"cache": "hit"})
+        PROMPT_TOKENS.inc(uncached, {"cache": "miss"})
+
+    def add_stt(self, audio_seconds: float, provider: Optional[str] = None) -> None:
+        rates = _rates("stt", provider, STT_PROVIDER)
+        cost = audio_seconds / 60 * rates.get("per_minute", 0.0)
+        self.stt_audio_seconds += audio_seconds
+        self.stt_cost += cost
+        SESSION_COST.inc(cost, {"component": "stt"})
+
+    def add_tts(self, characters: int, audio_seconds: float = 0.0,
+                provider: Optional[str] = None) -> None:
+        rates = _rates("tts", provider, TTS_PROVIDER)
+        cost = characters * rates.get("per_1m_chars", 0.0) / 1_000_000
+        self.tts_characters += characters
+        self.tts_audio_seconds += audio_seconds
+        self.tts_cost += cost
+        SESSION_COST.inc(cost, {"component": "tts"})
+
+    @property
+    def prompt_cache_hit_rate(self) -> float:
+        if not self.llm_prompt_tokens:
+            return 0.0
+        return self.llm_cached_tokens / self.llm_prompt_tokens
+
+    @property
+    def total_cost(self) -> float:
+        return self.llm_cost + self.stt_cost + self.tts_cost
+
+    def cost_breakdown(self) -> dict:
+        return {
+            "total": round(self.total_cost, 5),
+            "breakdown": {
+                "stt": round(self.stt_cost, 5),
+                "tts": round(self.tts_cost, 5),
+                "llm": round(self.llm_cost, 5),
+                "duration_seconds": round(time.time() - self.started_at, 2),
+                "stt_audio_seconds": round(self.stt_audio_seconds, 2),
+                "tts_characters": self.tts_characters,
+                "llm_input_tokens": self.llm_prompt_tokens,
+                "llm_cached_input_tokens": self.llm_cached_tokens,
+                "llm_prompt_cache_hit_rate": round(self.prompt_cache_hit_rate, 4),
+                "llm_output_tokens": self.llm_completion_tokens,
+            },
+        }
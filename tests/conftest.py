@@ -0,0 +1,41 @@
+import os
+
+# Run against the in-memory local backend; config.py reads these on import.
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["LOCAL_DB_PATH"] = ":memory:"
+os.environ["LOCAL_DB_LATENCY_MS"] = "0"
+os.environ["LOCAL_DB_JITTER_MS"] = "0"
+os.environ["WAL_PATH"] = ":memory:"
+os.environ["SUMMARY_SPOOL_PATH"] = ":memory:"
+os.environ["LLM_ROUTER_STATS_DIR"] = ""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import db.local
+import db.repository
+import db.slot_cache
+from db.local import LocalDatabase
+
+# Seeded days: Monday 9 February 2026 and the two days after, 9 AM to noon every 30 minutes.
+SEED_START = date(2026, 2, 9)
+SEED_DAYS = 3
+
+
+@pytest.fixture
+def local_db(monkeypatch) -> LocalDatabase:
+    """A freshly seeded in-memory database behind `get_repository()`, with an empty slot cache."""
+    database = LocalDatabase(":memory:")
+    database.seed_slots(days=SEED_DAYS, start=SEED_START, start_hour=9, end_hour=12)
+    monkeypatch.setattr(db.local, "_local_db", database)
+    monkeypatch.setattr(db.repository, "_repository", None)
+    monkeypatch.setattr(db.slot_cache, "_slot_cache", None)
+    return database
+
+
+@pytest.fixture
+def context():
+    """A RunContext stand-in: tools only read and write `session.userdata`."""
+    return SimpleNamespace(session=SimpleNamespace(userdata={}))
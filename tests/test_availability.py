@@ -0,0 +1,147 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from db.availability import AvailabilitySync
+from db.change_feed import LocalChangeFeed
+from db.local import LocalDatabase, LocalRepository
+
+TODAY = date.today().isoformat()
+
+
+class HeldFeed(LocalChangeFeed):
+    """The local publisher, except that changes wait until the test delivers them, in its chosen order."""
+
+    def __init__(self, db: LocalDatabase):
+        super().__init__(db)
+        self.held: dict[int, dict] = {}
+        self._deliver = None
+
+    async def start(self, on_change, on_status) -> None:
+        self._deliver = on_change
+        await super().start(lambda change: self.held.__setitem__(change["seq"], change), on_status)
+
+    async def deliver(self, *seqs: int) -> None:
+        await asyncio.sleep(0)  # let the publisher's callbacks reach `held`
+        for seq in seqs:
+            self._deliver(self.held.pop(seq))
+
+
+@pytest.fixture
+def database() -> LocalDatabase:
+    database = LocalDatabase(":memory:")
+    database.seed_slots(days=2, start=date.today(), start_hour=9, end_hour=12)
+    return database
+
+
+def _sync(database: LocalDatabase, **overrides) -> tuple[AvailabilitySync, HeldFeed, list[str]]:
+    feed = HeldFeed(database)
+    settings = dict(days=2, max_staleness=30, gap_grace=0.05, catchup_limit=100, resync_interval=3600)
+    settings.update(overrides)
+    sync = AvailabilitySync(feed, LocalRepository(database), **settings)
+    resyncs = []
+    resync = sync.resync
+
+    async def record(reason: str) -> None:
+        resyncs.append(reason)
+        await resync(reason)
+
+    sync.resync = record
+    return sync, feed, resyncs
+
+
+def _open(sync: AvailabilitySync) -> list[str]:
+    return [slot["time"][:5] for slot in sync.get(TODAY)]
+
+
+async def _until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def _last_seq(database: LocalDatabase) -> int:
+    return database.availability_snapshot(TODAY, TODAY)["seq"]
+
+
+def test_out_of_order_delivery(database):
+    async def run():
+        sync, feed, resyncs = _sync(database)
+        await sync.start()
+        start = sync.seq
+        database.hold_slot(TODAY, "09:00", "session-a", 600)
+        database.hold_slot(TODAY, "09:30", "session-b", 600)
+        database.release_holds("session-a")
+
+        await feed.deliver(start + 3, start + 2)
+        assert sync.seq == start
+        assert sync.serving()
+        await feed.deliver(start + 1)
+        assert sync.seq == start + 3
+        assert sync._gap_since is None
+        # The hold on 9:00 arrived after its release and lost on seq.
+        assert _open(sync)[:2] == ["09:00", "10:00"]
+        assert resyncs == ["start"]
+        await sync.aclose()
+
+    asyncio.run(run())
+
+
+def test_gap_is_filled_from_the_change_log(database):
+    async def run():
+        sync, feed, resyncs = _sync(database)
+        await sync.start()
+        start = sync.seq
+        database.hold_slot(TODAY, "09:00", "session-a", 600)
+        database.hold_slot(TODAY, "09:30", "session-b", 600)
+
+        # The change for 9:00 is lost on the way.
+        await feed.deliver(start + 2)
+        assert sync.seq == start
+        assert "09:00" in _open(sync)
+        await _until(lambda: sync.seq == start + 2)
+        assert _open(sync)[:1] == ["10:00"]
+        assert resyncs == ["start"]
+        assert sync.stats()["connected"] == sync.stats()["serving"] == 1
+        await sync.aclose()
+
+    asyncio.run(run())
+
+
+def test_catch_up_past_the_limit_reloads_the_snapshot(database):
+    async def run():
+        sync, feed, resyncs = _sync(database, catchup_limit=2)
+        await sync.start()
+        start = sync.seq
+        for i, time in enumerate(("09:00", "09:30", "10:00")):
+            database.hold_slot(TODAY, time, f"session-{i}", 600)
+        database.hold_slot(TODAY, "10:30", "session-3", 600)
+
+        await feed.deliver(start + 4)
+        await _until(lambda: resyncs == ["start", "behind"])
+        assert sync.seq == _last_seq(database)
+        assert _open(sync)[:1] == ["11:00"]
+        await sync.aclose()
+
+    asyncio.run(run())
+
+
+def test_catch_up_from_a_pruned_log_reloads_the_snapshot(database):
+    async def run():
+        sync, feed, resyncs = _sync(database)
+        await sync.start()
+        start = sync.seq
+        database.hold_slot(TODAY, "09:00", "session-a", 600)
+        database.hold_slot(TODAY, "09:30", "session-b", 600)
+        with database._lock:
+            database._conn.execute("delete from slot_changes where seq <= ?", (start + 1,))
+
+        await feed.deliver(start + 2)
+        await _until(lambda: resyncs == ["start", "behind"])
+        assert sync.seq == start + 2
+        assert _open(sync)[:1] == ["10:00"]
+        await sync.aclose()
+
+    asyncio.run(run())
@@ -0,0 +1,116 @@
+from datetime import date
+
+import pytest
+
+from conversation.dates import parse_date
+from conversation.fast_path import classify
+
+# A Friday, so "monday", "the first" and "the 20th" all land in February.
+JAN_30 = date(2026, 1, 30)
+DEC_28 = date(2026, 12, 28)
+
+
+@pytest.mark.parametrize(
+    "text, today, expected",
+    [
+        ("monday", JAN_30, date(2026, 2, 2)),
+        ("friday", JAN_30, date(2026, 1, 30)),
+        ("next friday", JAN_30, date(2026, 2, 6)),
+        ("tomorrow", JAN_30, date(2026, 1, 31)),
+        ("the day after tomorrow", JAN_30, date(2026, 2, 1)),
+        ("the 20th", JAN_30, date(2026, 2, 20)),
+        ("the twentieth", JAN_30, date(2026, 2, 20)),
+        ("the first", JAN_30, date(2026, 2, 1)),
+        ("the 1st", JAN_30, date(2026, 2, 1)),
+        ("the 30th", JAN_30, date(2026, 1, 30)),
+        ("february 3rd", JAN_30, date(2026, 2, 3)),
+        ("the 3rd of feb", JAN_30, date(2026, 2, 3)),
+        ("monday the 2nd", JAN_30, date(2026, 2, 2)),
+        ("2026-02-14", JAN_30, date(2026, 2, 14)),
+        ("the 2nd", DEC_28, date(2027, 1, 2)),
+        ("january 5", DEC_28, date(2027, 1, 5)),
+        ("friday", DEC_28, date(2027, 1, 1)),
+        # Ambiguous or impossible: let the LLM ask.
+        ("monday or tuesday", JAN_30, None),
+        ("monday the 3rd", JAN_30, None),
+        ("the 29th", JAN_30, None),
+        ("february 30", JAN_30, None),
+        ("next week", JAN_30, None),
+    ],
+)
+def test_parse_date(text, today, expected):
+    assert parse_date(text, today) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["bye", "Goodbye!", "okay thanks, bye", "thank you so much, goodbye", "alright, have a nice day, bye"],
+)
+def test_goodbye(text):
+    intent = classify(text, JAN_30)
+    assert (intent.name, intent.tool) == ("goodbye", "end_conversation")
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["no thanks, bye", "nope, bye", "thanks", "book it, bye", "actually wait, bye", "bye " + "okay " * 20],
+)
+def test_not_a_plain_goodbye(text):
+    assert classify(text, JAN_30) is None
+
+
+@pytest.mark.parametrize(
+    "text, identified, phone",
+    [
+        ("555 010 0123", False, "5550100123"),
+        ("555-010-0123", False, "5550100123"),
+        ("it's 555 010 0123", False, "5550100123"),
+        ("five five five zero one zero zero one two three", False, "5550100123"),
+        ("my number is 555 010 0123", True, "5550100123"),
+        ("my cell is five five five zero one zero zero one two three", True, "5550100123"),
+        # Bare digits once the caller is identified are more likely times or dates.
+        ("555 010 0123", True, None),
+        ("five five five zero one zero zero one two three", True, None),
+        ("10 30 11 30", False, None),
+        ("10 30 or 11", False, None),
+        ("555 010 0123 tomorrow", False, None),
+        ("555 01", False, None),
+    ],
+)
+def test_phone_number(text, identified, phone):
+    intent = classify(text, JAN_30, identified=identified)
+    if phone is None:
+        assert intent is None
+    else:
+        assert (intent.tool, intent.args) == ("identify_user", {"phone_number": phone})
+
+
+@pytest.mark.parametrize(
+    "text, args",
+    [
+        ("what's available tomorrow?", {"date": "2026-01-31"}),
+        ("any openings on monday", {"date": "2026-02-02"}),
+        ("what's open on the first", {"date": "2026-02-01"}),
+        ("anything free on the 20th", {"date": "2026-02-20"}),
+        ("what times are available", {}),
+        ("what's available next week", None),
+        ("what's available on the 29th", None),
+        ("can you book whatever is available tomorrow", None),
+        ("what's open for my appointment", None),
+    ],
+)
+def test_availability(text, args):
+    intent = classify(text, JAN_30)
+    if args is None:
+        assert intent is None
+    else:
+        assert (intent.tool, intent.args) == ("fetch_slots", args)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["bye", "okay thanks, bye", "555 010 0123", "my number is 555 010 0123", "what's available tomorrow?"],
+)
+def test_nothing_is_fast_pathed_mid_booking(text):
+    assert classify(text, JAN_30, identified=True, booking=True) is None
+    assert classify(text, JAN_30, identified=False, booking=True) is None
@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from db.local import LocalDatabase
+from tools.appointments import SLOT_GONE, SLOT_HELD, SLOT_TAKEN, book_appointment
+
+MONDAY = "2026-02-09"
+TUESDAY = "2026-02-10"
+
+
+def _booked(database: LocalDatabase, date: str, time: str) -> bool:
+    with database._lock:
+        row = database._conn.execute(
+            "select is_booked from slots where date = ? and time = ?", (date, f"{time}:00")
+        ).fetchone()
+    return bool(row["is_booked"])
+
+
+def _appointments(database: LocalDatabase, date: str, time: str) -> int:
+    with database._lock:
+        return database._conn.execute(
+            "select count(*) from appointments where date = ? and time = ? and status = 'booked'",
+            (date, f"{time}:00"),
+        ).fetchone()[0]
+
+
+def test_concurrent_bookings_of_one_slot_book_it_once(tmp_path):
+    # Two worker processes: separate connections to one database file.
+    path = str(tmp_path / "slots.sqlite3")
+    workers = [LocalDatabase(path), LocalDatabase(path)]
+    workers[0].seed_slots(days=1, start_hour=9, end_hour=10)
+    date = workers[0].list_open_slots()[0]["date"]
+    start = threading.Barrier(len(workers))
+    results = [None] * len(workers)
+
+    def book(i: int) -> None:
+        start.wait()
+        results[i] = workers[i].book_appointment_atomic(date, "09:00", f"555010{i}", f"Caller {i}")
+
+    threads = [threading.Thread(target=book, args=(i,)) for i in range(len(workers))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(r["status"] for r in results) == ["booked", "unavailable"]
+    assert _appointments(workers[0], date, "09:00") == 1
+
+
+def test_concurrent_tool_calls_tell_one_caller_it_is_booked(local_db, context):
+    rival = SimpleNamespace(session=SimpleNamespace(userdata={}))
+
+    async def race():
+        return await asyncio.gather(
+            book_appointment(context, MONDAY, "09:00", "5550100", "Ada"),
+            book_appointment(rival, MONDAY, "09:00", "5550101", "Grace"),
+        )
+
+    results = asyncio.run(race())
+    assert sum(r.startswith("Your appointment is booked") for r in results) == 1
+    assert SLOT_GONE in results
+    assert _appointments(local_db, MONDAY, "09:00") == 1
+
+
+def test_booked_returns_the_appointment_and_takes_the_slot(local_db):
+    result = local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada")
+    assert result["status"] == "booked"
+    appointment = result["appointment"]
+    assert (appointment["date"], appointment["time"], appointment["status"]) == (MONDAY, "09:00:00", "booked")
+    assert (appointment["contact_number"], appointment["name"]) == ("5550100", "Ada")
+    assert _booked(local_db, MONDAY, "09:00")
+
+
+@pytest.mark.parametrize("date, time", [(MONDAY, "08:00"), ("2026-03-01", "09:00")])
+def test_unavailable_when_no_open_slot_exists(local_db, date, time):
+    assert local_db.book_appointment_atomic(date, time, "5550100", "Ada") == {"status": "unavailable"}
+
+
+def test_unavailable_when_already_booked(local_db):
+    local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada")
+    assert local_db.book_appointment_atomic(MONDAY, "09:00", "5550101", "Grace") == {"status": "unavailable"}
+
+
+def test_conflict_when_an_appointment_holds_an_open_slot(local_db):
+    local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada")
+    with local_db._lock:
+        local_db._conn.execute("update slots set is_booked = 0 where date = ? and time = '09:00:00'", (MONDAY,))
+    assert local_db.book_appointment_atomic(MONDAY, "09:00", "5550101", "Grace") == {"status": "conflict"}
+    assert _appointments(local_db, MONDAY, "09:00") == 1
+
+
+def test_held_by_someone_else(local_db):
+    local_db.hold_slot(MONDAY, "09:00", "session-a", 60)
+    assert local_db.book_appointment_atomic(MONDAY, "09:00", "5550101", "Grace", holder="session-b") == {
+        "status": "held"
+    }
+    assert local_db.book_appointment_atomic(MONDAY, "09:00", "5550101", "Grace") == {"status": "held"}
+    assert not _booked(local_db, MONDAY, "09:00")
+
+
+def test_own_hold_becomes_the_booking(local_db):
+    local_db.hold_slot(MONDAY, "09:00", "session-a", 60)
+    result = local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada", holder="session-a")
+    assert result["status"] == "booked"
+    with local_db._lock:
+        assert local_db._conn.execute("select count(*) from slot_holds").fetchone()[0] == 0
+
+
+def test_tool_answers_each_refusal(local_db, context):
+    local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada")
+    local_db.book_appointment_atomic(MONDAY, "10:00", "5550100", "Ada")
+    with local_db._lock:
+        local_db._conn.execute("update slots set is_booked = 0 where date = ? and time = '10:00:00'", (MONDAY,))
+    local_db.hold_slot(TUESDAY, "09:00", "session-other", 60)
+
+    def book(date: str, time: str) -> str:
+        return asyncio.run(book_appointment(context, date, time, "5550101", "Grace"))
+
+    assert book(MONDAY, "09:00") == SLOT_GONE
+    assert book(MONDAY, "10:00") == SLOT_TAKEN
+    assert book(TUESDAY, "09:00") == SLOT_HELD
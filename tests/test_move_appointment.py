@@ -0,0 +1,122 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from db.local import LocalDatabase
+from tools.appointments import (
+    MOVE_CANCELLED,
+    MOVE_NOT_FOUND,
+    NEW_SLOT_GONE,
+    NEW_SLOT_HELD,
+    NEW_SLOT_TAKEN,
+    modify_appointment,
+)
+
+MONDAY = "2026-02-09"
+TUESDAY = "2026-02-10"
+
+
+def _state(database: LocalDatabase) -> tuple:
+    """Everything a move may touch, to check a refused move changed nothing."""
+    with database._lock:
+        slots = database._conn.execute("select date, time, is_booked from slots order by id").fetchall()
+        appointments = database._conn.execute("select id, date, time, status from appointments order by id").fetchall()
+    return [tuple(r) for r in slots], [tuple(r) for r in appointments]
+
+
+def _booked(database: LocalDatabase, date: str, time: str) -> bool:
+    with database._lock:
+        return bool(
+            database._conn.execute(
+                "select is_booked from slots where date = ? and time = ?", (date, f"{time}:00")
+            ).fetchone()[0]
+        )
+
+
+@pytest.fixture
+def appointment(local_db) -> dict:
+    return local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada")["appointment"]
+
+
+def test_move_frees_the_old_slot_and_takes_the_new_one(local_db, appointment):
+    result = local_db.move_appointment(appointment["id"], TUESDAY, "10:00")
+    assert result["status"] == "moved"
+    assert (result["old_date"], result["old_time"]) == (MONDAY, "09:00:00")
+    moved = result["appointment"]
+    assert (moved["id"], moved["date"], moved["time"], moved["status"]) == (
+        appointment["id"], TUESDAY, "10:00:00", "booked"
+    )
+    assert not _booked(local_db, MONDAY, "09:00")
+    assert _booked(local_db, TUESDAY, "10:00")
+
+
+def test_move_is_one_transaction(local_db, appointment):
+    before = _state(local_db)
+    with local_db._lock:
+        local_db._conn.execute(
+            "create temp trigger fail_move before update of date on appointments "
+            "begin select raise(abort, 'simulated failure'); end"
+        )
+    with pytest.raises(sqlite3.IntegrityError):
+        local_db.move_appointment(appointment["id"], TUESDAY, "10:00")
+    assert _state(local_db) == before
+
+
+def test_move_to_a_booked_slot_changes_nothing(local_db, appointment):
+    local_db.book_appointment_atomic(TUESDAY, "10:00", "5550101", "Grace")
+    before = _state(local_db)
+    assert local_db.move_appointment(appointment["id"], TUESDAY, "10:00") == {"status": "unavailable"}
+    assert _state(local_db) == before
+
+
+def test_move_to_a_slot_with_a_booked_appointment_changes_nothing(local_db, appointment):
+    local_db.book_appointment_atomic(TUESDAY, "10:00", "5550101", "Grace")
+    with local_db._lock:
+        local_db._conn.execute("update slots set is_booked = 0 where date = ? and time = '10:00:00'", (TUESDAY,))
+    before = _state(local_db)
+    assert local_db.move_appointment(appointment["id"], TUESDAY, "10:00") == {"status": "conflict"}
+    assert _state(local_db) == before
+
+
+def test_move_to_a_slot_held_by_someone_else_changes_nothing(local_db, appointment):
+    local_db.hold_slot(TUESDAY, "10:00", "session-other", 60)
+    before = _state(local_db)
+    assert local_db.move_appointment(appointment["id"], TUESDAY, "10:00", holder="session-a") == {"status": "held"}
+    assert _state(local_db) == before
+
+
+def test_move_of_a_missing_appointment(local_db):
+    before = _state(local_db)
+    assert local_db.move_appointment(9999, TUESDAY, "10:00") == {"status": "not_found"}
+    assert _state(local_db) == before
+
+
+def test_move_of_a_cancelled_appointment_changes_nothing(local_db, appointment):
+    local_db.cancel_appointment(appointment["id"])
+    # Someone else has since booked the slot the cancelled appointment had.
+    local_db.book_appointment_atomic(MONDAY, "09:00", "5550101", "Grace")
+    before = _state(local_db)
+    assert local_db.move_appointment(appointment["id"], TUESDAY, "10:00") == {"status": "cancelled"}
+    assert _state(local_db) == before
+    assert _booked(local_db, MONDAY, "09:00")
+
+
+def test_tool_answers_each_refusal(local_db, context, appointment):
+    cancelled = local_db.book_appointment_atomic(MONDAY, "09:30", "5550100", "Ada")["appointment"]
+    local_db.cancel_appointment(cancelled["id"])
+    local_db.book_appointment_atomic(TUESDAY, "09:00", "5550101", "Grace")
+    local_db.book_appointment_atomic(TUESDAY, "09:30", "5550101", "Grace")
+    with local_db._lock:
+        local_db._conn.execute("update slots set is_booked = 0 where date = ? and time = '09:30:00'", (TUESDAY,))
+    local_db.hold_slot(TUESDAY, "10:00", "session-other", 60)
+
+    def move(appointment_id, date: str, time: str) -> str:
+        return asyncio.run(modify_appointment(context, appointment_id, date, time))
+
+    assert move(9999, TUESDAY, "11:00") == MOVE_NOT_FOUND
+    assert move(cancelled["id"], TUESDAY, "11:00") == MOVE_CANCELLED
+    assert move(appointment["id"], TUESDAY, "09:00") == NEW_SLOT_GONE
+    assert move(appointment["id"], TUESDAY, "09:30") == NEW_SLOT_TAKEN
+    assert move(appointment["id"], TUESDAY, "10:00") == NEW_SLOT_HELD
+    assert not _booked(local_db, TUESDAY, "11:00")
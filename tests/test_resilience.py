@@ -0,0 +1,41 @@
+import asyncio
+
+from db.breaker import CLOSED, OPEN, CircuitBreaker
+from db.resilience import ResilientRepository
+
+
+class FlakyRepository:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    async def list_open_slots(self, date=None):
+        self.calls += 1
+        raise self.error
+
+
+def _call(repo: ResilientRepository, times: int) -> None:
+    async def run():
+        for _ in range(times):
+            try:
+                await repo.list_open_slots("2026-02-10")
+            except Exception:
+                pass
+
+    asyncio.run(run())
+
+
+def test_rejected_request_is_not_retried_and_keeps_the_circuit_closed():
+    inner = FlakyRepository(ValueError("invalid input syntax for type date"))
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    _call(ResilientRepository(inner, breaker), 5)
+    assert inner.calls == 5
+    assert breaker.state == CLOSED
+
+
+def test_connection_error_is_retried_and_opens_the_circuit():
+    inner = FlakyRepository(ConnectionResetError("connection reset"))
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    _call(ResilientRepository(inner, breaker), 1)
+    assert inner.calls == 2
+    assert breaker.state == OPEN
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+from startup.services import BackgroundServices
+from telemetry.metrics import MetricsRegistry
+
+
+def test_stats_are_numeric_per_service():
+    services = BackgroundServices()
+    release = threading.Event()
+
+    async def slow():
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+
+    def broken():
+        raise RuntimeError("no backend")
+
+    services.start("ok", lambda: None).result(timeout=2)
+    failed = services.start("broken", broken)
+    starting = services.start("slow", slow)
+    failed.exception(timeout=2)
+
+    assert services.stats() == {
+        "ok_running": 1,
+        "ok_failed": 0,
+        "broken_running": 0,
+        "broken_failed": 1,
+        "slow_running": 0,
+        "slow_failed": 0,
+    }
+    release.set()
+    starting.result(timeout=2)
+    assert services.stats()["slow_running"] == 1
+
+
+def test_stats_are_exported():
+    services = BackgroundServices()
+    services.start("ok", lambda: None).result(timeout=2)
+    registry = MetricsRegistry()
+    registry.register_collector("background_services", services.stats)
+    assert "background_services_ok_running 1" in registry.render().splitlines()
@@ -0,0 +1,118 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import db.slot_cache
+from db.slot_cache import SlotCache, get_slot_cache
+from tools.appointments import book_appointment, cancel_appointment, modify_appointment
+
+MONDAY = "2026-02-09"
+TUESDAY = "2026-02-10"
+
+
+def _slot(date: str, time: str) -> dict:
+    return {"date": date, "time": f"{time}:00", "display": f"{date} {time}"}
+
+
+def _times(slots: list[dict]) -> list[str]:
+    return [s["time"][:5] for s in slots]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(db.slot_cache, "time", SimpleNamespace(monotonic=lambda: now.t))
+    return now
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = SlotCache(ttl_seconds=30, max_entries=8)
+    cache.put(MONDAY, [_slot(MONDAY, "09:00")])
+    clock.t += 30
+    assert cache.get(MONDAY) == [_slot(MONDAY, "09:00")]
+    clock.t += 0.1
+    assert cache.get(MONDAY) is None
+    assert cache.stats()["entries"] == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_put_refreshes_the_ttl(clock):
+    cache = SlotCache(ttl_seconds=30, max_entries=8)
+    cache.put(MONDAY, [])
+    clock.t += 20
+    cache.put(MONDAY, [_slot(MONDAY, "09:00")])
+    clock.t += 20
+    assert cache.get(MONDAY) == [_slot(MONDAY, "09:00")]
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = SlotCache(ttl_seconds=30, max_entries=2)
+    cache.put(MONDAY, [])
+    cache.put(TUESDAY, [])
+    assert cache.get(MONDAY) == []
+    cache.put(None, [])
+    assert cache.get(TUESDAY) is None
+    assert cache.get(MONDAY) == []
+    assert cache.get(None) == []
+    assert cache.evictions == 1
+
+
+def test_mark_booked_drops_the_slot_from_the_date_and_all_dates_views():
+    cache = SlotCache(ttl_seconds=30, max_entries=8)
+    monday = [_slot(MONDAY, "09:00"), _slot(MONDAY, "09:30")]
+    cache.put(MONDAY, monday)
+    cache.put(None, monday + [_slot(TUESDAY, "09:00")])
+    cache.put(TUESDAY, [_slot(TUESDAY, "09:00")])
+    cache.mark_booked(MONDAY, "09:00")
+    assert _times(cache.get(MONDAY)) == ["09:30"]
+    assert [(s["date"], s["time"][:5]) for s in cache.get(None)] == [(MONDAY, "09:30"), (TUESDAY, "09:00")]
+    assert _times(cache.get(TUESDAY)) == ["09:00"]
+
+
+def test_invalidate_forgets_the_date_and_the_all_dates_view():
+    cache = SlotCache(ttl_seconds=30, max_entries=8)
+    for date in (MONDAY, TUESDAY, None):
+        cache.put(date, [])
+    cache.invalidate(MONDAY)
+    assert cache.get(MONDAY) is None
+    assert cache.get(None) is None
+    assert cache.get(TUESDAY) == []
+    cache.invalidate()
+    assert cache.get(TUESDAY) is None
+
+
+def _cache_views(local_db) -> SlotCache:
+    cache = get_slot_cache()
+    cache.put(MONDAY, local_db.list_open_slots(MONDAY))
+    cache.put(TUESDAY, local_db.list_open_slots(TUESDAY))
+    cache.put(None, local_db.list_open_slots())
+    return cache
+
+
+def test_booking_marks_the_slot_booked_in_the_cache(local_db, context):
+    cache = _cache_views(local_db)
+    result = asyncio.run(book_appointment(context, MONDAY, "09:00", "5550100", "Ada"))
+    assert result.startswith("Your appointment is booked")
+    assert "09:00" not in _times(cache.get(MONDAY))
+    assert (MONDAY, "09:00") not in [(s["date"], s["time"][:5]) for s in cache.get(None)]
+    assert len(cache.get(TUESDAY)) == 6
+
+
+def test_cancelling_invalidates_the_freed_date(local_db, context):
+    booking = local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada")
+    cache = _cache_views(local_db)
+    asyncio.run(cancel_appointment(context, booking["appointment"]["id"]))
+    assert cache.get(MONDAY) is None
+    assert cache.get(None) is None
+    assert cache.get(TUESDAY) is not None
+
+
+def test_moving_marks_the_new_slot_and_invalidates_the_old_date(local_db, context):
+    booking = local_db.book_appointment_atomic(MONDAY, "09:00", "5550100", "Ada")
+    cache = _cache_views(local_db)
+    result = asyncio.run(modify_appointment(context, booking["appointment"]["id"], TUESDAY, "10:00"))
+    assert result.startswith("Your appointment has been moved")
+    assert cache.get(MONDAY) is None
+    assert cache.get(None) is None
+    assert "10:00" not in _times(cache.get(TUESDAY))
@@ -0,0 +1,90 @@
+import pytest
+
+from tools.slot_format import summarize_slots
+
+MONDAY = "2026-02-09"
+TUESDAY = "2026-02-10"
+WEDNESDAY = "2026-02-11"
+THURSDAY = "2026-02-12"
+
+
+def _slots(date: str, *times: str) -> list[dict]:
+    return [{"date": date, "time": f"{t}:00", "display": f"{date} at {t}"} for t in times]
+
+
+@pytest.mark.parametrize(
+    "slots, text",
+    [
+        (
+            _slots(MONDAY, "09:00", "09:30", "10:00", "10:30"),
+            "Monday, February 9: every 30 minutes from 9 AM to 10:30 AM.",
+        ),
+        (
+            _slots(MONDAY, "09:00", "10:00", "11:00"),
+            "Monday, February 9: every hour from 9 AM to 11 AM.",
+        ),
+        (
+            _slots(MONDAY, "09:00", "09:30", "10:00", "14:00", "16:30"),
+            "Monday, February 9: every 30 minutes from 9 AM to 10 AM, 2 PM and 4:30 PM.",
+        ),
+        (
+            _slots(MONDAY, "09:00", "09:30", "13:00", "13:30", "14:00"),
+            "Monday, February 9: 9 AM, 9:30 AM and every 30 minutes from 1 PM to 2 PM.",
+        ),
+        (
+            _slots(MONDAY, "09:00", "11:15"),
+            "Monday, February 9: 9 AM and 11:15 AM.",
+        ),
+        (
+            _slots(MONDAY, "15:00"),
+            "Monday, February 9: 3 PM.",
+        ),
+    ],
+    ids=["contiguous", "hourly", "run-then-gaps", "gaps-then-run", "two-apart", "single"],
+)
+def test_one_day(slots, text):
+    summary = summarize_slots(slots)
+    assert summary.text == text
+    assert (summary.days, summary.total) == (1, len(slots))
+
+
+def test_slots_are_sorted_and_deduplicated():
+    slots = _slots(MONDAY, "10:00", "09:00", "09:30", "09:30")
+    assert summarize_slots(slots).text == "Monday, February 9: every 30 minutes from 9 AM to 10 AM."
+
+
+def test_no_slots():
+    summary = summarize_slots([])
+    assert (summary.text, summary.days, summary.total, summary.saved_chars) == ("", 0, 0, 0)
+
+
+def test_multiple_days_each_get_a_sentence():
+    slots = _slots(TUESDAY, "14:00") + _slots(MONDAY, "09:00", "09:30", "10:00")
+    summary = summarize_slots(slots)
+    assert summary.text == (
+        "Monday, February 9: every 30 minutes from 9 AM to 10 AM. "
+        "Tuesday, February 10: 2 PM."
+    )
+    assert (summary.days, summary.total) == (2, 4)
+
+
+def test_days_beyond_max_days_are_counted():
+    slots = [s for day in (MONDAY, TUESDAY, WEDNESDAY, THURSDAY) for s in _slots(day, "09:00")]
+    assert summarize_slots(slots, max_days=2).text == (
+        "Monday, February 9: 9 AM. Tuesday, February 10: 9 AM. There are also openings on 2 more days."
+    )
+    assert summarize_slots(slots, max_days=3).text.endswith("There are also openings on 1 more day.")
+
+
+def test_options_beyond_the_per_day_limit_are_counted():
+    slots = _slots(MONDAY, "09:00", "10:15", "11:40", "13:20", "15:50")
+    assert summarize_slots(slots, max_options_per_day=3).text == (
+        "Monday, February 9: 9 AM, 10:15 AM, 11:40 AM and 2 other times."
+    )
+
+
+def test_summary_is_shorter_than_listing_every_slot():
+    slots = _slots(MONDAY, *(f"{h:02d}:{m:02d}" for h in range(9, 17) for m in (0, 30)))
+    summary = summarize_slots(slots)
+    assert summary.text == "Monday, February 9: every 30 minutes from 9 AM to 4:30 PM."
+    assert summary.saved_chars == summary.raw_chars - len(summary.text) > 0
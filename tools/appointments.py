@@ -1,23 +1,178 @@
 from livekit.agents import function_tool, RunContext
-from db.supabase import get_supabase
+from db.repository import get_repository
+from db.slot_cache import get_slot_cache
+from db.availability import get_availability
+from db.resilience import budgeted
+from db.breaker import CircuitOpen
+from tools.events import ToolEventPublisher
+from telemetry.tracing import traced_tool
+from telemetry.metrics import get_registry
+from tools.slot_format import summarize_slots, describe_page, describe_appointments
+from tools.prefetch import AvailabilityPrefetcher
+from tools.caller_profile import get_caller_profile, find_appointment
+from config import (
+    SLOT_SUMMARY_MAX_DAYS,
+    SLOT_SUMMARY_MAX_OPTIONS,
+    SLOT_PAGE_SIZE,
+    PREFETCH_WAIT_SECONDS,
+    APPOINTMENT_PAGE_SIZE,
+    SLOT_HOLD_TTL_SECONDS,
+    AVAILABILITY_FEED_ENABLED,
+)
 from typing import Optional
-import json
 import logging
 import asyncio
+import uuid
+from datetime import date as date_cls
 
 logger = logging.getLogger("tools.appointments")
 
+# Fixed replies. Keeping them word-for-word stable lets their audio be
+# pre-synthesized (see speech/phrase_cache.py).
+ASK_IDENTITY = "Please tell me your Name and phone number to continue."
+NO_SLOTS = "I'm sorry, there are currently no available appointment slots. Please check back later."
+SLOTS_ERROR = "I'm sorry, I encountered a technical error while checking for available slots. Please try again in a moment."
+ASK_PHONE_TO_BOOK = "I need your phone number before I can book. Could you please provide it?"
+SCHEDULE_UNREACHABLE = "I'm having trouble checking the schedule right now. Please try again."
+BOOK_ERROR = "I'm sorry, I encountered a technical error while saving your appointment. Please try again in a moment."
+SLOT_TAKEN = "That slot is already booked. Please choose another time."
+SLOT_GONE = "I'm sorry, that slot is no longer available. Please pick another time from the available slots."
+ASK_PHONE_TO_LOOK_UP = "I need your phone number to look up your appointments. Could you please provide it?"
+NO_MORE_APPOINTMENTS = "There are no more appointments to read."
+LOOKUP_ERROR = "I'm sorry, I encountered an error while looking up your appointments."
+CANCEL_UNREACHABLE = "I'm sorry, I couldn't reach the schedule to cancel that. Please try again in a moment."
+CANCEL_NOT_FOUND = "I couldn't find that appointment. Please check the appointment ID."
+CANCELLED = "Your appointment has been cancelled and the slot is now available."
+MOVE_UNREACHABLE = "I'm having trouble reaching the schedule right now, so I can't change that yet. Please try again shortly."
+MOVE_ERROR = "I'm sorry, I encountered a technical error while changing your appointment. Please try again in a moment."
+MOVE_NOT_FOUND = "I couldn't find that appointment."
+MOVE_CANCELLED = "That appointment was cancelled, so there's nothing to move. Would you like to book a new time instead?"
+NEW_SLOT_TAKEN = "That new slot is already booked."
+NEW_SLOT_GONE = "That new slot is not available. Please choose another time."
+SLOT_HELD = "Someone else is booking that time right now. Please choose another time."
+NEW_SLOT_HELD = "Someone else is booking that new time right now. Please choose another time."
+HOLD_RELEASED = "Okay, I've let that time go."
+
+SPOKEN_PHRASES = (
+    ASK_IDENTITY,
+    NO_SLOTS,
+    SLOTS_ERROR,
+    ASK_PHONE_TO_BOOK,
+    SCHEDULE_UNREACHABLE,
+    BOOK_ERROR,
+    SLOT_TAKEN,
+    SLOT_GONE,
+    ASK_PHONE_TO_LOOK_UP,
+    NO_MORE_APPOINTMENTS,
+    LOOKUP_ERROR,
+    CANCEL_UNREACHABLE,
+    CANCEL_NOT_FOUND,
+    CANCELLED,
+    MOVE_UNREACHABLE,
+    MOVE_ERROR,
+    MOVE_NOT_FOUND,
+    MOVE_CANCELLED,
+    NEW_SLOT_TAKEN,
+    NEW_SLOT_GONE,
+    SLOT_HELD,
+    NEW_SLOT_HELD,
+    HOLD_RELEASED,
+)
+
+SLOT_SUMMARY_CHARS_SAVED = get_registry().counter(
+    "voice_slot_summary_chars_saved_total",
+    "Characters saved by range-compressed slot summaries versus listing every slot.",
+)
+SLOT_HOLDS = get_registry().counter(
+    "voice_slot_holds_total", "hold_slot calls by outcome (held, taken, unavailable, error)."
+)
+
+
+def _publish_tool_event(context: RunContext, payload: dict) -> None:
+    """Queue a tool event for the session's background publisher; never blocks the tool."""
+    userdata = context.session.userdata if context and context.session else None
+    if not userdata:
+        return
+    publisher = userdata.get("tool_events")
+    if publisher is None:
+        room = userdata.get("room")
+        if not room:
+            return
+        publisher = ToolEventPublisher(room)
+        publisher.start()
+        userdata["tool_events"] = publisher
+    publisher.publish(payload)
+
+
+def _prefetcher(context: RunContext) -> Optional[AvailabilityPrefetcher]:
+    userdata = context.session.userdata if context and context.session else None
+    return userdata.get("prefetch") if userdata else None
+
+
+def _slot_taken(context: RunContext, date: str, time: str) -> None:
+    """Stop offering a slot from the worker cache and the session prefetch."""
+    get_slot_cache().mark_booked(date, time)
+    if AVAILABILITY_FEED_ENABLED:
+        get_availability().mark_booked(date, time)
+    prefetch = _prefetcher(context)
+    if prefetch is not None:
+        prefetch.mark_booked(date, time)
+
+
+def _slot_freed(context: RunContext, date: str) -> None:
+    """A slot on `date` opened up; drop cached views of that date so it is re-read."""
+    get_slot_cache().invalidate(date)
+    prefetch = _prefetcher(context)
+    if prefetch is not None:
+        prefetch.invalidate(date)
+
+
+def _slot_holder(context: RunContext) -> Optional[str]:
+    """This session's id in slot_holds, created on first use."""
+    userdata = context.session.userdata if context and context.session else None
+    if userdata is None:
+        return None
+    holder = userdata.get("slot_holder")
+    if holder is None:
+        holder = userdata["slot_holder"] = f"session-{uuid.uuid4().hex}"
+    return holder
+
+
+def _forget_hold(context: RunContext, date: str, time: str) -> None:
+    """The session's hold on date/time was turned into a booking."""
+    userdata = context.session.userdata if context and context.session else None
+    if userdata and userdata.get("slot_hold") == (date, time):
+        userdata.pop("slot_hold", None)
+
+
+def _iso_date(value: str) -> str:
+    # Accept DD-MM-YYYY as well as YYYY-MM-DD.
+    if value and len(value) == 10 and value[2] == "-" and value[5] == "-":
+        parts = value.split("-")
+        if len(parts) == 3:
+            return f"{parts[2]}-{parts[1]}-{parts[0]}"
+    return value
+
+
+def _caller_phone(context: RunContext) -> Optional[str]:
+    userdata = context.session.userdata if context and context.session else None
+    if not userdata:
+        return None
+    return userdata.get("caller_phone") or getattr(userdata.get("agent"), "phone_number", None)
+
 
-async def _publish_tool_event(context: RunContext, payload: dict) -> None:
-    room = context.session.userdata.get("room") if context and context.session else None
-    if not room:
+async def _remember_caller(context: RunContext, phone: str, name: Optional[str] = None) -> None:
+    """Make `phone` the session's caller so later tools can default to it."""
+    profile = get_caller_profile(context, phone)
+    if profile is not None and name:
+        profile.name = name
+    userdata = context.session.userdata if context and context.session else None
+    if userdata is None:
         return
-    try:
-        await room.local_participant.publish_data(
-            json.dumps(payload), reliable=True, topic="tooling"
-        )
-    except Exception as e:
-        logger.debug(f"Failed to publish tool event: {e}")
+    userdata["caller_phone"] = phone
+    agent = userdata.get("agent")
+    if agent is not None and hasattr(agent, "set_caller"):
+        await agent.set_caller(phone, name)
 
 
 def _normalize_phone_number(raw: Optional[str]) -> Optional[str]:
@@ -55,15 +210,34 @@ def _normalize_phone_number(raw: Optional[str]) -> Optional[str]:
 
 
 @function_tool
-async def identify_user(context: RunContext):
-    """Ask the user for their phone number."""
-    message = "Please tell me your Name and phone number to continue."
-    await _publish_tool_event(
+@traced_tool
+@budgeted()
+async def identify_user(
+    context: RunContext,
+    phone_number: Optional[str] = None,
+    name: Optional[str] = None,
+):
+    """Identify the caller.
+
+    Call with no arguments to ask the user for their name and phone number.
+    Once they have said them, call again with phone_number and name so the other tools can use them without asking again.
+    """
+    prefetch = _prefetcher(context)
+    if prefetch is not None:
+        prefetch.start()
+    normalized_phone = _normalize_phone_number(phone_number) or phone_number
+    if not normalized_phone:
+        message = ASK_IDENTITY
+    else:
+        await _remember_caller(context, normalized_phone, name)
+        greeting = f"Thanks, {name}." if name else "Thanks."
+        message = f"{greeting} I have your phone number as {normalized_phone}."
+    _publish_tool_event(
         context,
         {
             "type": "tool_call",
             "name": "identify_user",
-            "args": {},
+            "args": {"phone_number": normalized_phone, "name": name},
             "result": message,
         },
     )
@@ -71,118 +245,253 @@ async def identify_user(context: RunContext):
 
 
 @function_tool
-async def fetch_slots(context: RunContext, date: Optional[str] = None):
+@traced_tool
+@budgeted()
+async def fetch_slots(context: RunContext, date: Optional[str] = None, page: Optional[int] = None):
     """
     Fetch available appointment slots from the database. Call this when the user asks about availability.
 
     If a date is provided, it will filter slots for that specific date.
+    Without a page, returns a short summary with times grouped into ranges.
+    Pass page (1, 2, ...) to list the exact slots one page at a time, e.g. when the user asks for more options.
 
     Returns available slots that you should present to the user in a friendly spoken format.
     Convert dates to natural speech (e.g., "February 10th at 3 PM").
     """
-    logger.info(f"fetch_slots called with date={date}")
-    await _publish_tool_event(
+    logger.info(f"fetch_slots called with date={date} page={page}")
+    _publish_tool_event(
         context,
-        {"type": "tool_call", "name": "fetch_slots", "args": {"date": date}},
+        {"type": "tool_call", "name": "fetch_slots", "args": {"date": date, "page": page}},
     )
     try:
-        logger.debug("Getting Supabase client...")
-        supabase = await get_supabase()
-        logger.debug("Supabase client obtained.")
-
-        query = supabase.table("slots").select("*").eq("is_booked", False)
-
-        if date:
-            logger.debug(f"Filtering by date: {date}")
-            query = query.eq("date", date)
-
-        logger.debug("Executing query...")
-        res = await query.order("date").order("time").execute()
-        logger.debug(f"Query executed. Found {len(res.data)} slots.")
+        slots = None
+        if AVAILABILITY_FEED_ENABLED:
+            # Kept current by the change feed, so it reflects bookings made on other workers too.
+            slots = get_availability().get(date)
+            if slots is not None:
+                logger.debug(f"Answered from the availability index for date={date} ({len(slots)} slots).")
+
+        prefetch = _prefetcher(context)
+        if slots is None and prefetch is not None:
+            await prefetch.wait(PREFETCH_WAIT_SECONDS)
+            slots = prefetch.get(date)
+            if slots is not None:
+                logger.debug(f"Answered from session prefetch for date={date} ({len(slots)} slots).")
+
+        if slots is None:
+            cache = get_slot_cache()
+            slots = cache.get(date)
+            if slots is None:
+                logger.debug(f"Slot cache miss, querying open slots for date={date}...")
+                slots = await get_repository().list_open_slots(date)
+                cache.put(date, slots)
+                logger.debug(f"Query executed. Found {len(slots)} slots.")
+            else:
+                logger.debug(f"Slot cache hit for date={date} ({len(slots)} slots).")
 
-        if not res.data:
+        if not slots:
             if date:
                 result = (
                     f"I'm sorry, there are no available slots for {date}. "
                     "Would you like to check another day?"
                 )
             else:
-                result = (
-                    "I'm sorry, there are currently no available appointment slots. "
-                    "Please check back later."
-                )
-            await _publish_tool_event(
+                result = NO_SLOTS
+            _publish_tool_event(
                 context,
                 {
                     "type": "tool_call",
                     "name": "fetch_slots",
-                    "args": {"date": date},
+                    "args": {"date": date, "page": page},
                     "result": result,
                 },
             )
             return result
 
-        slot_descriptions = [slot["display"] for slot in res.data] # type: ignore
+        slot_descriptions = [slot["display"] for slot in slots]
 
         if len(slot_descriptions) == 1:
             result = f"We have one available slot: {slot_descriptions[0]}. Does that work for you?"
-            await _publish_tool_event(
+            _publish_tool_event(
                 context,
                 {
                     "type": "tool_call",
                     "name": "fetch_slots",
-                    "args": {"date": date},
+                    "args": {"date": date, "page": page},
                     "result": result,
                 },
             )
             return result
 
-        response = (
-            f"We have {len(slot_descriptions)} available appointment slots: "
-            f"{', '.join(slot_descriptions[:-1])}, and {slot_descriptions[-1]}. "  # type: ignore
-            "Which time works best for you?"
-        )
+        if page:
+            response = (
+                f"We have {len(slot_descriptions)} available appointment slots. "
+                f"{describe_page(slots, page, SLOT_PAGE_SIZE)} Which time works best for you?"
+            )
+        else:
+            summary = summarize_slots(
+                slots, max_days=SLOT_SUMMARY_MAX_DAYS, max_options_per_day=SLOT_SUMMARY_MAX_OPTIONS
+            )
+            response = (
+                f"We have {len(slot_descriptions)} available appointment slots. "
+                f"{summary.text} Which time works best for you?"
+            )
+            SLOT_SUMMARY_CHARS_SAVED.inc(summary.saved_chars)
+            logger.debug(
+                f"Slot summary: {summary.raw_chars} raw chars -> {len(summary.text)} "
+                f"({summary.saved_chars} saved)"
+            )
         logger.info(f"fetch_slots returning: {response}")
-        await _publish_tool_event(
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
                 "name": "fetch_slots",
-                "args": {"date": date},
+                "args": {"date": date, "page": page},
                 "result": response,
             },
         )
         return response
 
     except Exception as e:
-        logger.error(f"Error fetching slots from Supabase: {e}", exc_info=True)
-        result = (
-            "I'm sorry, I encountered a technical error while checking for available slots. "
-            "Please try again in a moment."
-        )
-        await _publish_tool_event(
+        logger.error(f"Error fetching slots: {e}", exc_info=True)
+        result = SLOTS_ERROR
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
                 "name": "fetch_slots",
-                "args": {"date": date},
+                "args": {"date": date, "page": page},
+                "result": result,
+            },
+        )
+        return result
+
+
+@function_tool
+@traced_tool
+@budgeted()
+async def hold_slot(context: RunContext, date: str, time: str):
+    """Reserve a slot for this caller for a couple of minutes while you confirm the booking details.
+
+    Call this as soon as the user picks a time, before confirming their name and phone number,
+    so nobody else can book it meanwhile. Holding another time lets the previous one go.
+    """
+    date = _iso_date(date)
+    args = {"date": date, "time": time}
+    _publish_tool_event(
+        context,
+        {"type": "tool_call", "name": "hold_slot", "args": args},
+    )
+    try:
+        hold = await get_repository().hold_slot(date, time, _slot_holder(context), SLOT_HOLD_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Error holding slot {date} {time}: {type(e).__name__}: {e}")
+        SLOT_HOLDS.inc(1, {"outcome": "error"})
+        result = SCHEDULE_UNREACHABLE
+        _publish_tool_event(
+            context,
+            {
+                "type": "tool_call",
+                "name": "hold_slot",
+                "args": args,
                 "result": result,
             },
         )
         return result
 
+    status = (hold or {}).get("status")
+    SLOT_HOLDS.inc(1, {"outcome": status or "error"})
+    if status != "held":
+        _slot_taken(context, date, time)
+        result = SLOT_HELD if status == "taken" else SLOT_GONE
+        _publish_tool_event(
+            context,
+            {
+                "type": "tool_call",
+                "name": "hold_slot",
+                "args": args,
+                "result": result,
+            },
+        )
+        return result
+
+    # Other sessions on this worker stop offering it; a previous hold of ours was let go.
+    _slot_taken(context, date, time)
+    userdata = context.session.userdata if context and context.session else None
+    if userdata is not None:
+        previous = userdata.get("slot_hold")
+        if previous and previous != (date, time):
+            _slot_freed(context, previous[0])
+        userdata["slot_hold"] = (date, time)
+
+    minutes = max(1, round(SLOT_HOLD_TTL_SECONDS / 60))
+    result = (
+        f"I'm holding {date} at {time} for you for the next {minutes} "
+        f"minute{'s' if minutes != 1 else ''} while we confirm your details."
+    )
+    _publish_tool_event(
+        context,
+        {
+            "type": "tool_call",
+            "name": "hold_slot",
+            "args": args,
+            "result": result,
+        },
+    )
+    return result
+
+
+@function_tool
+@traced_tool
+@budgeted()
+async def release_hold(context: RunContext):
+    """Let go of the slot held with hold_slot. Call this when the user decides not to book the held time."""
+    _publish_tool_event(
+        context,
+        {"type": "tool_call", "name": "release_hold", "args": {}},
+    )
+    userdata = context.session.userdata if context and context.session else None
+    held = userdata.pop("slot_hold", None) if userdata else None
+    if held is not None:
+        try:
+            await get_repository().release_holds(_slot_holder(context))
+        except Exception as e:
+            # The hold runs out on its own; nothing for the caller to do.
+            logger.warning(f"Could not release slot hold {held}: {e}")
+        _slot_freed(context, held[0])
+    result = HOLD_RELEASED
+    _publish_tool_event(
+        context,
+        {
+            "type": "tool_call",
+            "name": "release_hold",
+            "args": {},
+            "result": result,
+        },
+    )
+    return result
+
 
 @function_tool
+@traced_tool
+@budgeted()
 async def book_appointment(
     context: RunContext,
     date: str,
     time: str,
-    phone_number: str,
-    name: str,
+    phone_number: Optional[str] = None,
+    name: Optional[str] = None,
 ):
-    """Book an appointment for the user."""
-    normalized_phone = _normalize_phone_number(phone_number) or phone_number
-    await _publish_tool_event(
+    """Book an appointment for the user.
+
+    phone_number and name can be omitted once the caller has been identified with identify_user.
+    """
+    normalized_phone = _normalize_phone_number(phone_number) or phone_number or _caller_phone(context)
+    profile = get_caller_profile(context, normalized_phone)
+    if not name and profile is not None:
+        name = profile.name
+    _publish_tool_event(
         context,
         {
             "type": "tool_call",
@@ -195,40 +504,9 @@ async def book_appointment(
             },
         },
     )
-    supabase = await get_supabase()
-
-    if date and len(date) == 10 and date[2] == "-" and date[5] == "-":
-        parts = date.split("-")
-        if len(parts) == 3:
-            date = f"{parts[2]}-{parts[1]}-{parts[0]}"
-
-    slot_query = (
-        supabase.table("slots")
-        .select("*")
-        .eq("date", date)
-        .eq("time", time)
-        .eq("is_booked", False)
-    )
-
-    conflict_query = (
-        supabase.table("appointments")
-        .select("*")
-        .eq("date", date)
-        .eq("time", time)
-        .eq("status", "booked")
-    )
-
-    # Run checks in parallel
-    logger.debug(f"Checking availability for {date} {time}...")
-    try:
-        # 5 second timeout for the checks
-        slot_check, conflict = await asyncio.wait_for(
-            asyncio.gather(slot_query.execute(), conflict_query.execute()),
-            timeout=5.0
-        )
-    except asyncio.TimeoutError:
-        result = "I'm having trouble checking the schedule right now. Please try again."
-        await _publish_tool_event(
+    if not normalized_phone:
+        result = ASK_PHONE_TO_BOOK
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -239,9 +517,21 @@ async def book_appointment(
         )
         return result
 
-    if not slot_check.data:
-        result = "I'm sorry, that slot is no longer available. Please pick another time from the available slots."
-        await _publish_tool_event(
+    date = _iso_date(date)
+
+    prefetch = _prefetcher(context)
+    if prefetch is not None:
+        prefetch.check_before_booking()
+
+    # Claim the slot and insert the appointment in a single transaction.
+    logger.debug(f"Booking {date} {time} atomically...")
+    try:
+        booking = await get_repository().book_appointment(
+            date, time, normalized_phone, name, holder=_slot_holder(context)
+        )
+    except (asyncio.TimeoutError, CircuitOpen):
+        result = SCHEDULE_UNREACHABLE
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -251,11 +541,10 @@ async def book_appointment(
             },
         )
         return result
-
-    if conflict.data:
-        logger.warning(f"Conflict found for booking: {date} {time}")
-        result = "That slot is already booked. Please choose another time."
-        await _publish_tool_event(
+    except Exception as e:
+        logger.error(f"Error booking appointment: {e}")
+        result = BOOK_ERROR
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -266,21 +555,18 @@ async def book_appointment(
         )
         return result
 
-    try:
-        await supabase.table("slots").update({"is_booked": True}).eq("date", date).eq("time", time).execute()
-
-        res = await supabase.table("appointments").insert({
-            "contact_number": normalized_phone,
-            "date": date,
-            "time": time,
-            "status": "booked",
-            "name": name,
-        }).execute()
-        logger.info(f"Successfully booked appointment: {res.data}")
-    except Exception as e:
-        logger.error(f"Error inserting appointment into Supabase: {e}")
-        result = "I'm sorry, I encountered a technical error while saving your appointment. Please try again in a moment."
-        await _publish_tool_event(
+    status = (booking or {}).get("status")
+    if status != "booked":
+        # Either way the slot is taken, so stop offering it.
+        _slot_taken(context, date, time)
+        if status == "conflict":
+            logger.warning(f"Conflict found for booking: {date} {time}")
+            result = SLOT_TAKEN
+        elif status == "held":
+            result = SLOT_HELD
+        else:
+            result = SLOT_GONE
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -291,8 +577,16 @@ async def book_appointment(
         )
         return result
 
+    _slot_taken(context, date, time)
+    _forget_hold(context, date, time)
+    if profile is not None and booking.get("appointment"):
+        profile.upsert(booking["appointment"])
+    if not _caller_phone(context):
+        await _remember_caller(context, normalized_phone, name)
+    logger.info(f"Successfully booked appointment: {booking.get('appointment')}")
+
     result = f"Your appointment is booked for {date} at {time}."
-    await _publish_tool_event(
+    _publish_tool_event(
         context,
         {
             "type": "tool_call",
@@ -305,93 +599,136 @@ async def book_appointment(
 
 
 @function_tool
+@traced_tool
+@budgeted()
 async def retrieve_appointments(
     context: RunContext,
     phone_number: Optional[str] = None,
+    status: Optional[str] = "booked",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    include_past: bool = False,
+    more: bool = False,
 ):
-    """Retrieve past appointments for a user. If phone_number is not provided, it will ask for it."""
-    logger.info(f"retrieve_appointments called with phone_number={phone_number}")
-    normalized_phone = _normalize_phone_number(phone_number) or phone_number
-    await _publish_tool_event(
+    """Retrieve a user's appointments, a few at a time.
+
+    phone_number can be omitted once the caller has been identified; otherwise it will ask for it.
+    By default only upcoming booked appointments are returned. Pass status="cancelled" or "all",
+    start_date / end_date (YYYY-MM-DD) or include_past=True to look further.
+    Pass more=True to continue the previous list when the user wants to hear the rest.
+    """
+    logger.info(
+        f"retrieve_appointments called with phone_number={phone_number}, status={status}, "
+        f"start_date={start_date}, end_date={end_date}, include_past={include_past}, more={more}"
+    )
+    normalized_phone = _normalize_phone_number(phone_number) or phone_number or _caller_phone(context)
+    args = {
+        "phone_number": normalized_phone,
+        "status": status,
+        "start_date": start_date,
+        "end_date": end_date,
+        "include_past": include_past,
+        "more": more,
+    }
+    _publish_tool_event(
         context,
         {
             "type": "tool_call",
             "name": "retrieve_appointments",
-            "args": {"phone_number": normalized_phone},
+            "args": args,
         },
     )
-    if not phone_number:
-        result = "I need your phone number to look up your appointments. Could you please provide it?"
-        await _publish_tool_event(
+    if not normalized_phone:
+        result = ASK_PHONE_TO_LOOK_UP
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
                 "name": "retrieve_appointments",
-                "args": {"phone_number": normalized_phone},
+                "args": args,
                 "result": result,
             },
         )
         return result
 
-    supabase = await get_supabase()
     try:
-        res = (
-            await supabase.table("appointments")
-            .select("*")
-            .eq("contact_number", normalized_phone)
-            .execute()
-        )
-
-        if not res.data:
-            result = f"I couldn't find any appointments for the phone number {normalized_phone}."
-            await _publish_tool_event(
+        profile = get_caller_profile(context, normalized_phone)
+        if more and profile is not None and profile.next_query is not None:
+            filters, cursor = profile.next_query
+        else:
+            if not start_date and not include_past:
+                start_date = date_cls.today().isoformat()
+            filters = (None if status in (None, "", "all") else status, start_date, end_date)
+            cursor = None
+
+        cached = profile.pages.get((filters, cursor)) if profile is not None else None
+        if cached is not None:
+            appointments, next_cursor = cached
+            logger.debug(f"Served {len(appointments)} appointments from the caller profile.")
+        else:
+            # One extra row tells us whether another page exists without a count query.
+            rows = await get_repository().list_appointments(
+                normalized_phone, *filters, after=cursor, limit=APPOINTMENT_PAGE_SIZE + 1
+            )
+            appointments = rows[:APPOINTMENT_PAGE_SIZE]
+            next_cursor = None
+            if len(rows) > APPOINTMENT_PAGE_SIZE:
+                last = appointments[-1]
+                next_cursor = (last.get("date"), last.get("time"), last.get("id"))
+            if profile is not None:
+                profile.remember(appointments)
+                profile.pages[(filters, cursor)] = (appointments, next_cursor)
+        if profile is not None:
+            profile.next_query = (filters, next_cursor) if next_cursor else None
+        if not _caller_phone(context):
+            await _remember_caller(context, normalized_phone)
+
+        if not appointments:
+            if cursor is not None:
+                result = NO_MORE_APPOINTMENTS
+            else:
+                result = f"I couldn't find any matching appointments for the phone number {normalized_phone}."
+            _publish_tool_event(
                 context,
                 {
                     "type": "tool_call",
                     "name": "retrieve_appointments",
-                    "args": {"phone_number": normalized_phone},
+                    "args": args,
                     "result": result,
                 },
             )
             return result
 
-        logger.info(f"Retrieved {len(res.data)} appointments.")
-        summaries = []
-        internal_ids = []
-        for idx, appt in enumerate(res.data, start=1):
-            date = appt.get("date")
-            time = appt.get("time")
-            status = appt.get("status", "unknown")
-            summaries.append(f"{idx}. {date} at {time} ({status})")
-            internal_ids.append(f"{idx}|{appt.get('id')}")
-
-        spoken_summary = (
-            "Here are your appointments: " + "; ".join(summaries) + "."
+        logger.info(f"Retrieved {len(appointments)} appointments (more={next_cursor is not None}).")
+        internal_ids = [f"{idx}|{appt.get('id')}" for idx, appt in enumerate(appointments, start=1)]
+
+        spoken_summary = "Here are your appointments: " + describe_appointments(
+            appointments, has_more=next_cursor is not None, show_status=filters[0] is None
         )
         internal_block = (
             "DO_NOT_READ_INTERNAL_IDS:\n" + "\n".join(internal_ids)
         )
         result = spoken_summary + "\n" + internal_block
 
-        await _publish_tool_event(
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
                 "name": "retrieve_appointments",
-                "args": {"phone_number": normalized_phone},
-                "result": res.data,
+                "args": args,
+                "result": appointments,
             },
         )
         return result
     except Exception as e:
         logger.error(f"Error retrieving appointments: {e}", exc_info=True)
-        result = "I'm sorry, I encountered an error while looking up your appointments."
-        await _publish_tool_event(
+        result = LOOKUP_ERROR
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
                 "name": "retrieve_appointments",
-                "args": {"phone_number": normalized_phone},
+                "args": args,
                 "result": result,
             },
         )
@@ -399,26 +736,25 @@ async def retrieve_appointments(
 
 
 @function_tool
+@traced_tool
+@budgeted()
 async def cancel_appointment(
     context: RunContext,
     appointment_id: str,
 ):
     """Cancel an appointment."""
-    await _publish_tool_event(
+    _publish_tool_event(
         context,
         {"type": "tool_call", "name": "cancel_appointment", "args": {"appointment_id": appointment_id}},
     )
-    supabase = await get_supabase()
-    appt_res = (
-        await supabase.table("appointments")
-        .select("date,time,status")
-        .eq("id", appointment_id)
-        .execute()
-    )
-
-    if not appt_res.data:
-        result = "I couldn't find that appointment. Please check the appointment ID."
-        await _publish_tool_event(
+    # If we read this appointment earlier in the call, skip re-reading it by id.
+    profile, known = find_appointment(context, appointment_id)
+    try:
+        appointment = await get_repository().cancel_appointment(appointment_id, known=known)
+    except Exception as e:
+        logger.error(f"Error cancelling appointment: {e}", exc_info=True)
+        result = CANCEL_UNREACHABLE
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -429,24 +765,26 @@ async def cancel_appointment(
         )
         return result
 
-    appointment = appt_res.data[0]
-    date = appointment.get("date")
-    time = appointment.get("time")
-
-    await supabase.table("appointments") \
-        .update({"status": "cancelled"}) \
-        .eq("id", appointment_id) \
-        .execute()
+    if appointment is None:
+        result = CANCEL_NOT_FOUND
+        _publish_tool_event(
+            context,
+            {
+                "type": "tool_call",
+                "name": "cancel_appointment",
+                "args": {"appointment_id": appointment_id},
+                "result": result,
+            },
+        )
+        return result
 
-    if date and time:
-        await supabase.table("slots") \
-            .update({"is_booked": False}) \
-            .eq("date", date) \
-            .eq("time", time) \
-            .execute()
+    if profile is not None:
+        profile.upsert({"id": appointment_id, "status": "cancelled"})
+    if appointment.get("date") and appointment.get("time"):
+        _slot_freed(context, appointment["date"])
 
-    result = "Your appointment has been cancelled and the slot is now available."
-    await _publish_tool_event(
+    result = CANCELLED
+    _publish_tool_event(
         context,
         {
             "type": "tool_call",
@@ -459,6 +797,8 @@ async def cancel_appointment(
 
 
 @function_tool
+@traced_tool
+@budgeted()
 async def modify_appointment(
     context: RunContext,
     appointment_id: str,
@@ -466,7 +806,7 @@ async def modify_appointment(
     new_time: str,
 ):
     """Modify appointment date or time."""
-    await _publish_tool_event(
+    _publish_tool_event(
         context,
         {
             "type": "tool_call",
@@ -474,23 +814,16 @@ async def modify_appointment(
             "args": {"appointment_id": appointment_id, "new_date": new_date, "new_time": new_time},
         },
     )
-    supabase = await get_supabase()
-
-    if new_date and len(new_date) == 10 and new_date[2] == "-" and new_date[5] == "-":
-        parts = new_date.split("-")
-        if len(parts) == 3:
-            new_date = f"{parts[2]}-{parts[1]}-{parts[0]}"
-
-    appt_res = (
-        await supabase.table("appointments")
-        .select("id,date,time,status")
-        .eq("id", appointment_id)
-        .execute()
-    )
+    new_date = _iso_date(new_date)
 
-    if not appt_res.data:
-        result = "I couldn't find that appointment."
-        await _publish_tool_event(
+    # Lookups, slot release/claim and the appointment update all happen in one transaction.
+    try:
+        move = await get_repository().move_appointment(
+            appointment_id, new_date, new_time, holder=_slot_holder(context)
+        )
+    except (asyncio.TimeoutError, CircuitOpen):
+        result = MOVE_UNREACHABLE
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -500,23 +833,10 @@ async def modify_appointment(
             },
         )
         return result
-
-    current = appt_res.data[0]
-    old_date = current.get("date")
-    old_time = current.get("time")
-
-    slot_check = (
-        await supabase.table("slots")
-        .select("*")
-        .eq("date", new_date)
-        .eq("time", new_time)
-        .eq("is_booked", False)
-        .execute()
-    )
-
-    if not slot_check.data:
-        result = "That new slot is not available. Please choose another time."
-        await _publish_tool_event(
+    except Exception as e:
+        logger.error(f"Error moving appointment: {e}", exc_info=True)
+        result = MOVE_ERROR
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -527,18 +847,19 @@ async def modify_appointment(
         )
         return result
 
-    conflict = (
-        await supabase.table("appointments")
-        .select("*")
-        .eq("date", new_date)
-        .eq("time", new_time)
-        .eq("status", "booked")
-        .execute()
-    )
-
-    if conflict.data:
-        result = "That new slot is already booked."
-        await _publish_tool_event(
+    status = (move or {}).get("status")
+    if status != "moved":
+        if status == "not_found":
+            result = MOVE_NOT_FOUND
+        elif status == "cancelled":
+            result = MOVE_CANCELLED
+        elif status == "conflict":
+            result = NEW_SLOT_TAKEN
+        elif status == "held":
+            result = NEW_SLOT_HELD
+        else:
+            result = NEW_SLOT_GONE
+        _publish_tool_event(
             context,
             {
                 "type": "tool_call",
@@ -549,26 +870,20 @@ async def modify_appointment(
         )
         return result
 
-    await supabase.table("appointments") \
-        .update({"date": new_date, "time": new_time, "status": "booked"}) \
-        .eq("id", appointment_id) \
-        .execute()
-
-    if old_date and old_time:
-        await supabase.table("slots") \
-            .update({"is_booked": False}) \
-            .eq("date", old_date) \
-            .eq("time", old_time) \
-            .execute()
-
-    await supabase.table("slots") \
-        .update({"is_booked": True}) \
-        .eq("date", new_date) \
-        .eq("time", new_time) \
-        .execute()
+    if move.get("appointment"):
+        moved = move["appointment"]
+        profile, _ = find_appointment(context, appointment_id)
+        if profile is None:
+            profile = get_caller_profile(context, moved.get("contact_number"))
+        if profile is not None:
+            profile.upsert(moved)
+    _slot_taken(context, new_date, new_time)
+    _forget_hold(context, new_date, new_time)
+    if move.get("old_date"):
+        _slot_freed(context, move["old_date"])
 
     result = f"Your appointment has been moved to {new_date} at {new_time}."
-    await _publish_tool_event(
+    _publish_tool_event(
         context,
         {
             "type": "tool_call",
@@ -0,0 +1,61 @@
+from typing import Optional
+
+
+class CallerProfile:
+    """What this session knows about one caller, keyed by normalized phone.
+
+    `appointments` holds every row seen this call, so cancel and modify can
+    find them without a lookup. `pages` remembers retrieve_appointments
+    results per (filters, cursor); any write made during the call clears it,
+    since a booking, cancellation or move can change which rows a filter matches.
+    `next_query` is the filters and cursor for the caller's next "more" request.
+    """
+
+    def __init__(self, phone: str):
+        self.phone = phone
+        self.name: Optional[str] = None
+        self.appointments: dict[str, dict] = {}
+        self.pages: dict[tuple, tuple[list[dict], Optional[tuple]]] = {}
+        self.next_query: Optional[tuple[tuple, Optional[tuple]]] = None
+
+    def remember(self, rows: list[dict]) -> None:
+        for row in rows:
+            key = str(row.get("id"))
+            merged = dict(self.appointments.get(key, {}))
+            merged.update(row)
+            self.appointments[key] = merged
+
+    def upsert(self, row: dict) -> None:
+        self.remember([row])
+        self.pages.clear()
+        self.next_query = None
+
+    def get(self, appointment_id) -> Optional[dict]:
+        return self.appointments.get(str(appointment_id))
+
+
+def _profiles(context) -> Optional[dict]:
+    userdata = context.session.userdata if context and context.session else None
+    if userdata is None:
+        return None
+    return userdata.setdefault("caller_profiles", {})
+
+
+def get_caller_profile(context, phone: Optional[str]) -> Optional[CallerProfile]:
+    """The session's profile for `phone`, created on first use."""
+    profiles = _profiles(context)
+    if profiles is None or not phone:
+        return None
+    profile = profiles.get(phone)
+    if profile is None:
+        profile = profiles[phone] = CallerProfile(phone)
+    return profile
+
+
+def find_appointment(context, appointment_id) -> tuple[Optional[CallerProfile], Optional[dict]]:
+    """Look an appointment up in every profile this session has seen."""
+    for profile in (_profiles(context) or {}).values():
+        row = profile.get(appointment_id)
+        if row is not None:
+            return profile, row
+    return None, None
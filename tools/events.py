@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from typing import Optional
+import asyncio
+import itertools
+import json
+import logging
+
+logger = logging.getLogger("tools.events")
+
+
+class ToolEventPublisher:
+    """Per-session queue that publishes tool events to the room in the background.
+
+    Tools call `publish()`, which only enqueues and returns. A background task
+    drains the queue over the data channel. A "call" event that is still queued
+    when its "result" arrives is replaced by the result (which carries the same
+    args), so a fast tool costs one message instead of two. When the channel
+    falls behind and the queue is full, queued "call" events are dropped first,
+    then the oldest event.
+    """
+
+    def __init__(
+        self,
+        room,
+        *,
+        topic: str = "tooling",
+        max_queue: int = 64,
+        publish_timeout: float = 2.0,
+    ):
+        self._room = room
+        self._topic = topic
+        self._max_queue = max_queue
+        self._publish_timeout = publish_timeout
+        self._pending: "OrderedDict[int, dict]" = OrderedDict()
+        self._open_calls: dict[str, int] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="tool_event_publisher")
+
+    def publish(self, payload: dict) -> None:
+        self.enqueued += 1
+        name = payload.get("name")
+        is_result = "result" in payload
+
+        if is_result and name in self._open_calls:
+            seq = self._open_calls.pop(name)
+            if seq in self._pending:
+                self._pending[seq] = payload
+                self.coalesced += 1
+                return
+
+        if len(self._pending) >= self._max_queue:
+            self._drop_one()
+
+        seq = next(self._seq)
+        self._pending[seq] = payload
+        if not is_result and name:
+            self._open_calls[name] = seq
+        self._wakeup.set()
+
+    def _drop_one(self) -> None:
+        victim = next(
+            (seq for seq, p in self._pending.items() if "result" not in p),
+            next(iter(self._pending)),
+        )
+        payload = self._pending.pop(victim)
+        self._forget_call(victim, payload)
+        self.dropped += 1
+
+    def _forget_call(self, seq: int, payload: dict) -> None:
+        name = payload.get("name")
+        if name and self._open_calls.get(name) == seq:
+            del self._open_calls[name]
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                seq, payload = self._pending.popitem(last=False)
+                self._forget_call(seq, payload)
+                try:
+                    await asyncio.wait_for(
+                        self._room.local_participant.publish_data(
+                            json.dumps(payload), reliable=True, topic=self._topic
+                        ),
+                        timeout=self._publish_timeout,
+                    )
+                    self.published += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.debug(f"Failed to publish tool event: {e}")
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "enqueued": self.enqueued,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    async def aclose(self, timeout: float = 1.0) -> None:
+        """Give queued events up to `timeout` seconds to drain, then stop."""
+        if self._task is None:
+            return
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._pending and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info(f"Tool event publisher closed: {self.stats()}")
@@ -0,0 +1,116 @@
+from datetime import date as date_cls, timedelta
+from typing import Optional
+import asyncio
+import logging
+import time
+
+from db.repository import get_repository
+from db.slot_cache import get_slot_cache, same_time
+
+logger = logging.getLogger("tools.prefetch")
+
+
+class AvailabilityPrefetcher:
+    """Session-scoped snapshot of open slots for the next `days` days.
+
+    Loaded in the background as soon as the session starts, so the caller's
+    first availability question is answered from memory. The snapshot is
+    only served while younger than `max_age_seconds`; dates touched by a
+    cancel are dropped from it rather than guessed at. Booking always
+    re-validates in the database, and booking against a stale snapshot
+    kicks off a background refresh.
+    """
+
+    def __init__(self, days: int, max_age_seconds: float):
+        self.days = days
+        self.max_age_seconds = max_age_seconds
+        self.start_date: Optional[str] = None
+        self.end_date: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self._by_date: dict[str, list[dict]] = {}
+        self._dirty_dates: set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+
+    def start(self) -> None:
+        """Begin loading unless a load is in flight or the snapshot is still fresh."""
+        if self._task is not None and not self._task.done():
+            return
+        if self.is_fresh():
+            return
+        self._task = asyncio.create_task(self._load(), name="availability_prefetch")
+
+    async def _load(self) -> None:
+        today = date_cls.today()
+        start = today.isoformat()
+        end = (today + timedelta(days=self.days - 1)).isoformat()
+        started = time.perf_counter()
+        try:
+            slots = await get_repository().list_open_slots_between(start, end)
+        except Exception as e:
+            logger.warning(f"Availability prefetch failed: {e}")
+            return
+        by_date: dict[str, list[dict]] = {}
+        for slot in slots:
+            by_date.setdefault(slot["date"], []).append(slot)
+        self._by_date = by_date
+        self._dirty_dates.clear()
+        self.start_date, self.end_date = start, end
+        self.loaded_at = time.monotonic()
+
+        # Share the result with other sessions on this worker.
+        cache = get_slot_cache()
+        for offset in range(self.days):
+            day = (today + timedelta(days=offset)).isoformat()
+            cache.put(day, by_date.get(day, []))
+        logger.info(
+            f"Prefetched {len(slots)} open slots for {start}..{end} "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.max_age_seconds
+
+    async def wait(self, timeout: float) -> None:
+        """Wait briefly for an in-flight load; cheaper than issuing a second query."""
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def get(self, date: Optional[str]) -> Optional[list[dict]]:
+        """Open slots for `date` (or the whole window for None), or None if not covered."""
+        if not self.is_fresh():
+            return None
+        if date is None:
+            if self._dirty_dates:
+                return None
+            self.hits += 1
+            return [slot for day in sorted(self._by_date) for slot in self._by_date[day]]
+        if not (self.start_date <= date <= self.end_date) or date in self._dirty_dates:
+            return None
+        self.hits += 1
+        return self._by_date.get(date, [])
+
+    def check_before_booking(self) -> None:
+        if not self.is_fresh():
+            self.start()
+
+    def mark_booked(self, date: str, time_: str) -> None:
+        slots = self._by_date.get(date)
+        if slots:
+            self._by_date[date] = [s for s in slots if not same_time(s.get("time"), time_)]
+
+    def invalidate(self, date: str) -> None:
+        self._dirty_dates.add(date)
+
+    async def aclose(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
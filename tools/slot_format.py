@@ -0,0 +1,157 @@
+from datetime import date as date_cls
+from itertools import groupby
+import math
+import re
+
+_ISO_DATE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+_CLOCK = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)(?::\d{2})?(?!\s*[AaPp]\.?[Mm])\b")
+_LONG_NUMBER = re.compile(r"\b\d{7,15}\b")
+
+
+def _minutes(value: str) -> int:
+    hour, minute = value.split(":")[:2]
+    return int(hour) * 60 + int(minute)
+
+
+def spoken_time(minutes: int) -> str:
+    hour, minute = divmod(minutes, 60)
+    suffix = "AM" if hour < 12 else "PM"
+    hour = hour % 12 or 12
+    return f"{hour} {suffix}" if minute == 0 else f"{hour}:{minute:02d} {suffix}"
+
+
+def spoken_date(value: str) -> str:
+    try:
+        day = date_cls.fromisoformat(value)
+    except ValueError:
+        return value
+    return f"{day.strftime('%A, %B')} {day.day}"
+
+
+def spoken_digits(number: str) -> str:
+    """A phone number read digit by digit in groups, e.g. "555 010 0123" -> "5 5 5, 0 1 0, 0 1 2 3"."""
+    head, tail = number[:-4], number[-4:]
+    groups = [head[i:i + 3] for i in range(0, len(head), 3)] + [tail]
+    return ", ".join(" ".join(group) for group in groups if group)
+
+
+def spoken_text(text: str) -> str:
+    """Tool output made fit to say as is: ISO dates, 24-hour times and long numbers in words.
+
+    Tools write for the LLM, which rephrases what it reads; text that goes
+    straight to TTS has to be phrased already.
+    """
+    text = _ISO_DATE.sub(lambda m: spoken_date(m.group(0)), text)
+    text = _CLOCK.sub(lambda m: spoken_time(int(m.group(1)) * 60 + int(m.group(2))), text)
+    return _LONG_NUMBER.sub(lambda m: spoken_digits(m.group(0)), text)
+
+
+def _step_label(step: int) -> str:
+    if step % 60 == 0:
+        hours = step // 60
+        return "every hour" if hours == 1 else f"every {hours} hours"
+    return f"every {step} minutes"
+
+
+def _runs(minutes: list[int]) -> list[tuple[int, int, int]]:
+    """Split sorted start times into (first, last, step) runs of evenly spaced slots."""
+    runs = []
+    i = 0
+    while i < len(minutes):
+        j = i + 1
+        step = minutes[j] - minutes[i] if j < len(minutes) else 0
+        while j + 1 < len(minutes) and minutes[j + 1] - minutes[j] == step:
+            j += 1
+        if j - i + 1 >= 3:
+            runs.append((minutes[i], minutes[j], step))
+            i = j + 1
+        else:
+            runs.append((minutes[i], minutes[i], 0))
+            i += 1
+    return runs
+
+
+def _join(parts: list[str]) -> str:
+    if len(parts) <= 1:
+        return "".join(parts)
+    return ", ".join(parts[:-1]) + " and " + parts[-1]
+
+
+def _describe_day(minutes: list[int], max_options: int) -> str:
+    parts = []
+    for first, last, step in _runs(minutes):
+        if first == last:
+            parts.append(spoken_time(first))
+        else:
+            parts.append(f"{_step_label(step)} from {spoken_time(first)} to {spoken_time(last)}")
+    if len(parts) > max_options:
+        hidden = len(parts) - max_options
+        parts = parts[:max_options] + [f"{hidden} other time{'s' if hidden != 1 else ''}"]
+    return _join(parts)
+
+
+class SlotSummary:
+    __slots__ = ("text", "raw_chars", "saved_chars", "days", "total")
+
+    def __init__(self, text: str, raw_chars: int, days: int, total: int):
+        self.text = text
+        self.raw_chars = raw_chars
+        self.saved_chars = max(raw_chars - len(text), 0)
+        self.days = days
+        self.total = total
+
+
+def summarize_slots(slots: list[dict], max_days: int = 3, max_options_per_day: int = 4) -> SlotSummary:
+    """Describe open slots compactly, grouping evenly spaced times into ranges.
+
+    e.g. "Monday, February 10: every 30 minutes from 9 AM to 11:30 AM and 2 PM."
+    At most `max_days` days and `max_options_per_day` ranges/times per day are
+    spelled out; the rest are counted so the caller can ask for them.
+    """
+    raw_chars = len(", ".join(slot.get("display") or "" for slot in slots))
+    ordered = sorted(slots, key=lambda s: (s["date"], _minutes(s["time"])))
+    by_day = [
+        (day, sorted({_minutes(s["time"]) for s in group}))
+        for day, group in groupby(ordered, key=lambda s: s["date"])
+    ]
+
+    sentences = [
+        f"{spoken_date(day)}: {_describe_day(minutes, max_options_per_day)}."
+        for day, minutes in by_day[:max_days]
+    ]
+    hidden_days = len(by_day) - max_days
+    if hidden_days > 0:
+        sentences.append(
+            f"There are also openings on {hidden_days} more day{'s' if hidden_days != 1 else ''}."
+        )
+    return SlotSummary(" ".join(sentences), raw_chars, len(by_day), len(slots))
+
+
+def page_slots(slots: list[dict], page: int, page_size: int) -> tuple[list[dict], int]:
+    """Return the slots on 1-based `page` and the total number of pages."""
+    pages = max(math.ceil(len(slots) / page_size), 1)
+    page = min(max(page, 1), pages)
+    start = (page - 1) * page_size
+    return slots[start:start + page_size], pages
+
+
+def describe_page(slots: list[dict], page: int, page_size: int) -> str:
+    items, pages = page_slots(slots, page, page_size)
+    page = min(max(page, 1), pages)
+    listed = _join([item.get("display") or f"{item['date']} at {item['time'][:5]}" for item in items])
+    more = " Ask for the next page for more times." if page < pages else ""
+    return f"Page {page} of {pages}: {listed}.{more}"
+
+
+def describe_appointments(rows: list[dict], has_more: bool, show_status: bool = True) -> str:
+    """One short spoken line per appointment, numbered for the internal id block."""
+    parts = []
+    for idx, row in enumerate(rows, start=1):
+        when = f"{spoken_date(str(row.get('date')))} at {spoken_time(_minutes(str(row.get('time'))))}"
+        if show_status:
+            when += f" ({row.get('status', 'unknown')})"
+        parts.append(f"{idx}. {when}")
+    text = "; ".join(parts) + "."
+    if has_more:
+        text += " There are more; ask if they'd like to hear them."
+    return text